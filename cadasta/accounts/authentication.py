@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.authentication import BasicAuthentication
+
+KEY_SALT = 'accounts.authentication.CachedBasicAuthentication'
+
+
+def get_credentials_cache_key(userid, password):
+    # Neither the login nor the password is stored in the cache, only an
+    # HMAC of both keyed with the SECRET_KEY
+    digest = salted_hmac(KEY_SALT, '{}\0{}'.format(userid, password))
+    return 'accounts:basic_auth:{}'.format(digest.hexdigest())
+
+
+def get_password_fingerprint(user):
+    return salted_hmac(KEY_SALT + '.password', user.password).hexdigest()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    HTTP Basic authentication that remembers verified credentials for
+    ``BASIC_AUTH_CACHE_TIMEOUT`` seconds, so that devices polling the API
+    do not have the password hashed on every request.
+
+    A cached credential is bound to the user's password hash, so it is no
+    longer accepted once the password is changed or reset.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = get_credentials_cache_key(userid, password)
+        cached = cache.get(key)
+        if cached is not None:
+            user_id, fingerprint = cached
+            user = get_user_model().objects.filter(
+                id=user_id, is_active=True).first()
+            if user is not None and constant_time_compare(
+                    get_password_fingerprint(user), fingerprint):
+                return (user, None)
+            cache.delete(key)
+
+        user, auth = super().authenticate_credentials(
+            userid, password, request=request)
+        cache.set(key, (user.id, get_password_fingerprint(user)),
+                  settings.BASIC_AUTH_CACHE_TIMEOUT)
+        return (user, auth)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 10:05
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+TABLE_NAME = 'accounts_user'
+INDEXES = (
+    ('accounts_user_email_upper_idx', 'email'),
+    ('accounts_user_phone_upper_idx', 'phone'),
+)
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes for the case-insensitive email and phone lookups (``iexact``)
+    of the authentication backends, which Django runs as
+    ``UPPER(column::text) = UPPER(value)``.
+    """
+
+    dependencies = [
+        ('accounts', '0011_change_pw__to__update_profile'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX {index} ON {table} (UPPER({column}::text));'.format(
+                index=index, table=TABLE_NAME, column=column),
+            reverse_sql='DROP INDEX {index};'.format(index=index)
+        )
+        for index, column in INDEXES
+    ]
@@ -1,6 +1,7 @@
 from buckets.fields import S3FileField
 from datetime import datetime, timezone, timedelta
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.dispatch import receiver
 from django.utils.translation import ugettext as _
@@ -9,7 +10,7 @@ from django.template.loader import render_to_string
 import django.contrib.auth.models as auth
 import django.contrib.auth.base_user as auth_base
 from allauth.account.signals import password_changed, password_reset
-from tutelary.models import Policy
+from tutelary.models import CACHED_PSET_PROPERTY_KEY, PermissionSet, Policy
 from tutelary.decorators import permissioned_model
 from django_otp.models import Device
 from django_otp.oath import TOTP
@@ -20,6 +21,9 @@ import time
 
 from simple_history.models import HistoricalRecords
 from .manager import UserManager
+from .permissions import (PermissionSetTreeDescriptor,
+                          bump_permissions_version, get_policy,
+                          get_policy_cache_key)
 from .utils import send_sms
 from . import messages as account_message
 
@@ -134,7 +138,41 @@ class User(auth_base.AbstractBaseUser, auth.PermissionsMixin):
 def assign_default_policy(sender, instance, created, **kwargs):
     if not created:
         return
-    instance.assign_policies(Policy.objects.get(name='default'))
+    instance.assign_policies(get_policy('default'))
+
+
+# Load the permission trees of users from the cache (see accounts.permissions)
+setattr(User, CACHED_PSET_PROPERTY_KEY, PermissionSetTreeDescriptor())
+setattr(auth.AnonymousUser, CACHED_PSET_PROPERTY_KEY,
+        PermissionSetTreeDescriptor())
+
+
+@receiver(models.signals.m2m_changed, sender=PermissionSet.users.through)
+def clear_user_permissions(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    # Policies are assigned to a user by moving the user to another
+    # permission set
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        bump_permissions_version(instance.pk)
+    else:
+        if action == 'pre_clear':
+            pk_set = instance.users.values_list('pk', flat=True)
+        for user_id in pk_set:
+            bump_permissions_version(user_id)
+
+
+@receiver(models.signals.post_save, sender=PermissionSet)
+def clear_anonymous_permissions(sender, instance, **kwargs):
+    if instance.anonymous_user:
+        bump_permissions_version(None)
+
+
+@receiver(models.signals.post_save, sender=Policy)
+@receiver(models.signals.post_delete, sender=Policy)
+def clear_policy(sender, instance, **kwargs):
+    cache.delete(get_policy_cache_key(instance.name))
 
 
 @receiver(password_changed)
@@ -0,0 +1,100 @@
+"""
+Cached evaluation of tutelary permissions.
+
+Tutelary memoises the permission tree of a user on the user instance, so it
+is loaded once per request, and caches the compiled tree of each permission
+set. Finding the permission set of a user still takes a query on every
+request. The permission set ID is therefore cached per user, under a
+version stamp that changes whenever policies are assigned to the user.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from tutelary.models import CACHED_PSET_PROPERTY_KEY, PermissionSet, Policy
+
+
+def get_policy_cache_key(name):
+    return 'accounts:policy:{}'.format(name)
+
+
+def get_permissions_version_key(user_id):
+    # The anonymous user has no ID
+    return 'accounts:permissions:version:{}'.format(user_id or 'anon')
+
+
+def get_permission_set_cache_key(user_id, version):
+    return 'accounts:permissions:pset:{}:{}'.format(
+        user_id or 'anon', version)
+
+
+def get_policy(name):
+    """Returns the tutelary ``Policy`` called ``name``."""
+    key = get_policy_cache_key(name)
+    policy = cache.get(key)
+    if policy is None:
+        policy = Policy.objects.get(name=name)
+        cache.set(key, policy, settings.PERMISSIONS_CACHE_TIMEOUT)
+    return policy
+
+
+def get_permissions_version(user_id):
+    return cache.get_or_set(get_permissions_version_key(user_id),
+                            lambda: uuid4().hex,
+                            settings.PERMISSIONS_CACHE_TIMEOUT)
+
+
+def bump_permissions_version(user_id):
+    """
+    Invalidates the cached permissions of a user (or the anonymous user if
+    ``user_id`` is ``None``). The next request gets a new version stamp.
+    """
+    cache.delete(get_permissions_version_key(user_id))
+
+
+def get_permission_set_tree(user):
+    """
+    Returns the permission tree of ``user``, or ``None`` if no policies are
+    assigned to the user.
+    """
+    user_id = user.pk
+    key = get_permission_set_cache_key(user_id,
+                                       get_permissions_version(user_id))
+    pset_id = cache.get(key)
+    if pset_id is None:
+        if user_id is None:
+            psets = PermissionSet.objects.filter(anonymous_user=True)
+        else:
+            psets = user.permissionset.all()
+        pset_id = psets.values_list('id', flat=True).first()
+        if pset_id is None:
+            return None
+        cache.set(key, pset_id, settings.PERMISSIONS_CACHE_TIMEOUT)
+    return PermissionSet(pk=pset_id).tree()
+
+
+class PermissionSetTreeDescriptor:
+    """
+    Stands in for the attribute tutelary memoises the permission tree on
+    (``CACHED_PSET_PROPERTY_KEY``), so that the tree is loaded through
+    ``get_permission_set_tree`` the first time a request checks a
+    permission.
+    """
+    attname = '_permission_set_tree'
+
+    def __get__(self, user, owner=None):
+        if user is None:
+            return self
+        if self.attname not in user.__dict__:
+            tree = get_permission_set_tree(user)
+            if tree is None:
+                # Let tutelary handle users without a permission set
+                raise AttributeError(CACHED_PSET_PROPERTY_KEY)
+            user.__dict__[self.attname] = tree
+        return user.__dict__[self.attname]
+
+    def __set__(self, user, tree):
+        user.__dict__[self.attname] = tree
+
+    def __delete__(self, user):
+        user.__dict__.pop(self.attname, None)
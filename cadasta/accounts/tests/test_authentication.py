@@ -0,0 +1,88 @@
+import base64
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from core.tests.utils.cases import UserTestCase
+from ..authentication import (CachedBasicAuthentication,
+                              get_credentials_cache_key)
+from .factories import UserFactory
+
+
+@override_settings(CACHES=dict(
+    settings.CACHES,
+    default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+))
+class CachedBasicAuthenticationTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = UserFactory.create(
+            username='kindofblue',
+            email='miles@davis.co',
+            password='PlayTh3Trumpet!'
+        )
+        self.auth = CachedBasicAuthentication()
+
+    def authenticate(self, userid, password):
+        credentials = '{}:{}'.format(userid, password).encode()
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION='Basic {}'.format(
+                base64.b64encode(credentials).decode()))
+        return self.auth.authenticate(request)
+
+    def test_authenticate(self):
+        user, _ = self.authenticate('kindofblue', 'PlayTh3Trumpet!')
+        assert user == self.user
+        assert cache.get(get_credentials_cache_key(
+            'kindofblue', 'PlayTh3Trumpet!')) is not None
+
+    def test_authenticate_with_email(self):
+        user, _ = self.authenticate('miles@davis.co', 'PlayTh3Trumpet!')
+        assert user == self.user
+
+    def test_credentials_are_not_stored(self):
+        self.authenticate('kindofblue', 'PlayTh3Trumpet!')
+        key = get_credentials_cache_key('kindofblue', 'PlayTh3Trumpet!')
+        assert 'kindofblue' not in key
+        assert 'PlayTh3Trumpet!' not in key
+        assert 'PlayTh3Trumpet!' not in str(cache.get(key))
+        assert self.user.password not in str(cache.get(key))
+
+    def test_cached_credentials_are_not_hashed_again(self):
+        self.authenticate('kindofblue', 'PlayTh3Trumpet!')
+        with patch('rest_framework.authentication.authenticate') as auth:
+            user, _ = self.authenticate('kindofblue', 'PlayTh3Trumpet!')
+        assert user == self.user
+        assert auth.call_count == 0
+
+    def test_invalid_credentials_are_not_cached(self):
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate('kindofblue', 'wrong')
+        assert cache.get(get_credentials_cache_key(
+            'kindofblue', 'wrong')) is None
+
+    def test_password_change(self):
+        self.authenticate('kindofblue', 'PlayTh3Trumpet!')
+        self.user.set_password('N3wPassw0rd!')
+        self.user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate('kindofblue', 'PlayTh3Trumpet!')
+        assert cache.get(get_credentials_cache_key(
+            'kindofblue', 'PlayTh3Trumpet!')) is None
+        user, _ = self.authenticate('kindofblue', 'N3wPassw0rd!')
+        assert user == self.user
+
+    def test_inactive_user(self):
+        self.authenticate('kindofblue', 'PlayTh3Trumpet!')
+        self.user.is_active = False
+        self.user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate('kindofblue', 'PlayTh3Trumpet!')
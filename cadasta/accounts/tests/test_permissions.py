@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from tutelary.models import Policy, check_perms
+
+from core.tests.utils.cases import UserTestCase
+from ..models import User
+from ..permissions import (get_permission_set_tree, get_permissions_version,
+                           get_policy)
+from .factories import UserFactory
+
+
+@override_settings(CACHES=dict(
+    settings.CACHES,
+    default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+))
+class PermissionsCacheTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = UserFactory.create()
+
+    def test_get_policy(self):
+        policy = get_policy('default')
+        assert policy == Policy.objects.get(name='default')
+        with self.assertNumQueries(0):
+            assert get_policy('default') == policy
+
+    def test_policy_change_clears_cache(self):
+        policy = get_policy('default')
+        policy.body = '{"clause": []}'
+        policy.save()
+        assert get_policy('default').body == '{"clause": []}'
+
+    def test_permission_set_tree_is_cached(self):
+        get_permission_set_tree(self.user)
+        user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(0):
+            assert check_perms(user, ('org.list',), [None]) is True
+
+    def test_anonymous_permission_set_tree_is_cached(self):
+        get_permission_set_tree(AnonymousUser())
+        with self.assertNumQueries(0):
+            user = AnonymousUser()
+            assert check_perms(user, ('org.list',), [None]) is True
+            assert check_perms(user, ('user.list',), [None]) is False
+
+    def test_permission_set_tree_is_memoised_on_user(self):
+        check_perms(self.user, ('org.list',), [None])
+        cache.clear()
+        with self.assertNumQueries(0):
+            assert check_perms(self.user, ('org.list',), [None]) is True
+
+    def test_policy_assignment_bumps_version(self):
+        version = get_permissions_version(self.user.id)
+        assert check_perms(self.user, ('user.list',), [None]) is False
+
+        self.user.assign_policies(get_policy('default'),
+                                  get_policy('superuser'))
+        assert get_permissions_version(self.user.id) != version
+        user = User.objects.get(id=self.user.id)
+        assert check_perms(user, ('user.list',), [None]) is True
+
+    def test_user_without_policies(self):
+        self.user.permissionset.clear()
+        user = User.objects.get(id=self.user.id)
+        assert get_permission_set_tree(user) is None
+        assert check_perms(user, ('org.list',), [None]) is False
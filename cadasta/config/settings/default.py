@@ -98,7 +98,7 @@ MIDDLEWARE_CLASSES = (
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.TokenAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        'accounts.authentication.CachedBasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework_tmp_scoped_token.TokenAuth',
     ),
@@ -588,6 +588,66 @@ IMPORTERS = {
     'xls': 'organization.importers.xls.XLSImporter'
 }
 
+# Number of records written per bulk insert when importing data; set to
+# None to create records one by one
+IMPORT_BATCH_SIZE = 1000
+
+# Number of projects whose schema attributes are kept in each process, and
+# for how many seconds (see core.schema_cache)
+SCHEMA_CACHE_SIZE = 256
+SCHEMA_CACHE_TIMEOUT = 300
+
+# Number of seconds clients may use a location vector tile before
+# revalidating it
+SPATIAL_TILE_MAX_AGE = 60
+
+# Number of seconds rendered XForms and form lists are kept in the cache
+# (see xforms.views.api)
+XFORM_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Number of seconds verified HTTP Basic credentials are remembered (see
+# accounts.authentication)
+BASIC_AUTH_CACHE_TIMEOUT = 300
+
+# Number of seconds policies and the permission sets of users are kept in the
+# cache (see accounts.permissions)
+PERMISSIONS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Number of seconds the question labels and options of a questionnaire are
+# kept in the cache (see questionnaires.registry)
+QUESTION_REGISTRY_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Whether ODK submissions are queued and processed by a worker of the
+# 'xforms' queue (see xforms.tasks) instead of during the request
+XFORM_ASYNC_SUBMISSIONS = False
+
+# Sides, in pixels, of the square thumbnails created for image resources
+# (see resources.tasks)
+RESOURCE_THUMBNAIL_SIZES = (128, 512, 1024)
+
+# Whether the tracks, routes and waypoints of GPX resources are read by a
+# worker of the 'resources' queue instead of during the request, and the
+# tolerance, in degrees, tracks and routes are simplified to (None keeps
+# every point)
+RESOURCE_ASYNC_GPX = False
+GPX_SIMPLIFY_TOLERANCE = None
+
+# Tolerance, in degrees, project extents on the dashboard map are simplified
+# to, for how many seconds the features of public projects are cached, and
+# for how many seconds clients may use them before revalidating (see
+# organization.extents)
+DASHBOARD_EXTENT_TOLERANCE = 0.001
+DASHBOARD_EXTENTS_CACHE_TIMEOUT = 60 * 60 * 24
+DASHBOARD_EXTENTS_MAX_AGE = 60
+
+# Maximum number of changes per entity type returned by one project sync, and
+# the number of seconds of changes that are sent again on the next sync, in
+# case transactions that were open commit changes stamped before the sync.
+# Changes since the start of the oldest open transaction that has written
+# are always sent again (see organization.sync)
+SYNC_CHANGES_LIMIT = 1000
+SYNC_CHANGES_OVERLAP = 60
+
 ES_SCHEME = 'http'
 ES_HOST = 'localhost'
 ES_PORT = '9200'
@@ -1,12 +1,11 @@
 from django.forms import Form, ModelForm, MultipleChoiceField, CharField
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
-from django.utils.translation import get_language
 from jsonattrs.mixins import template_xlang_labels
 from jsonattrs.forms import form_field_from_name
 
 from core.validators import sanitize_string
-from questionnaires.models import Questionnaire, Question, QuestionOption
+from questionnaires.registry import get_registry
 from .mixins import SchemaSelectorMixin
 from .widgets import XLangSelect, XLangSelectMultiple
 from .messages import SANITIZE_ERROR
@@ -15,25 +14,10 @@ from .messages import SANITIZE_ERROR
 def get_types(question_name, default, questionnaire_id=None,
               include_labels=False):
     types = []
-    if questionnaire_id:
-        try:
-            question = Question.objects.get(
-                name=question_name,
-                questionnaire=questionnaire_id)
-        except Question.DoesNotExist:
-            pass
-        else:
-            options = QuestionOption.objects.filter(
-                question=question).values_list('name', 'label_xlat')
-
-            lang = get_language()
-            default_lang = question.questionnaire.default_language
-
-            for key, label in options:
-                if isinstance(label, dict):
-                    label = label.get(lang, label.get(default_lang))
-
-                types.append((key, label))
+    registry = get_registry(questionnaire_id)
+    if registry is not None:
+        for key, label in registry.get_options(question_name).items():
+            types.append((key, registry.translate(label)))
 
     if not types:
         types = default
@@ -48,35 +32,33 @@ class AttributeFormMixin(SchemaSelectorMixin):
     def set_standard_field(self, name, empty_choice=None, field_name=None):
         if not field_name:
             field_name = name
-        q = Questionnaire.objects.get(id=self.project.current_questionnaire)
-        default_lang = q.default_language
-        try:
-            question = Question.objects.get(name=name, questionnaire=q)
-            self.fields[field_name].labels_xlang = template_xlang_labels(
-                question.label_xlat)
-
-            if question.has_options:
-                choices = QuestionOption.objects.filter(
-                    question=question).values_list('name', 'label_xlat')
-
-                try:
-                    choices, xlang_labels = zip(
-                        *[((c[0], c[1].get(default_lang)),
-                           (c[0], c[1])) for c in choices])
-                except AttributeError:
-                    choices = choices
-                    xlang_labels = ''
-
-                choices = ([('', empty_choice)] + list(choices)
-                           if empty_choice else list(choices))
-                self.fields[field_name].choices = choices
-                self.fields[field_name].widget = XLangSelect(
-                    attrs=self.fields[field_name].widget.attrs,
-                    choices=choices,
-                    xlang_labels=dict(xlang_labels)
-                )
-        except Question.DoesNotExist:
-            pass
+        registry = get_registry(self.project.current_questionnaire)
+        if registry is None or name not in registry:
+            return
+
+        default_lang = registry.default_language
+        self.fields[field_name].labels_xlang = template_xlang_labels(
+            registry.get_label_xlat(name))
+
+        if registry.has_options(name):
+            choices = registry.get_options(name).items()
+
+            try:
+                choices, xlang_labels = zip(
+                    *[((c[0], c[1].get(default_lang)),
+                       (c[0], c[1])) for c in choices])
+            except AttributeError:
+                choices = choices
+                xlang_labels = ''
+
+            choices = ([('', empty_choice)] + list(choices)
+                       if empty_choice else list(choices))
+            self.fields[field_name].choices = choices
+            self.fields[field_name].widget = XLangSelect(
+                attrs=self.fields[field_name].widget.attrs,
+                choices=choices,
+                xlang_labels=dict(xlang_labels)
+            )
 
     def create_model_fields(self, field_prefix, attribute_map, new_item=False):
         for selector, attributes in attribute_map.items():
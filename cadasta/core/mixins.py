@@ -3,11 +3,17 @@ from collections import OrderedDict
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.urlresolvers import reverse
+from django.db.models import Q, QuerySet
 from django.shortcuts import redirect
 from django.utils.translation import gettext as _
 from jsonattrs.models import Schema, compose_schemas
 from tutelary import mixins
+from tutelary.engine import Action, Object
+from tutelary.models import check_perms
+
+from .schema_cache import schema_cache
 
 
 class PermissionRequiredMixin(mixins.PermissionRequiredMixin):
@@ -53,6 +59,68 @@ class LoginPermissionRequiredMixin(PermissionRequiredMixin,
     pass
 
 
+def allowed_on_all(user, action, model):
+    """
+    Returns ``True`` if the permission tree of ``user`` allows ``action`` on
+    every object of ``model``: it is allowed on the wildcard object path of
+    the model and no deny clause overrides it for some of the objects.
+    """
+    try:
+        tree = user.permset_tree
+    except ObjectDoesNotExist:
+        return False
+    pattern = Object([pf if isinstance(pf, str) else '*'
+                      for pf in model.TutelaryMeta.pfs])
+    if not tree.allow(Action(action), pattern):
+        return False
+
+    key = Action(action).components + pattern.components
+    for path in tree.tree:
+        if len(path) != len(key):
+            continue
+        overlaps = all(p == k or '*' in (p, k) for p, k in zip(path, key))
+        if overlaps and tree.tree.find(path, perfect=True)[0] == 'deny':
+            return False
+    return True
+
+
+class PublicPermissionsFilterMixin:
+    """
+    Selects the objects matching ``permission_filter_public`` in SQL when a
+    list is filtered with a callable ``permission_filter_queryset``, if the
+    policies of the user allow ``permission_filter_public_actions`` on every
+    object. Only the remaining objects are checked one by one; otherwise,
+    all objects are.
+    """
+    permission_filter_public = None
+    permission_filter_public_actions = ()
+
+    def perms_filter_queryset(self, objs):
+        public = self.permission_filter_public
+        public_actions = self.permission_filter_public_actions
+        if (public is None or not public_actions or
+                not isinstance(objs, QuerySet) or
+                not callable(self.permission_filter_queryset)):
+            return super().perms_filter_queryset(objs)
+
+        user = self.request.user
+        method = self.request.method
+        actions = self.get_permission_required()
+        if not check_perms(user, actions, [None], method):
+            return super().perms_filter_queryset(objs)
+        if not all(allowed_on_all(user, action, objs.model)
+                   for action in public_actions):
+            return super().perms_filter_queryset(objs)
+
+        def check_one(obj):
+            check_actions = self.permission_filter_queryset(self, obj)
+            return check_perms(user, actions + check_actions, [obj], method)
+
+        permitted = [obj.pk for obj in objs.exclude(public) if check_one(obj)]
+        self.filtered_queryset = self.get_queryset().filter(
+            Q(pk__in=permitted) | public)
+
+
 def update_permissions(permission, obj=None):
     def set_permissions(self, request, view=None):
         if (hasattr(self, 'get_organization') and
@@ -69,6 +137,9 @@ def update_permissions(permission, obj=None):
 class SchemaSelectorMixin():
 
     def get_attributes(self, project):
+        return schema_cache.get(project, self.build_attributes)
+
+    def build_attributes(self, project):
         content_type_to_selectors = self._get_content_types_to_selectors()
 
         attributes_for_models = {}
@@ -128,6 +199,6 @@ class SchemaSelectorMixin():
         for k, v in settings.JSONATTRS_SCHEMA_SELECTORS.items():
             a, m = k.split('.')
             content_type_to_selectors[
-                ContentType.objects.get(app_label=a, model=m)
+                ContentType.objects.get_by_natural_key(a, m)
             ] = v
         return content_type_to_selectors
@@ -1,10 +1,12 @@
 import itertools
 import math
 from core.util import slugify
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
 
 from .util import random_id, ID_FIELD_LENGTH
 
+RANDOM_ID_ATTEMPTS = 3
+
 
 class RandomIDModel(models.Model):
     id = models.CharField(primary_key=True, max_length=ID_FIELD_LENGTH)
@@ -13,19 +15,27 @@ class RandomIDModel(models.Model):
         abstract = True
 
     def save(self, *args, **kwargs):
-        if not self.id:
-            kwargs['force_insert'] = True
-
-            ok = False
-            while not ok:
-                self.id = random_id()
-
-                if not type(self).objects.filter(pk=self.id).exists():
-                    ok = True
-                    super(RandomIDModel, self).save(*args, **kwargs)
-
-        else:
+        if self.id:
             super(RandomIDModel, self).save(*args, **kwargs)
+            return
+
+        # IDs are random enough not to be checked before inserting. If an ID
+        # is taken anyway, the insert is retried with another one, unless
+        # the failed insert has aborted the surrounding transaction.
+        kwargs['force_insert'] = True
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        for attempt in range(RANDOM_ID_ATTEMPTS):
+            self.id = random_id()
+            try:
+                super(RandomIDModel, self).save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if (attempt == RANDOM_ID_ATTEMPTS - 1 or
+                        transaction.get_connection(using).in_atomic_block or
+                        not type(self).objects.using(using).filter(
+                            pk=self.id).exists()):
+                    raise
 
 
 class SlugModel:
@@ -0,0 +1,212 @@
+"""
+Keyset (cursor) pagination for long API lists.
+
+Clients opt in by passing the ``cursor`` query parameter, empty for the
+first page. Pages are then read after the last row of the previous page
+instead of skipping ``offset`` rows, so deep pages are as fast as the first
+one. Keyset pages are only linked forwards. Their ``count`` is the query
+planner's estimate unless the client asks for ``count=exact``.
+"""
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.translation import ugettext as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_QUERY_PARAM = 'cursor'
+COUNT_QUERY_PARAM = 'count'
+
+
+def encode_cursor(values):
+    values = [v.isoformat() if isinstance(v, datetime) else v
+              for v in values]
+    return base64.urlsafe_b64encode(
+        json.dumps(values).encode()).decode('ascii')
+
+
+def decode_cursor(cursor, length):
+    """
+    Returns the list of ``length`` key values encoded in ``cursor``, or
+    ``None`` for an empty cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')).decode())
+    except (TypeError, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != length:
+        raise NotFound(_("Invalid cursor."))
+    return values
+
+
+def keyset_filter(model, ordering, values):
+    """
+    Returns a filter for the rows of ``model`` that come after ``values``
+    in ``ordering`` (ascending).
+    """
+    try:
+        values = [model._meta.get_field(field).to_python(value)
+                  for field, value in zip(ordering, values)]
+    except ValidationError:
+        raise NotFound(_("Invalid cursor."))
+
+    after = Q()
+    for i, field in enumerate(ordering):
+        clause = Q(**{field + '__gt': values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            clause &= Q(**{previous: value})
+        after |= clause
+    # The redundant bound on the first column lets Postgres scan the index
+    # from the cursor onwards
+    return Q(**{ordering[0] + '__gte': values[0]}) & after
+
+
+def estimate_count(queryset):
+    """Returns the query planner's estimate of the rows in ``queryset``."""
+    if isinstance(queryset, list):
+        return len(queryset)
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def get_count(request, queryset):
+    """
+    Returns the number of rows in ``queryset`` and whether the number is
+    exact or estimated.
+    """
+    if request.query_params.get(COUNT_QUERY_PARAM) == 'exact':
+        if isinstance(queryset, list):
+            return len(queryset), True
+        return queryset.count(), True
+    return estimate_count(queryset), False
+
+
+def get_cursor_link(request, values):
+    if values is None:
+        return None
+    url = request.build_absolute_uri()
+    return replace_query_param(url, CURSOR_QUERY_PARAM, encode_cursor(values))
+
+
+def get_keyset_response_data(count, count_exact, next_link, results):
+    return OrderedDict([
+        ('count', count),
+        ('count_exact', count_exact),
+        ('next', next_link),
+        ('results', results),
+    ])
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination that switches to keyset pagination when the
+    ``cursor`` parameter is given. Keyset pages are ordered by the view's
+    ``cursor_ordering``, which must end with a unique field, and ignore
+    any ``ordering`` requested by the client.
+    """
+    cursor_ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = CURSOR_QUERY_PARAM in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.ordering = getattr(view, 'cursor_ordering', self.cursor_ordering)
+        self.count, self.count_exact = get_count(request, queryset)
+
+        values = decode_cursor(request.query_params[CURSOR_QUERY_PARAM],
+                               len(self.ordering))
+        queryset = queryset.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(
+                keyset_filter(queryset.model, self.ordering, values))
+
+        rows = list(queryset[:self.limit + 1])
+        self.page = rows[:self.limit]
+        self.has_next = len(rows) > self.limit
+        return self.page
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        return get_cursor_link(
+            self.request, [getattr(last, field) for field in self.ordering])
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(get_keyset_response_data(
+            self.count, self.count_exact, self.get_next_link(), data))
+
+
+def paginate_keyset_results(request, *qs_serializers):
+    """
+    Keyset version of ``core.util.paginate_results``. The querysets are
+    listed one after the other, each ordered by ID; the cursor holds the
+    index of the queryset and the last ID read from it.
+    """
+    limit = KeysetPagination().get_limit(request)
+    values = decode_cursor(request.query_params.get(CURSOR_QUERY_PARAM), 2)
+    start, last_id = values if values is not None else (0, None)
+    if not isinstance(start, int):
+        raise NotFound(_("Invalid cursor."))
+
+    count = 0
+    count_exact = True
+    out = []
+    next_values = None
+    for index, (qs, serializer) in enumerate(qs_serializers):
+        qs_count, qs_count_exact = get_count(request, qs)
+        count += qs_count
+        count_exact = count_exact and qs_count_exact
+        if index < start or len(out) == limit:
+            continue
+
+        after = last_id if index == start else None
+        if isinstance(qs, list):
+            rows = sorted((obj for obj in qs
+                           if after is None or obj.id > after),
+                          key=lambda obj: obj.id)
+        else:
+            qs = qs.order_by('id')
+            if after is not None:
+                qs = qs.filter(id__gt=after)
+            rows = qs[:limit - len(out) + 1]
+        rows = list(rows)
+
+        remaining = limit - len(out)
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            next_values = [index, rows[-1].id]
+        elif len(rows) == remaining and index + 1 < len(qs_serializers):
+            next_values = [index + 1, None]
+        if rows:
+            out += serializer(rows, many=True).data
+
+    return get_keyset_response_data(
+        count, count_exact, get_cursor_link(request, next_values), out)
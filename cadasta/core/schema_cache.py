@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from jsonattrs.models import Attribute
+
+
+class SchemaCache:
+    """
+    Caches the schema attributes of a project, as returned by
+    ``SchemaSelectorMixin.get_attributes``, keyed by project ID and current
+    questionnaire.
+
+    There are two tiers: an in-process LRU, whose entries expire after
+    ``SCHEMA_CACHE_TIMEOUT`` seconds, and the ``jsonattrs`` Django cache,
+    which is shared by all processes and is cleared by jsonattrs whenever a
+    schema is saved. Attributes are stored serialized, so every caller gets
+    its own instances.
+    """
+
+    def __init__(self, size=None, timeout=None):
+        self.size = size or settings.SCHEMA_CACHE_SIZE
+        self.timeout = timeout or settings.SCHEMA_CACHE_TIMEOUT
+        self.counters = Counter()
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, project_id, questionnaire_id):
+        return 'core:schema_attrs:{}:{}'.format(project_id, questionnaire_id)
+
+    def get(self, project, build):
+        """
+        Returns the schema attributes of ``project``, calling ``build`` with
+        the project if they are not cached.
+        """
+        key = self.key(project.id, project.current_questionnaire)
+
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._lru.move_to_end(key)
+                self.counters['lru_hits'] += 1
+                return deserialize(entry[1])
+
+        serialized = caches['jsonattrs'].get(key)
+        if serialized is not None:
+            self.counters['cache_hits'] += 1
+        else:
+            self.counters['misses'] += 1
+            serialized = serialize(build(project))
+            caches['jsonattrs'].set(key, serialized)
+
+        self._store(key, serialized)
+        return deserialize(serialized)
+
+    def _store(self, key, serialized):
+        with self._lock:
+            self._lru[key] = (time.monotonic() + self.timeout, serialized)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.size:
+                self._lru.popitem(last=False)
+
+    def invalidate(self, project_id=None, questionnaire_id=None):
+        """
+        Removes cached attributes of a project, or of all projects if
+        ``project_id`` is not given. If ``questionnaire_id`` is not given,
+        the in-process entries of the project for all questionnaires are
+        removed, but the shared cache is left to expire or to be cleared by
+        jsonattrs.
+        """
+        self.counters['invalidations'] += 1
+        with self._lock:
+            if project_id is None:
+                self._lru.clear()
+                return
+            prefix = self.key(project_id, '')
+            for key in [k for k in self._lru if k.startswith(prefix)]:
+                del self._lru[key]
+        if questionnaire_id is not None:
+            caches['jsonattrs'].delete(self.key(project_id, questionnaire_id))
+
+    def invalidate_selectors(self, selectors):
+        """
+        Removes cached attributes of the project a schema with
+        ``selectors`` belongs to: organization, project and questionnaire.
+        """
+        if len(selectors) >= 2:
+            questionnaire_id = selectors[2] if len(selectors) > 2 else None
+            self.invalidate(selectors[1], questionnaire_id)
+        else:
+            self.invalidate()
+
+    def stats(self):
+        """Returns the hit, miss and invalidation counts and LRU size."""
+        stats = {name: self.counters[name] for name in (
+            'lru_hits', 'cache_hits', 'misses', 'invalidations')}
+        stats['lru_size'] = len(self._lru)
+        return stats
+
+
+def serialize(attributes_for_models):
+    return OrderedDict(
+        (label, OrderedDict(
+            (selector, OrderedDict(
+                (name, attr.to_dict()) for name, attr in attrs.items()))
+            for selector, attrs in attributes.items()))
+        for label, attributes in attributes_for_models.items())
+
+
+def deserialize(serialized):
+    return OrderedDict(
+        (label, OrderedDict(
+            (selector, OrderedDict(
+                (name, Attribute(**attr)) for name, attr in attrs.items()))
+            for selector, attrs in attributes.items()))
+        for label, attributes in serialized.items())
+
+
+schema_cache = SchemaCache()
@@ -3,7 +3,7 @@ from django.db.models.query import QuerySet
 from django.core.exceptions import ValidationError
 from django.contrib.contenttypes.models import ContentType
 from core.mixins import SchemaSelectorMixin
-from core.validators import sanitize_string
+from core.validators import sanitize_string, sanitize_strings
 from core.messages import SANITIZE_ERROR
 from rest_framework import serializers
 
@@ -47,7 +47,7 @@ class SanitizeFieldSerializer:
                 valid = sanitize_string(value)
             elif type(field) is serializers.JSONField:
                 value = data.get(name, {}) or {}
-                valid = all(sanitize_string(value[k]) for k in value)
+                valid = sanitize_strings(value)
 
             if not valid:
                 errors[name] = [SANITIZE_ERROR]
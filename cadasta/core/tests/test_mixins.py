@@ -1,21 +1,27 @@
+import json
+
 import pytest
 
+from accounts.models import User
 from accounts.tests.factories import UserFactory
 from core.tests.utils.cases import FileStorageTestCase, UserTestCase
 from core.tests.utils.files import make_dirs  # noqa
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.core.urlresolvers import reverse
 from django.http import HttpRequest
 from django.test import TestCase
 from jsonattrs.models import Attribute, Schema
-from organization.tests.factories import OrganizationFactory, ProjectFactory
+from organization.models import Organization
+from organization.tests.factories import (OrganizationFactory, ProjectFactory,
+                                          clause)
 from organization.views import default as org_views
 
 from questionnaires.models import Questionnaire
 from spatial.views.default import LocationsAdd
-from tutelary.models import assign_user_policies
+from tutelary.models import Policy, assign_user_policies
 
-from ..mixins import SchemaSelectorMixin
+from ..mixins import SchemaSelectorMixin, allowed_on_all
 
 
 class PermissionRequiredMixinTest(UserTestCase, TestCase):
@@ -156,6 +162,47 @@ class PermissionRequiredMixinTest(UserTestCase, TestCase):
         assert exp_redirect == response['location']
 
 
+class AllowedOnAllTest(UserTestCase, TestCase):
+
+    def user_with_clauses(self, *clauses):
+        policy = Policy.objects.create(
+            name='test-policy', body=json.dumps({'clause': list(clauses)}))
+        user = UserFactory.create()
+        assign_user_policies(user, policy)
+        # Fetched again, as the permission tree is memoised on the instance
+        return User.objects.get(pk=user.pk)
+
+    def test_default_policy(self):
+        user = UserFactory.create()
+        assert allowed_on_all(user, 'org.view', Organization) is True
+        assert allowed_on_all(user, 'org.update', Organization) is False
+        assert allowed_on_all(AnonymousUser(), 'org.view',
+                              Organization) is True
+
+    def test_denied_on_one_object(self):
+        user = self.user_with_clauses(
+            clause('allow', ['org.view'], ['organization/*']),
+            clause('deny', ['org.view'], ['organization/unauthorized']))
+        assert allowed_on_all(user, 'org.view', Organization) is False
+
+    def test_denied_by_action_wildcard(self):
+        user = self.user_with_clauses(
+            clause('allow', ['org.view'], ['organization/*']),
+            clause('deny', ['org.*'], ['organization/unauthorized']))
+        assert allowed_on_all(user, 'org.view', Organization) is False
+
+    def test_denied_on_other_action(self):
+        user = self.user_with_clauses(
+            clause('allow', ['org.view'], ['organization/*']),
+            clause('deny', ['org.update'], ['organization/unauthorized']))
+        assert allowed_on_all(user, 'org.view', Organization) is True
+
+    def test_allowed_on_one_object(self):
+        user = self.user_with_clauses(
+            clause('allow', ['org.view'], ['organization/authorized']))
+        assert allowed_on_all(user, 'org.view', Organization) is False
+
+
 @pytest.mark.usefixtures('make_dirs')
 class SchemaSelectorMixinTest(UserTestCase, FileStorageTestCase, TestCase):
 
@@ -1,6 +1,9 @@
-import random
+from unittest.mock import patch
+
+import pytest
+from django.db import IntegrityError, transaction
 from django.db.models import SlugField, CharField, Model
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from ..models import RandomIDModel, SlugModel
 
 
@@ -17,14 +20,33 @@ class RandomIDModelTest(TestCase):
         instance.save()
         assert instance.id is not None
 
+    def test_save_without_checking_id(self):
+        instance = MyRandomIdModel()
+        with self.assertNumQueries(1):
+            instance.save()
+
+    def test_duplicate_id_in_transaction(self):
+        MyRandomIdModel.objects.create(id='a' * 24)
+        with patch('core.models.random_id', return_value='a' * 24):
+            with pytest.raises(IntegrityError):
+                with transaction.atomic():
+                    MyRandomIdModel().save()
+
+
+class RandomIDModelRetryTest(TransactionTestCase):
+    # Restores the data created by migrations, which is removed when the
+    # test's tables are flushed
+    serialized_rollback = True
+
     def test_duplicate_ids(self):
-        random.seed(a=10)
-        instance1 = MyRandomIdModel()
-        instance1.save()
-        random.seed(a=10)
+        instance1 = MyRandomIdModel.objects.create(id='a' * 24)
         instance2 = MyRandomIdModel()
-        instance2.save()
+        with patch('core.models.random_id',
+                   side_effect=['a' * 24, 'b' * 24]):
+            instance2.save()
         assert instance1.id != instance2.id
+        assert instance2.id == 'b' * 24
+        assert MyRandomIdModel.objects.count() == 2
 
 
 class MySlugModel(SlugModel, Model):
@@ -1,11 +1,20 @@
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
 
+import pytest
 from django.test import TestCase
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 from rest_framework.test import APIRequestFactory
 from rest_framework.views import APIView
 from rest_framework.settings import api_settings
 from unittest.mock import patch, MagicMock
 
+from core.tests.utils.cases import UserTestCase
+from organization.tests.factories import ProjectFactory
+from party.models import Party
+from party.tests.factories import PartyFactory
+from ..pagination import KeysetPagination, paginate_keyset_results
 from ..util import paginate_results, get_next_link, get_previous_link
 
 
@@ -85,3 +94,87 @@ class PaginationTest(TestCase):
     def test_no_previous_link(self):
         req = self._get_request('/foo')
         assert get_previous_link(req) is None
+
+
+def get_cursor(url):
+    return parse_qs(urlparse(url).query)['cursor'][0]
+
+
+class KeysetPaginationTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        self.project = ProjectFactory.create()
+        PartyFactory.create_batch(5, project=self.project)
+        self.view = SimpleNamespace(cursor_ordering=('last_updated', 'id'))
+
+    def _get_request(self, *args, **kwargs):
+        req = self.factory.get(*args, **kwargs)
+        return APIView().initialize_request(req)
+
+    def paginate(self, params):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(
+            self.project.parties.all(), self._get_request('/foo', params),
+            self.view)
+        return paginator.get_paginated_response(
+            [party.id for party in page]).data
+
+    def test_pages(self):
+        ids = []
+        data = self.paginate({'limit': 2, 'cursor': ''})
+        while True:
+            ids += data['results']
+            if data['next'] is None:
+                break
+            data = self.paginate({'limit': 2,
+                                  'cursor': get_cursor(data['next'])})
+
+        assert ids == list(self.project.parties.order_by(
+            'last_updated', 'id').values_list('id', flat=True))
+        assert data['count_exact'] is False
+        assert 'previous' not in data
+
+    def test_pages_after_update(self):
+        data = self.paginate({'limit': 2, 'cursor': ''})
+        party = Party.objects.get(id=data['results'][0])
+        party.save()
+
+        data = self.paginate({'limit': 5, 'cursor': get_cursor(data['next'])})
+        assert data['results'][-1] == party.id
+
+    def test_exact_count(self):
+        data = self.paginate({'limit': 2, 'cursor': '', 'count': 'exact'})
+        assert data['count'] == 5
+        assert data['count_exact'] is True
+
+    def test_invalid_cursor(self):
+        with pytest.raises(NotFound):
+            self.paginate({'cursor': 'not-a-cursor'})
+
+    def test_limit_offset_without_cursor(self):
+        data = self.paginate({'limit': 2, 'offset': 2})
+        assert data['count'] == 5
+        assert len(data['results']) == 2
+        assert data['previous'] is not None
+
+    def test_paginate_keyset_results(self):
+        rels1 = [SimpleNamespace(id='a{}'.format(i)) for i in range(3)]
+        rels2 = [SimpleNamespace(id='b{}'.format(i)) for i in range(3)]
+
+        class FakeSerializer(serializers.Serializer):
+            id = serializers.CharField()
+
+        ids = []
+        params = {'limit': 2, 'cursor': '', 'count': 'exact'}
+        while True:
+            req = self._get_request('/foo', params)
+            data = paginate_keyset_results(
+                req, (rels1, FakeSerializer), (rels2, FakeSerializer))
+            assert data['count'] == 6
+            ids += [rel['id'] for rel in data['results']]
+            if data['next'] is None:
+                break
+            params['cursor'] = get_cursor(data['next'])
+
+        assert ids == ['a0', 'a1', 'a2', 'b0', 'b1', 'b2']
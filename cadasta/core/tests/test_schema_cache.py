@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock, patch
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.test import TestCase
+
+from organization.tests.factories import ProjectFactory
+from questionnaires.managers import create_attrs_schema, get_attr_type_ids
+from questionnaires.tests import attr_schemas
+from questionnaires.tests.factories import QuestionnaireFactory
+from core.tests.utils.cases import UserTestCase
+
+from ..mixins import SchemaSelectorMixin
+from ..schema_cache import SchemaCache, schema_cache
+
+
+class SchemaCacheTest(UserTestCase, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create()
+        QuestionnaireFactory.create(project=self.project)
+        create_attrs_schema(
+            project=self.project,
+            question_group_dict=attr_schemas.location_xform_group,
+            content_type=ContentType.objects.get(
+                app_label='spatial', model='spatialunit'),
+            attr_type_ids=get_attr_type_ids(),
+        )
+
+    def build(self):
+        return MagicMock(side_effect=SchemaSelectorMixin().build_attributes)
+
+    def test_get(self):
+        cache = SchemaCache(size=10, timeout=60)
+        build = self.build()
+
+        attrs = cache.get(self.project, build)
+        assert list(attrs['spatial.spatialunit']['DEFAULT'].keys()) == [
+            'quality', 'infrastructure']
+        with self.assertNumQueries(0):
+            cached = cache.get(self.project, build)
+        assert list(cached['spatial.spatialunit']['DEFAULT'].keys()) == [
+            'quality', 'infrastructure']
+        assert (cached['spatial.spatialunit']['DEFAULT']['quality'] is not
+                attrs['spatial.spatialunit']['DEFAULT']['quality'])
+
+        assert build.call_count == 1
+        assert cache.stats() == {'lru_hits': 1, 'cache_hits': 0, 'misses': 1,
+                                 'invalidations': 0, 'lru_size': 1}
+
+    def test_get_from_shared_cache(self):
+        build = self.build()
+        SchemaCache(size=10, timeout=60).get(self.project, build)
+
+        cache = SchemaCache(size=10, timeout=60)
+        attrs = cache.get(self.project, build)
+        assert 'quality' in attrs['spatial.spatialunit']['DEFAULT']
+        assert build.call_count == 1
+        assert cache.stats()['cache_hits'] == 1
+
+    def test_lru_eviction(self):
+        cache = SchemaCache(size=1, timeout=60)
+        other_project = ProjectFactory.create()
+        build = self.build()
+        cache.get(self.project, build)
+        cache.get(other_project, build)
+        assert cache.stats()['lru_size'] == 1
+
+        cache.get(self.project, build)
+        assert cache.stats()['lru_hits'] == 0
+        assert cache.stats()['cache_hits'] == 1
+
+    def test_lru_timeout(self):
+        cache = SchemaCache(size=10, timeout=60)
+        build = self.build()
+        with patch('core.schema_cache.time.monotonic', return_value=0):
+            cache.get(self.project, build)
+        with patch('core.schema_cache.time.monotonic', return_value=61):
+            cache.get(self.project, build)
+        assert cache.stats()['lru_hits'] == 0
+        assert cache.stats()['cache_hits'] == 1
+
+    def test_invalidate(self):
+        cache = SchemaCache(size=10, timeout=60)
+        build = self.build()
+        cache.get(self.project, build)
+        cache.invalidate(self.project.id, self.project.current_questionnaire)
+        assert cache.stats()['lru_size'] == 0
+        assert caches['jsonattrs'].get(cache.key(
+            self.project.id, self.project.current_questionnaire)) is None
+
+        cache.get(self.project, build)
+        assert build.call_count == 2
+
+    def test_invalidate_on_schema_change(self):
+        mixin = SchemaSelectorMixin()
+        attrs = mixin.get_attributes(self.project)
+        assert 'party.party' not in attrs or not attrs['party.party']
+
+        create_attrs_schema(
+            project=self.project,
+            question_group_dict=attr_schemas.default_party_xform_group,
+            content_type=ContentType.objects.get(
+                app_label='party', model='party'),
+            attr_type_ids=get_attr_type_ids(),
+        )
+        attrs = mixin.get_attributes(self.project)
+        assert 'notes' in attrs['party.party']['IN']
+
+    def test_new_questionnaire_is_not_cached(self):
+        mixin = SchemaSelectorMixin()
+        mixin.get_attributes(self.project)
+        QuestionnaireFactory.create(project=self.project)
+
+        attrs = mixin.get_attributes(self.project)
+        assert attrs['spatial.spatialunit'] == {}
+
+    def test_module_cache(self):
+        mixin = SchemaSelectorMixin()
+        hits = schema_cache.stats()['lru_hits']
+        mixin.get_attributes(self.project)
+        mixin.get_attributes(self.project)
+        assert schema_cache.stats()['lru_hits'] == hits + 1
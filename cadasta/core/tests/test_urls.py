@@ -16,3 +16,9 @@ class CoreUrlTest(TestCase):
 
         resolved = resolve('/dashboard/')
         assert resolved.func.__name__ == default.Dashboard.__name__
+
+    def test_dashboard_extents(self):
+        assert reverse('core:dashboard-extents') == '/dashboard/extents/'
+
+        resolved = resolve('/dashboard/extents/')
+        assert resolved.func.__name__ == default.DashboardExtents.__name__
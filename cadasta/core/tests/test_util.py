@@ -0,0 +1,23 @@
+from django.test import TestCase
+
+from ..util import ID_FIELD_LENGTH, alphabet, random_id, random_ids
+
+
+class RandomIDTest(TestCase):
+
+    def test_random_id(self):
+        rand_id = random_id()
+        assert len(rand_id) == ID_FIELD_LENGTH
+        assert set(rand_id) <= set(alphabet)
+        assert random_id() != rand_id
+
+    def test_random_ids(self):
+        ids = random_ids(50)
+        assert len(ids) == 50
+        assert len(set(ids)) == 50
+        for rand_id in ids:
+            assert len(rand_id) == ID_FIELD_LENGTH
+            assert set(rand_id) <= set(alphabet)
+
+    def test_random_ids_none(self):
+        assert random_ids(0) == []
@@ -1,7 +1,8 @@
 import pytest
 from django.test import TestCase
 from django.utils.translation import gettext as _
-from ..validators import validate_json, JsonValidationError, sanitize_string
+from ..validators import (validate_json, JsonValidationError, sanitize_string,
+                          sanitize_strings)
 
 
 class ValidationTest(TestCase):
@@ -91,3 +92,18 @@ class ValidationTest(TestCase):
         assert sanitize_string('te🍺xt') is False
         assert sanitize_string('Me & you') is True
         assert sanitize_string('🦄') is False
+        assert sanitize_string('a < b') is True
+        assert sanitize_string('<3') is True
+        assert sanitize_string('text\n🍺') is False
+        assert sanitize_string('<b>text</b>') is False
+
+    def test_sanitize_strings(self):
+        assert sanitize_strings([]) is True
+        assert sanitize_strings(['text', 2, None, '', '大家好']) is True
+        assert sanitize_strings({'name': 'text', 'notes': 'a < b'}) is True
+        assert sanitize_strings(['a <', 'b>']) is True
+        assert sanitize_strings(['text', '<script>']) is False
+        assert sanitize_strings(['text', '=1+1']) is False
+        assert sanitize_strings(['text', 'te🍺xt']) is False
+        assert sanitize_strings({'name': 'text', 'notes': '🦄'}) is False
+        assert sanitize_strings(iter(['a', 'b', '@c'])) is False
@@ -1,14 +1,16 @@
 import json
 from skivvy import ViewTestCase
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
 from django.http import HttpRequest
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from accounts.tests.factories import UserFactory
 from core.tests.utils.cases import UserTestCase
 from organization.tests.factories import OrganizationFactory, ProjectFactory
 from organization.models import OrganizationRole, Project
-from organization.serializers import ProjectGeometrySerializer
 
 from ..views.default import Dashboard, IndexPage, server_error
 
@@ -32,63 +34,131 @@ class DashboardTest(ViewTestCase, UserTestCase, TestCase):
     view_class = Dashboard
     template = 'core/dashboard.html'
 
-    def setup_models(self):
-        self.org = OrganizationFactory.create()
-        extent = ('SRID=4326;'
-                  'POLYGON ((-5.1031494140625000 8.1299292850467957, '
-                  '-5.0482177734375000 7.6837733211111425, '
-                  '-4.6746826171875000 7.8252894725496338, '
-                  '-4.8641967773437491 8.2278005261522775, '
-                  '-5.1031494140625000 8.1299292850467957))')
-        ProjectFactory.create(organization=self.org, extent=extent)
-        ProjectFactory.create(organization=self.org, extent=extent)
-        ProjectFactory.create(
-            name='Private Project',
-            access='private', organization=self.org, extent=extent)
-        ProjectFactory.create(
-            name='Archived Project', archived=True,
-            organization=self.org, extent=extent)
-
-    def _render_geojson(self, projects):
-        return json.dumps(ProjectGeometrySerializer(projects, many=True).data)
-
     def test_page_is_rendered_when_user_is_not_signed_in(self):
         response = self.request()
         assert response.status_code == 200
+        assert response.content == self.render_content(is_superuser=False)
 
     def test_page_is_rendered_when_user_is_signed_in(self):
         user = UserFactory.create()
         response = self.request(user=user)
         assert response.status_code == 200
+        assert response.content == self.render_content(is_superuser=False)
 
-    def test_private_projects_rendered_when_org_member_is_signed_in(self):
+
+@override_settings(CACHES=dict(
+    settings.CACHES,
+    default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+))
+class DashboardExtentsTest(UserTestCase, TestCase):
+    extent = ('SRID=4326;'
+              'POLYGON ((-5.1031494140625000 8.1299292850467957, '
+              '-5.0482177734375000 7.6837733211111425, '
+              '-4.6746826171875000 7.8252894725496338, '
+              '-4.8641967773437491 8.2278005261522775, '
+              '-5.1031494140625000 8.1299292850467957))')
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.org = OrganizationFactory.create()
+        ProjectFactory.create(
+            name='Public Project', organization=self.org, extent=self.extent)
+        ProjectFactory.create(name='No Extent', organization=self.org)
+        ProjectFactory.create(
+            name='Private Project',
+            access='private', organization=self.org, extent=self.extent)
+        ProjectFactory.create(
+            name='Archived Project', archived=True,
+            organization=self.org, extent=self.extent)
+
+    def get(self, user=None, **headers):
+        if user is not None:
+            self.client.force_login(user)
+        return self.client.get(reverse('core:dashboard-extents'), **headers)
+
+    def get_names(self, response):
+        content = json.loads(response.content.decode())
+        assert content['type'] == 'FeatureCollection'
+        return sorted(f['properties']['name'] for f in content['features'])
+
+    def test_get_when_user_is_not_signed_in(self):
+        response = self.get()
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/json'
+        assert self.get_names(response) == ['Public Project']
+        assert response['ETag']
+        assert 'public' in response['Cache-Control']
+        assert 'max-age=60' in response['Cache-Control']
+
+    def test_features(self):
+        content = json.loads(self.get().content.decode())
+        project = Project.objects.get(name='Public Project')
+        feature = content['features'][0]
+        assert feature['geometry']['type'] == 'Polygon'
+        assert feature['properties'] == {
+            'name': 'Public Project',
+            'org': self.org.name,
+            'url': reverse('organization:project-dashboard',
+                           kwargs={'organization': self.org.slug,
+                                   'project': project.slug}),
+        }
+
+    def test_private_projects_returned_when_org_member_is_signed_in(self):
         user = UserFactory.create()
         OrganizationRole.objects.create(organization=self.org, user=user)
-        response = self.request(user=user)
-
-        gj = self._render_geojson(Project.objects.filter(archived=False))
-        expected_content = self.render_content(is_superuser=False, geojson=gj)
+        response = self.get(user=user)
         assert response.status_code == 200
-        assert response.content == expected_content
+        assert self.get_names(response) == ['Private Project',
+                                            'Public Project']
+        assert 'private' in response['Cache-Control']
 
-    def test_private_projects_not_rendered_when_not_an_org_member(self):
+    def test_private_projects_not_returned_when_not_an_org_member(self):
         user = UserFactory.create()
-        response = self.request(user=user)
-
-        gj = self._render_geojson(Project.objects.filter(access='public',
-                                                         archived=False))
-        expected_content = self.render_content(is_superuser=False, geojson=gj)
+        response = self.get(user=user)
         assert response.status_code == 200
-        assert response.content == expected_content
+        assert self.get_names(response) == ['Public Project']
 
     def test_get_with_superuser(self):
         superuser = UserFactory.create(is_superuser=True)
-        response = self.request(user=superuser)
-
-        gj = self._render_geojson(Project.objects.all())
-        expected_content = self.render_content(is_superuser=True, geojson=gj)
-        assert response.content == expected_content
+        response = self.get(user=superuser)
+        assert response.status_code == 200
+        assert self.get_names(response) == ['Archived Project',
+                                            'Private Project',
+                                            'Public Project']
+
+    def test_public_features_are_cached(self):
+        self.get()
+        with self.assertNumQueries(0):
+            response = self.get()
+        assert self.get_names(response) == ['Public Project']
+
+    def test_get_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+        project = Project.objects.get(name='Private Project')
+        project.access = 'public'
+        project.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
         assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert self.get_names(response) == ['Private Project',
+                                            'Public Project']
+
+    def test_organization_change_clears_cache(self):
+        self.get()
+        self.org.name = 'Renamed Org'
+        self.org.save()
+        content = json.loads(self.get().content.decode())
+        assert content['features'][0]['properties']['org'] == 'Renamed Org'
+
+    def test_organization_delete_clears_cache(self):
+        self.get()
+        self.org.delete()
+        assert self.get_names(self.get()) == []
 
 
 class ServerErrorTest(TestCase):
@@ -5,4 +5,6 @@ from core.views import default
 urlpatterns = [
     url(r'^$', default.IndexPage.as_view(), name='index'),
     url(r'^dashboard/$', default.Dashboard.as_view(), name='dashboard'),
+    url(r'^dashboard/extents/$', default.DashboardExtents.as_view(),
+        name='dashboard-extents'),
 ]
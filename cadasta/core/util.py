@@ -1,5 +1,5 @@
 from collections import OrderedDict
-import random
+import os
 import string
 
 import django.utils.text as base_utils
@@ -19,9 +19,25 @@ def byte_to_base32_chr(byte):
     return alphabet[byte & 31]
 
 
+# Maps every byte to a character of the alphabet, so that random bytes can
+# be turned into an ID with bytes.translate
+id_table = ''.join(map(byte_to_base32_chr, range(256))).encode('ascii')
+
+
 def random_id():
-    rand_id = [random.randint(0, 0xFF) for i in range(ID_FIELD_LENGTH)]
-    return ''.join(map(byte_to_base32_chr, rand_id))
+    """
+    Returns a random ID of ``ID_FIELD_LENGTH`` characters, read from the
+    operating system's random source. IDs carry 120 bits of entropy, so
+    they can be inserted without checking that they are not taken.
+    """
+    return os.urandom(ID_FIELD_LENGTH).translate(id_table).decode('ascii')
+
+
+def random_ids(n):
+    """Returns a list of ``n`` random IDs, generated at once."""
+    ids = os.urandom(ID_FIELD_LENGTH * n).translate(id_table).decode('ascii')
+    return [ids[i:i + ID_FIELD_LENGTH]
+            for i in range(0, len(ids), ID_FIELD_LENGTH)]
 
 
 def slugify(text, max_length=None, allow_unicode=False):
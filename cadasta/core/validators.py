@@ -32,91 +32,98 @@ def validate_json(value, schema):
         raise JsonValidationError(message_dict)
 
 
-emojis = re.compile(
-    u'.*[\U0001F004\U0001F0CF\U0001F170-\U0001F171\U0001F17E\U0001F17F'
-    '\U0001F18E\U0001F191-\U0001F19A\U0001F1E6-\U0001F1FF'
-    '\U0001F201-\U0001F202\U0001F21A\U0001F22F\U0001F232-\U0001F23A'
-    '\U0001F250-\U0001F251\U0001F300-\U0001F320\U0001F321\U0001F324-\U0001F32C'
-    '\U0001F32D-\U0001F32F\U0001F330-\U0001F335\U0001F336\U0001F337-\U0001F37C'
-    '\U0001F37D\U0001F37E-\U0001F37F\U0001F380-\U0001F393\U0001F396-\U0001F397'
-    '\U0001F399-\U0001F39B\U0001F39E-\U0001F39F\U0001F3A0-\U0001F3C4\U0001F3C5'
-    '\U0001F3C6-\U0001F3CA\U0001F3CB-\U0001F3CE\U0001F3CF-\U0001F3D3'
-    '\U0001F3D4-\U0001F3DF\U0001F3E0-\U0001F3F0\U0001F3F3-\U0001F3F5\U0001F3F7'
-    '\U0001F3F8-\U0001F3FF\U0001F400-\U0001F43E\U0001F43F\U0001F440\U0001F441'
-    '\U0001F442-\U0001F4F7\U0001F4F8\U0001F4F9-\U0001F4FC\U0001F4FD\U0001F4FF'
-    '\U0001F500-\U0001F53D\U0001F549-\U0001F54A\U0001F54B-\U0001F54E'
-    '\U0001F550-\U0001F567\U0001F56F-\U0001F570\U0001F573-\U0001F579\U0001F57A'
-    '\U0001F587\U0001F58A-\U0001F58D\U0001F590\U0001F595-\U0001F596\U0001F5A4'
-    '\U0001F5A5\U0001F5A8\U0001F5B1-\U0001F5B2\U0001F5BC\U0001F5C2-\U0001F5C4'
-    '\U0001F5D1-\U0001F5D3\U0001F5DC-\U0001F5DE\U0001F5E1\U0001F5E3\U0001F5E8'
-    '\U0001F5EF\U0001F5F3\U0001F5FA\U0001F5FB-\U0001F5FF\U0001F600'
-    '\U0001F601-\U0001F610\U0001F611\U0001F612-\U0001F614\U0001F615\U0001F616'
-    '\U0001F617\U0001F618\U0001F619\U0001F61A\U0001F61B\U0001F61C-\U0001F61E'
-    '\U0001F61F\U0001F620-\U0001F625\U0001F626-\U0001F627\U0001F628-\U0001F62B'
-    '\U0001F62C\U0001F62D\U0001F62E-\U0001F62F\U0001F630-\U0001F633\U0001F634'
-    '\U0001F635-\U0001F640\U0001F641-\U0001F642\U0001F643-\U0001F644'
-    '\U0001F645-\U0001F64F\U0001F680-\U0001F6C5\U0001F6CB-\U0001F6CF\U0001F6D0'
-    '\U0001F6D1-\U0001F6D2\U0001F6E0-\U0001F6E5\U0001F6E9\U0001F6EB-\U0001F6EC'
-    '\U0001F6F0\U0001F6F3\U0001F6F4-\U0001F6F6\U0001F6F7-\U0001F6F8\U0001F910-'
-    '\U0001F918\U0001F919-\U0001F91E\U0001F91F\U0001F920-\U0001F927\U0001F928-'
-    '\U0001F92F\U0001F930\U0001F931-\U0001F932\U0001F933-\U0001F93A\U0001F93C-'
-    '\U0001F93E\U0001F940-\U0001F945\U0001F947-\U0001F94B\U0001F94C\U0001F950-'
-    '\U0001F95E\U0001F95F-\U0001F96B\U0001F980-\U0001F984\U0001F985-\U0001F991'
-    '\U0001F992-\U0001F997\U0001F9C0\U0001F9D0-\U0001F9E6\U0001F004\U0001F0CF'
-    '\U0001F18E\U0001F191-\U0001F19A\U0001F1E6-\U0001F1FF\U0001F201\U0001F21A'
-    '\U0001F22F\U0001F232-\U0001F236\U0001F238-\U0001F23A\U0001F250-\U0001F251'
-    '\U0001F300-\U0001F320\U0001F32D-\U0001F32F\U0001F330-\U0001F335'
-    '\U0001F337-\U0001F37C\U0001F37E-\U0001F37F\U0001F380-\U0001F393'
-    '\U0001F3A0-\U0001F3C4\U0001F3C5\U0001F3C6-\U0001F3CA\U0001F3CF-\U0001F3D3'
-    '\U0001F3E0-\U0001F3F0\U0001F3F4\U0001F3F8-\U0001F3FF\U0001F400-\U0001F43E'
-    '\U0001F440\U0001F442-\U0001F4F7\U0001F4F8\U0001F4F9-\U0001F4FC\U0001F4FF'
-    '\U0001F500-\U0001F53D\U0001F54B-\U0001F54E\U0001F550-\U0001F567\U0001F57A'
-    '\U0001F595-\U0001F596\U0001F5A4\U0001F5FB-\U0001F5FF\U0001F600'
-    '\U0001F601-\U0001F610\U0001F611\U0001F612-\U0001F614\U0001F615\U0001F616'
-    '\U0001F617\U0001F618\U0001F619\U0001F61A\U0001F61B\U0001F61C-\U0001F61E'
-    '\U0001F61F\U0001F620-\U0001F625\U0001F626-\U0001F627\U0001F628-\U0001F62B'
-    '\U0001F62C\U0001F62D\U0001F62E-\U0001F62F\U0001F630-\U0001F633\U0001F634'
-    '\U0001F635-\U0001F640\U0001F641-\U0001F642\U0001F643-\U0001F644'
-    '\U0001F645-\U0001F64F\U0001F680-\U0001F6C5\U0001F6CC\U0001F6D0'
-    '\U0001F6D1-\U0001F6D2\U0001F6EB-\U0001F6EC\U0001F6F4-\U0001F6F6'
-    '\U0001F6F7-\U0001F6F8\U0001F910-\U0001F918\U0001F919-\U0001F91E\U0001F91F'
-    '\U0001F920-\U0001F927\U0001F928-\U0001F92F\U0001F930\U0001F931-\U0001F932'
-    '\U0001F933-\U0001F93A\U0001F93C-\U0001F93E\U0001F940-\U0001F945'
-    '\U0001F947-\U0001F94B\U0001F94C\U0001F950-\U0001F95E\U0001F95F-\U0001F96B'
-    '\U0001F980-\U0001F984\U0001F985-\U0001F991\U0001F992-\U0001F997\U0001F9C0'
-    '\U0001F9D0-\U0001F9E6\U0001F385\U0001F3C2-\U0001F3C4\U0001F3C7\U0001F3CA'
-    '\U0001F3CB-\U0001F3CC\U0001F442-\U0001F443\U0001F446-\U0001F450'
-    '\U0001F466-\U0001F469\U0001F46E\U0001F470-\U0001F478\U0001F47C'
-    '\U0001F481-\U0001F483\U0001F485-\U0001F487\U0001F4AA\U0001F574-\U0001F575'
-    '\U0001F57A\U0001F590\U0001F595-\U0001F596\U0001F645-\U0001F647'
-    '\U0001F64B-\U0001F64F\U0001F6A3\U0001F6B4-\U0001F6B6\U0001F6C0\U0001F6CC'
-    '\U0001F918\U0001F919-\U0001F91C\U0001F91E\U0001F91F\U0001F926\U0001F930'
-    '\U0001F931-\U0001F932\U0001F933-\U0001F939\U0001F93D-\U0001F93E'
-    '\U0001F9D1-\U0001F9DD\U0001F1E6-\U0001F1FF\U0001F3FB-\U0001F3FF\u00A9'
-    '\u00AE\u203C\u2049\u2122\u2139\u2194-\u2199\u21A9-\u21AA\u231A-\u231B'
-    '\u2328\u23CF\u23E9-\u23F3\u23F8-\u23FA\u24C2\u25AA-\u25AB\u25B6\u25C0'
-    '\u25FB-\u25FE\u2600-\u2604\u260E\u2611\u2614-\u2615\u2618\u261D\u2620'
-    '\u2622-\u2623\u2626\u262A\u262E-\u262F\u2638-\u263A\u2640\u2642'
-    '\u2648-\u2653\u2660\u2663\u2665-\u2666\u2668\u267B\u267F\u2692-\u2697'
-    '\u2699\u269B-\u269C\u26A0-\u26A1\u26AA-\u26AB\u26B0-\u26B1\u26BD-\u26BE'
-    '\u26C4-\u26C5\u26C8\u26CE\u26CF\u26D1\u26D3-\u26D4\u26E9-\u26EA'
-    '\u26F0-\u26F5\u26F7-\u26FA\u26FD\u2702\u2705\u2708-\u2709\u270A-\u270B'
-    '\u270C-\u270D\u270F\u2712\u2714\u2716\u271D\u2721\u2728\u2733-\u2734'
-    '\u2744\u2747\u274C\u274E\u2753-\u2755\u2757\u2763-\u2764\u2795-\u2797'
-    '\u27A1\u27B0\u27BF\u2934-\u2935\u2B05-\u2B07\u2B1B-\u2B1C\u2B50\u2B55'
-    '\u3030\u303D\u3297\u3299\u231A-\u231B\u23E9-\u23EC\u23F0\u23F3'
-    '\u25FD-\u25FE\u2614-\u2615\u2648-\u2653\u267F\u2693\u26A1\u26AA-\u26AB'
-    '\u26BD-\u26BE\u26C4-\u26C5\u26CE\u26D4\u26EA\u26F2-\u26F3\u26F5\u26FA'
-    '\u26FD\u2705\u270A-\u270B\u2728\u274C\u274E\u2753-\u2755\u2757'
-    '\u2795-\u2797\u27B0\u27BF\u2B1B-\u2B1C\u2B50\u2B55\u261D\u26F9'
-    '\u270A-\u270B\u270C-\u270D].*')
+# Emoji codepoint ranges, sorted and merged so that the character class
+# compiled from them is checked against as few ranges as possible.
+EMOJI_RANGES = (
+    (0x00A9, 0x00A9), (0x00AE, 0x00AE), (0x203C, 0x203C), (0x2049, 0x2049),
+    (0x2122, 0x2122), (0x2139, 0x2139), (0x2194, 0x2199), (0x21A9, 0x21AA),
+    (0x231A, 0x231B), (0x2328, 0x2328), (0x23CF, 0x23CF), (0x23E9, 0x23F3),
+    (0x23F8, 0x23FA), (0x24C2, 0x24C2), (0x25AA, 0x25AB), (0x25B6, 0x25B6),
+    (0x25C0, 0x25C0), (0x25FB, 0x25FE), (0x2600, 0x2604), (0x260E, 0x260E),
+    (0x2611, 0x2611), (0x2614, 0x2615), (0x2618, 0x2618), (0x261D, 0x261D),
+    (0x2620, 0x2620), (0x2622, 0x2623), (0x2626, 0x2626), (0x262A, 0x262A),
+    (0x262E, 0x262F), (0x2638, 0x263A), (0x2640, 0x2640), (0x2642, 0x2642),
+    (0x2648, 0x2653), (0x2660, 0x2660), (0x2663, 0x2663), (0x2665, 0x2666),
+    (0x2668, 0x2668), (0x267B, 0x267B), (0x267F, 0x267F), (0x2692, 0x2697),
+    (0x2699, 0x2699), (0x269B, 0x269C), (0x26A0, 0x26A1), (0x26AA, 0x26AB),
+    (0x26B0, 0x26B1), (0x26BD, 0x26BE), (0x26C4, 0x26C5), (0x26C8, 0x26C8),
+    (0x26CE, 0x26CF), (0x26D1, 0x26D1), (0x26D3, 0x26D4), (0x26E9, 0x26EA),
+    (0x26F0, 0x26F5), (0x26F7, 0x26FA), (0x26FD, 0x26FD), (0x2702, 0x2702),
+    (0x2705, 0x2705), (0x2708, 0x270D), (0x270F, 0x270F), (0x2712, 0x2712),
+    (0x2714, 0x2714), (0x2716, 0x2716), (0x271D, 0x271D), (0x2721, 0x2721),
+    (0x2728, 0x2728), (0x2733, 0x2734), (0x2744, 0x2744), (0x2747, 0x2747),
+    (0x274C, 0x274C), (0x274E, 0x274E), (0x2753, 0x2755), (0x2757, 0x2757),
+    (0x2763, 0x2764), (0x2795, 0x2797), (0x27A1, 0x27A1), (0x27B0, 0x27B0),
+    (0x27BF, 0x27BF), (0x2934, 0x2935), (0x2B05, 0x2B07), (0x2B1B, 0x2B1C),
+    (0x2B50, 0x2B50), (0x2B55, 0x2B55), (0x3030, 0x3030), (0x303D, 0x303D),
+    (0x3297, 0x3297), (0x3299, 0x3299), (0x1F004, 0x1F004), (0x1F0CF, 0x1F0CF),
+    (0x1F170, 0x1F171), (0x1F17E, 0x1F17F), (0x1F18E, 0x1F18E),
+    (0x1F191, 0x1F19A), (0x1F1E6, 0x1F1FF), (0x1F201, 0x1F202),
+    (0x1F21A, 0x1F21A), (0x1F22F, 0x1F22F), (0x1F232, 0x1F23A),
+    (0x1F250, 0x1F251), (0x1F300, 0x1F321), (0x1F324, 0x1F393),
+    (0x1F396, 0x1F397), (0x1F399, 0x1F39B), (0x1F39E, 0x1F3F0),
+    (0x1F3F3, 0x1F3F5), (0x1F3F7, 0x1F4FD), (0x1F4FF, 0x1F53D),
+    (0x1F549, 0x1F54E), (0x1F550, 0x1F567), (0x1F56F, 0x1F570),
+    (0x1F573, 0x1F57A), (0x1F587, 0x1F587), (0x1F58A, 0x1F58D),
+    (0x1F590, 0x1F590), (0x1F595, 0x1F596), (0x1F5A4, 0x1F5A5),
+    (0x1F5A8, 0x1F5A8), (0x1F5B1, 0x1F5B2), (0x1F5BC, 0x1F5BC),
+    (0x1F5C2, 0x1F5C4), (0x1F5D1, 0x1F5D3), (0x1F5DC, 0x1F5DE),
+    (0x1F5E1, 0x1F5E1), (0x1F5E3, 0x1F5E3), (0x1F5E8, 0x1F5E8),
+    (0x1F5EF, 0x1F5EF), (0x1F5F3, 0x1F5F3), (0x1F5FA, 0x1F64F),
+    (0x1F680, 0x1F6C5), (0x1F6CB, 0x1F6D2), (0x1F6E0, 0x1F6E5),
+    (0x1F6E9, 0x1F6E9), (0x1F6EB, 0x1F6EC), (0x1F6F0, 0x1F6F0),
+    (0x1F6F3, 0x1F6F8), (0x1F910, 0x1F93A), (0x1F93C, 0x1F93E),
+    (0x1F940, 0x1F945), (0x1F947, 0x1F94C), (0x1F950, 0x1F96B),
+    (0x1F980, 0x1F997), (0x1F9C0, 0x1F9C0), (0x1F9D0, 0x1F9E6),
+)
+emojis = re.compile('[' + ''.join(
+    chr(start) if start == end else '{}-{}'.format(chr(start), chr(end))
+    for start, end in EMOJI_RANGES) + ']')
+# No emoji sorts before U+00A9, so plain ASCII text skips the lookup.
+emoji_candidates = re.compile('[^\x00-\xa8]')
 macros = re.compile('^[' + re.escape('-=+@') + ']')
 
+# html.parser only starts a tag at '<' followed by a letter, so strings
+# without a match cannot contain markup and are never parsed.
+tag_open = re.compile('<[a-zA-Z]')
+
+
+def contains_emoji(value):
+    return (emoji_candidates.search(value) is not None and
+            emojis.search(value) is not None)
+
+
+def contains_markup(value):
+    return (tag_open.search(value) is not None and
+            BeautifulSoup(value, 'html.parser').find() is not None)
+
 
 def sanitize_string(value):
     if not value or not isinstance(value, str):
         return True
 
-    return (not bool(BeautifulSoup(value, 'html.parser').find()) and
-            not emojis.match(value) and
-            not macros.match(value))
+    return (not macros.match(value) and
+            not contains_emoji(value) and
+            not contains_markup(value))
+
+
+def sanitize_strings(values):
+    """
+    Returns True if all ``values`` pass ``sanitize_string``. ``values`` is
+    an iterable of values or a dict, in which case the dict values are
+    checked. The strings are scanned for emojis and markup in one pass;
+    markup candidates are parsed individually.
+    """
+    if isinstance(values, dict):
+        values = values.values()
+    strings = [value for value in values if value and isinstance(value, str)]
+
+    if any(macros.match(value) for value in strings):
+        return False
+
+    joined = '\n'.join(strings)
+    if contains_emoji(joined):
+        return False
+    if tag_open.search(joined):
+        return not any(contains_markup(value) for value in strings)
+    return True
@@ -1,11 +1,12 @@
-import json
-
-from django.db.models import Q
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import redirect
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                quote_etag)
+from django.views.generic import View
 
 from core.views.generic import TemplateView
-from organization.models import Project
-from organization.serializers import ProjectGeometrySerializer
+from organization import extents
 
 
 class IndexPage(TemplateView):
@@ -18,27 +19,29 @@ class IndexPage(TemplateView):
 class Dashboard(TemplateView):
     template_name = 'core/dashboard.html'
 
-    def get_context_data(self, projects, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['geojson'] = json.dumps(
-            ProjectGeometrySerializer(projects, many=True).data
-        )
-        return context
+
+class DashboardExtents(View):
+    """
+    Returns the extents of the projects shown on the dashboard map as a
+    GeoJSON feature collection. Clients can use it for
+    ``DASHBOARD_EXTENTS_MAX_AGE`` seconds and then revalidate it with its
+    ETag.
+    """
 
     def get(self, request, *args, **kwargs):
-        projects = Project.objects.filter(extent__isnull=False)
-        if not self.is_superuser:
-            query = Q(access='public')
-
-            if self.request.user.is_authenticated:
-                query |= Q(
-                    organization__organizationrole__user=self.request.user,
-                    access='private')
-            projects = projects.filter(query)
-            projects = projects.filter(archived=False)
-        projects = projects.select_related('organization').distinct()
-        context = self.get_context_data(projects=projects)
-        return super(TemplateView, self).render_to_response(context)
+        geojson, etag = extents.get_extents(request.user)
+        etag = quote_etag(etag)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(geojson, content_type='application/json')
+
+        response['ETag'] = etag
+        visibility = ('private' if request.user.is_authenticated
+                      else 'public')
+        patch_cache_control(response,
+                            max_age=settings.DASHBOARD_EXTENTS_MAX_AGE,
+                            **{visibility: True})
+        return response
 
 
 def server_error(request, template_name='500.html'):
@@ -0,0 +1,94 @@
+"""
+GeoJSON features of the project extents shown on the dashboard map.
+
+The features of all public, active projects are the same for every visitor,
+so they are built once and cached until a project or organization changes.
+Only the private and archived projects a user can see are queried per
+request.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+
+from .models import PUBLIC_EXTENTS_CACHE_KEY, Project
+
+FIELDS = ('name', 'slug', 'extent', 'organization__name',
+          'organization__slug')
+
+
+def get_features(projects):
+    """
+    Returns the GeoJSON features, separated by commas, of the extents of
+    ``projects``, simplified to ``DASHBOARD_EXTENT_TOLERANCE`` degrees.
+    """
+    tolerance = settings.DASHBOARD_EXTENT_TOLERANCE
+    features = []
+    for name, slug, extent, org_name, org_slug in projects.filter(
+            extent__isnull=False).values_list(*FIELDS):
+        if tolerance:
+            extent = extent.simplify(tolerance, preserve_topology=True)
+        properties = {
+            'name': name,
+            'org': org_name,
+            'url': reverse('organization:project-dashboard',
+                           kwargs={'organization': org_slug,
+                                   'project': slug}),
+        }
+        features.append(
+            '{"type": "Feature", "geometry": %s, "properties": %s}' % (
+                extent.geojson, json.dumps(properties)))
+    return ','.join(features)
+
+
+def get_public_features():
+    """
+    Returns the features of the public, active projects and their ETag,
+    from the cache if possible.
+    """
+    public = cache.get(PUBLIC_EXTENTS_CACHE_KEY)
+    if public is None:
+        features = get_features(
+            Project.objects.filter(access='public', archived=False))
+        public = {
+            'features': features,
+            'etag': hashlib.md5(features.encode()).hexdigest(),
+        }
+        cache.set(PUBLIC_EXTENTS_CACHE_KEY, public,
+                  settings.DASHBOARD_EXTENTS_CACHE_TIMEOUT)
+    return public
+
+
+def get_user_projects(user):
+    """
+    Returns the projects, other than the public, active ones, whose extents
+    ``user`` can see on the dashboard.
+    """
+    if user.is_superuser:
+        return Project.objects.exclude(access='public', archived=False)
+    if not user.is_authenticated:
+        return Project.objects.none()
+    # A user has at most one role in an organization, so there are no
+    # duplicate projects
+    return Project.objects.filter(
+        organization__organizationrole__user=user,
+        access='private', archived=False)
+
+
+def get_extents(user):
+    """
+    Returns a GeoJSON feature collection of the extents of the projects
+    ``user`` can see, and its ETag.
+    """
+    public = get_public_features()
+    private = get_features(get_user_projects(user))
+    if not private:
+        features, etag = public['features'], public['etag']
+    else:
+        features = ','.join(filter(None, (public['features'], private)))
+        etag = hashlib.md5(
+            (public['etag'] + private).encode()).hexdigest()
+    geojson = '{"type": "FeatureCollection", "features": [%s]}' % features
+    return geojson, etag
@@ -1,8 +1,8 @@
-import csv
+from functools import partial
 
 from core.mixins import SchemaSelectorMixin
 from core.messages import SANITIZE_ERROR
-from core.validators import sanitize_string
+from core.validators import sanitize_strings
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
@@ -10,6 +10,7 @@ from party.models import Party, TenureRelationship
 from spatial.models import SpatialUnit
 
 from . import exceptions, validators
+from .batch import ModelBatch
 
 ATTRIBUTE_GROUPS = settings.ATTRIBUTE_GROUPS
 
@@ -50,6 +51,7 @@ class Importer(SchemaSelectorMixin):
         self._schema_attrs = {}
         self._parties_created = {}
         self._locations_created = {}
+        self._batch = None
 
     def get_headers(self):
         raise NotImplementedError(
@@ -156,7 +158,7 @@ class Importer(SchemaSelectorMixin):
         return (attribute_map,
                 sorted(extra_attrs), sorted(extra_headers))
 
-    def _import(self, config, csvfile):
+    def _import(self, config, reader):
         attributes = config.get('attributes', None)
         entity_types = config.get('entity_types', None)
 
@@ -164,21 +166,28 @@ class Importer(SchemaSelectorMixin):
         (attr_map,
             extra_attrs, extra_headers) = self.get_attribute_map(
                 type, entity_types)
+
+        batch_size = config.get('batch_size', None)
+        if batch_size:
+            self._batch = ModelBatch(self.project, batch_size)
         try:
             with transaction.atomic():
-                reader = csv.reader(
-                    csvfile, delimiter=self.delimiter,
-                    quotechar=self.quotechar
-                )
                 headers = [h.lower() for h in next(reader)]
 
+                # compile column lookups once for the whole import
+                field_columns = validators.get_field_columns(headers, config)
+                attr_plan = self._compile_attr_map(
+                    headers, attributes, attr_map)
+                id_columns = self._get_id_columns(type, headers)
+                content_type_keys = self.get_content_type_keys()
+
                 for row in reader:
                     content_types = dict(
-                        (key, None) for key in self.get_content_type_keys()
+                        (key, None) for key in content_type_keys
                     )
                     (party_name, party_type, geometry, location_type,
                         tenure_type) = validators.validate_row(
-                            headers, row, config
+                            headers, row, config, columns=field_columns
                     )
                     if 'PT' in entity_types and party_type:
                         content_types['party.party'] = {
@@ -199,20 +208,20 @@ class Importer(SchemaSelectorMixin):
                             'project': self.project,
                             'attributes': {}
                         }
-                    content_types = self._map_attrs_to_content_types(
-                        headers, row, content_types, attributes, attr_map)
+                    content_types = self._map_attrs(
+                        row, content_types, attr_plan)
                     self._create_models(
-                        type, headers, row, content_types, tenure_type
+                        row, content_types, tenure_type, id_columns
                     )
+                if self._batch is not None:
+                    self._batch.flush()
         except ValidationError as e:
             raise exceptions.DataImportError(
                 e.messages[0], line_num=reader.line_num)
+        finally:
+            self._batch = None
 
-    def _create_models(self, type, headers, row, content_types, tenure):
-
-        party_ct = content_types['party.party']
-        spatial_ct = content_types['spatial.spatialunit']
-
+    def _get_id_columns(self, type, headers):
         s_id = (
             'tenurerelationship::spatial_unit_id'
             if type == 'xls' else 'spatial_unit_id')
@@ -220,83 +229,105 @@ class Importer(SchemaSelectorMixin):
             'tenurerelationship::party_id'
             if type == 'xls' else 'party_id'
         )
+        return tuple(
+            headers.index(h) if h in headers else None for h in (s_id, p_id))
+
+    def _create_models(self, row, content_types, tenure, id_columns):
+
+        party_ct = content_types['party.party']
+        spatial_ct = content_types['spatial.spatialunit']
+        s_column, p_column = id_columns
 
         if spatial_ct:
-            try:
-                spatial_unit_id = row[headers.index(s_id)]
-            except ValueError:
-                su = SpatialUnit.objects.create(**spatial_ct)
-            else:
-                if spatial_unit_id:
-                    created_su_id = self._locations_created.get(
-                        spatial_unit_id, None
-                    )
-                    if created_su_id:
-                        su = SpatialUnit.objects.get(id=created_su_id)
-                    else:
-                        su = SpatialUnit.objects.create(**spatial_ct)
-                        self._locations_created[spatial_unit_id] = su.pk
-                else:
-                    su = SpatialUnit.objects.create(**spatial_ct)
-                    self._locations_created[spatial_unit_id] = su.pk
+            su = self._get_or_create(
+                SpatialUnit, spatial_ct, row, s_column,
+                self._locations_created)
 
         if party_ct:
-            try:
-                party_id = row[headers.index(p_id)]
-            except ValueError:
-                party = Party.objects.create(**party_ct)
-            else:
-                if party_id:
-                    created_party_id = self._parties_created.get(
-                        party_id, None)
-                    if created_party_id:
-                        party = Party.objects.get(id=created_party_id)
-                    else:
-                        party = Party.objects.create(**party_ct)
-                        self._parties_created[party_id] = party.pk
-                else:
-                    party = Party.objects.create(**party_ct)
-                    self._parties_created[party_id] = party.pk
+            party = self._get_or_create(
+                Party, party_ct, row, p_column, self._parties_created)
 
         if party_ct and spatial_ct:
             content_types['party.tenurerelationship']['party'] = party
             content_types['party.tenurerelationship']['spatial_unit'] = su
             content_types['party.tenurerelationship']['tenure_type'] = tenure
-            TenureRelationship.objects.create(
-                **content_types['party.tenurerelationship']
-            )
-
-    def _map_attrs_to_content_types(self, headers, row, content_types,
-                                    attributes, attr_map):
+            self._create(
+                TenureRelationship, content_types['party.tenurerelationship'])
+
+    def _get_or_create(self, model, fields, row, id_column, created):
+        if id_column is None:
+            return self._create(model, fields)
+
+        source_id = row[id_column]
+        if source_id and source_id in created:
+            if self._batch is not None:
+                # Instance may still be pending; relationships only need
+                # its primary key.
+                return model(id=created[source_id])
+            return model.objects.get(id=created[source_id])
+
+        instance = self._create(model, fields)
+        created[source_id] = instance.pk
+        return instance
+
+    def _create(self, model, fields):
+        if self._batch is not None:
+            return self._batch.add(model, fields)
+        return model.objects.create(**fields)
+
+    def _compile_attr_map(self, headers, attributes, attr_map):
+        """
+        Build a column plan from the attribute map: for each content type
+        and selector, the attributes selected for import together with the
+        index of their column and the function used to convert their value.
+        """
+        selected = set(attributes or [])
+        columns = {h: i for i, h in reversed(list(enumerate(headers)))}
+        plan = []
         for model, selectors in attr_map.items():
+            prefix = model.split('.')[1]
             for selector, attrs in selectors.items():
-                content_type = content_types.get(model, None)
-                if not content_type:
+                attr_columns = []
+                for attr, (attribute, *_) in attrs.items():
+                    attr_label = '{0}::{1}'.format(prefix, attr)
+                    if attr_label not in selected:
+                        continue
+                    column = columns.get(attribute.name.lower(),
+                                         columns.get(attr_label))
+                    if column is None:
+                        continue
+                    attr_columns.append((
+                        attribute.name, column, attribute.required,
+                        self._get_cast_function(attribute.attr_type.name)
+                    ))
+                plan.append((model, selector, attr_columns))
+        return plan
+
+    def _get_cast_function(self, type):
+        if type == 'select_multiple':
+            return split_multiple_choices
+        if type in ('integer', 'decimal'):
+            return partial(self._cast_to_type, type=type)
+        return None
+
+    def _map_attrs(self, row, content_types, plan):
+        for model, selector, attr_columns in plan:
+            content_type = content_types.get(model, None)
+            if not content_type:
+                continue
+            if selector not in ('DEFAULT', content_type.get('type', '')):
+                continue
+            vals = [row[column] for _, column, _, _ in attr_columns]
+            if not sanitize_strings(vals):
+                raise ValidationError(SANITIZE_ERROR)
+
+            values = content_type['attributes']
+            for (name, _, required, cast), val in zip(attr_columns, vals):
+                if not required and val == '':
                     continue
-                if selector in ['DEFAULT', content_type.get('type', '')]:
-                    for attr in attrs:
-                        attribute = attrs[attr][0]
-                        attr_label = '{0}::{1}'.format(
-                            model.split('.')[1], attr)
-                        if attr_label not in attributes:
-                            continue
-                        try:
-                            val = row[headers.index(attribute.name.lower())]
-                        except (KeyError, ValueError):
-                            val = row[headers.index(attr_label)]
-
-                        if not sanitize_string(val):
-                            raise ValidationError(SANITIZE_ERROR)
-
-                        if not attribute.required and val == '':
-                            continue
-                        if attribute.attr_type.name == 'select_multiple':
-                            val = [v.strip() for v in val.split(',')]
-                        if attribute.attr_type.name in ['integer', 'decimal']:
-                            val = self._cast_to_type(
-                                val, attribute.attr_type.name)
-                        if content_type:
-                            content_type['attributes'][attribute.name] = val
+                if cast is not None:
+                    val = cast(val)
+                values[name] = val
         return content_types
 
     def _cast_to_type(self, val, type):
@@ -311,3 +342,7 @@ class Importer(SchemaSelectorMixin):
             except (ValueError, TypeError):
                 val = 0.0
         return val
+
+
+def split_multiple_choices(val):
+    return [v.strip() for v in val.split(',')]
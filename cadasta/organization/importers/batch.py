@@ -0,0 +1,105 @@
+from django.utils import timezone
+from party.models import Party, TenureRelationship
+from questionnaires.models import QuestionOption
+from simple_history.models import HistoricalRecords
+from spatial.models import SpatialUnit, check_extent
+
+from core.util import random_ids
+
+
+class ModelBatch:
+    """
+    Collects unsaved locations, parties and tenure relationships and writes
+    them with ``bulk_create``.
+
+    ``bulk_create`` neither calls ``save()`` nor sends model signals, so the
+    work normally done there is done here instead: IDs are generated up
+    front, ``check_extent`` is applied and the location label is resolved
+    from a per-import lookup table. Attributes are validated when an
+    instance is added so that errors are still raised for the row that
+    caused them. Historical records are written in bulk after each flush.
+    The area of a location is calculated by the database trigger (see
+    spatial/migrations/#0005), which also fires for bulk inserts.
+
+    If ``batch_size`` is ``None``, instances are only written when
+    ``flush()`` is called. Historical records are attributed to
+    ``history_user`` or, if it is not given, to the user of the current
+    request.
+    """
+
+    MODELS = (SpatialUnit, Party, TenureRelationship)
+
+    def __init__(self, project, batch_size, history_user=None):
+        self.project = project
+        self.batch_size = batch_size
+        self.history_user = history_user
+        self._pending = {model: [] for model in self.MODELS}
+        self._location_labels = None
+        self._ids = []
+
+    def __len__(self):
+        return sum(len(instances) for instances in self._pending.values())
+
+    @property
+    def location_labels(self):
+        if self._location_labels is None:
+            self._location_labels = dict(QuestionOption.objects.filter(
+                question__name='location_type',
+                question__questionnaire__id=self.project.current_questionnaire
+            ).values_list('name', 'label_xlat'))
+        return self._location_labels
+
+    def next_id(self):
+        if not self._ids:
+            self._ids = random_ids(self.batch_size or 100)
+        return self._ids.pop()
+
+    def add(self, model, fields):
+        instance = model(id=self.next_id(), **fields)
+
+        if model is SpatialUnit:
+            check_extent(SpatialUnit, instance=instance)
+            if instance.type in self.location_labels:
+                instance.label = self.location_labels[instance.type]
+
+        instance._attr_field._pre_save_selector_check()
+        self._pending[model].append(instance)
+
+        if self.batch_size and len(self) >= self.batch_size:
+            self.flush()
+        return instance
+
+    def flush(self):
+        history_user = self.history_user or get_history_user()
+        for model in self.MODELS:
+            instances = self._pending[model]
+            if not instances:
+                continue
+            model.objects.bulk_create(instances)
+            create_historical_records(model, instances, history_user)
+            self._pending[model] = []
+
+
+def get_history_user():
+    """Return the user simple_history would attach to a historical record."""
+    try:
+        user = HistoricalRecords.thread.request.user
+    except AttributeError:
+        return None
+    return user if user.is_authenticated else None
+
+
+def create_historical_records(model, instances, history_user=None):
+    history_model = model.history.model
+    history_date = timezone.now()
+    fields = [field.attname for field in model._meta.fields]
+    history_model.objects.bulk_create([
+        history_model(
+            history_date=history_date,
+            history_type='+',
+            history_user=history_user,
+            history_change_reason=None,
+            **{attname: getattr(instance, attname) for attname in fields}
+        )
+        for instance in instances
+    ])
@@ -26,4 +26,7 @@ class CSVImporter(base.Importer):
 
     def import_data(self, config_dict, **kwargs):
         with open(self.path, 'r', newline='') as csvfile:
-            self._import(config_dict, csvfile)
+            reader = csv.reader(
+                csvfile, delimiter=self.delimiter, quotechar=self.quotechar
+            )
+            self._import(config_dict, reader)
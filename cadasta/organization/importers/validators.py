@@ -4,40 +4,66 @@ from django.contrib.gis.geos import GEOSGeometry, GEOSException
 from django.core.exceptions import ValidationError
 from django.utils.translation import ugettext as _
 
-from core.validators import sanitize_string
+from core.validators import sanitize_strings
 from core.messages import SANITIZE_ERROR
 from xforms.utils import InvalidODKGeometryError, odk_geom_to_wkt
 
 
-def get_field_value(headers, row, header, field_name):
-    try:
-        return row[headers.index(header)]
-    except ValueError:
+def get_field_columns(headers, config):
+    """
+    Resolve the column index of each field configured for the import, so
+    the headers need to be searched only once per import rather than once
+    per row. Fields that are not configured are left out; fields without a
+    matching column map to ``None`` and are reported when a row is
+    validated.
+    """
+    (party_name_field, party_type_field, location_type_field, type,
+        geometry_field, tenure_type_field) = get_fields_from_config(config)
+
+    fields = {}
+    if party_name_field and party_type_field:
+        fields['party_name'] = party_name_field
+        fields['party_type'] = party_type_field
+    if geometry_field:
+        fields['geometry_field'] = geometry_field
+    if location_type_field:
+        fields['location_type'] = location_type_field
+    if party_name_field and geometry_field:
+        fields['tenure_type'] = tenure_type_field
+
+    columns = {header: i for i, header in reversed(list(enumerate(headers)))}
+    return {name: columns.get(field) for name, field in fields.items()}
+
+
+def get_column_value(row, columns, field_name):
+    column = columns[field_name]
+    if column is None:
         raise ValidationError(
             _("No '{}' column found.".format(field_name))
         )
+    return row[column]
 
 
-def validate_row(headers, row, config):
+def validate_row(headers, row, config, columns=None):
     party_name, party_type, geometry, tenure_type, location_type = (
         None, None, None, None, None)
 
-    (party_name_field, party_type_field, location_type_field, type,
-        geometry_field, tenure_type_field) = get_fields_from_config(config)
-
     if len(headers) != len(row):
         raise ValidationError(
             _("Number of headers and columns do not match.")
         )
 
-    _get_field_value = partial(get_field_value, headers, row)
+    if columns is None:
+        columns = get_field_columns(headers, config)
 
-    if party_name_field and party_type_field:
-        party_name = _get_field_value(party_name_field, "party_name")
-        party_type = _get_field_value(party_type_field, "party_type")
+    _get_column_value = partial(get_column_value, row, columns)
 
-    if geometry_field:
-        coords = _get_field_value(geometry_field, "geometry_field")
+    if 'party_name' in columns:
+        party_name = _get_column_value("party_name")
+        party_type = _get_column_value("party_type")
+
+    if 'geometry_field' in columns:
+        coords = _get_column_value("geometry_field")
         if coords == '':
             geometry = None
         else:
@@ -49,16 +75,16 @@ def validate_row(headers, row, config):
                 except InvalidODKGeometryError:
                     raise ValidationError(_("Invalid geometry."))
 
-    if location_type_field:
-        location_type = _get_field_value(location_type_field, "location_type")
+    if 'location_type' in columns:
+        location_type = _get_column_value("location_type")
         type_choices = config['allowed_location_types']
         if location_type and location_type not in type_choices:
             raise ValidationError(
                 _("Invalid location_type: '%s'.") % location_type
             )
 
-    if party_name_field and geometry_field:
-        tenure_type = _get_field_value(tenure_type_field, 'tenure_type')
+    if 'tenure_type' in columns:
+        tenure_type = _get_column_value('tenure_type')
 
         if tenure_type and tenure_type not in config['allowed_tenure_types']:
             raise ValidationError(
@@ -67,7 +93,7 @@ def validate_row(headers, row, config):
 
     values = (party_name, party_type, geometry, location_type, tenure_type)
 
-    if not all(sanitize_string(val) for val in values):
+    if not sanitize_strings(values):
         raise ValidationError(SANITIZE_ERROR)
 
     return values
@@ -1,11 +1,20 @@
-import io
 import itertools
+import json
+import sqlite3
+from collections import OrderedDict
+from datetime import date, datetime, time
 
-import pandas as pd
 from django.utils.translation import ugettext as _
+from openpyxl import load_workbook
 
 from . import base, exceptions
 
+WORKSHEET_PREFIXES = OrderedDict((
+    ('locations', 'spatialunit::'),
+    ('relationships', 'tenurerelationship::'),
+    ('parties', 'party::'),
+))
+
 
 class XLSImporter(base.Importer):
 
@@ -17,20 +26,28 @@ class XLSImporter(base.Importer):
     def __init__(self, project=None, path=None):
         super(XLSImporter, self).__init__(project=project)
         self.path = path
+        self._header_map = None
 
     def get_header_map(self):
-        headers = {}
+        if self._header_map is not None:
+            return self._header_map
+
         EXCLUDE_HEADERS = base.EXCLUDE_HEADERS.copy()
         EXCLUDE_HEADERS.extend(self.EXCLUDE_IDS)
-        workbook = pd.read_excel(self.path, sheetname=None)
-        for sheet in workbook.keys():
-            worksheet = workbook[sheet]
-            heads = []
-            headers[sheet] = heads
-            for col in worksheet.columns.tolist():
-                if not (col.startswith(
-                        ('_', 'meta/')) or col in EXCLUDE_HEADERS):
-                    heads.append(col.lower())
+        headers = OrderedDict()
+        workbook = load_workbook(self.path, read_only=True)
+        try:
+            for worksheet in workbook.worksheets:
+                heads = []
+                headers[worksheet.title] = heads
+                for col in get_worksheet_headers(worksheet):
+                    if not (col.startswith(
+                            ('_', 'meta/')) or col in EXCLUDE_HEADERS):
+                        heads.append(col.lower())
+        finally:
+            workbook.close()
+
+        self._header_map = headers
         return headers
 
     def get_headers(self):
@@ -38,70 +55,217 @@ class XLSImporter(base.Importer):
 
     def import_data(self, config, **kwargs):
         entity_types = config['entity_types']
-        df = pd.read_excel(self.path, sheetname=None)
-        data = get_csv_from_dataframe(df, entity_types)
-        with io.StringIO(data) as csvfile:
-            self._import(config, csvfile)
+        workbook = load_workbook(self.path, read_only=True)
+        try:
+            reader = WorkbookReader(workbook, entity_types)
+            self._import(config, reader)
+        finally:
+            workbook.close()
 
 
-def get_csv_from_dataframe(df, entity_types):
-    locations, parties, relationships = None, None, None
-    try:
+class WorkbookReader:
+    """
+    Reads the locations, relationships and parties worksheets of a workbook
+    as a single table, with the same interface as ``csv.reader``.
+
+    Rows are outer-joined: locations to relationships on
+    ``spatial_unit_id``, then to parties on ``party_id``. Columns are
+    prefixed with the name of the model they belong to and the ``id``
+    columns of the locations and parties worksheets are dropped. Locations
+    and parties are indexed by ``id`` in a temporary on-disk database while
+    relationships are streamed, so memory use does not grow with the size
+    of the workbook.
+    """
+
+    def __init__(self, workbook, entity_types):
+        self.line_num = 0
+        self._rows = self._read(workbook, entity_types)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows)
+        self.line_num += 1
+        return row
+
+    def _read(self, workbook, entity_types):
         if 'SU' in entity_types and 'PT' in entity_types:
-            locations = df['locations']
-            parties = df['parties']
-            relationships = df['relationships']
-            if not (locations.empty or
-                    relationships.empty or parties.empty):
-                locations.rename(
-                    columns=lambda x: 'spatialunit::' + x.lower(),
-                    inplace=True
-                )
-                relationships.rename(
-                    columns=lambda x: 'tenurerelationship::' + x.lower(),
-                    inplace=True)
-                parties.rename(
-                    columns=lambda x: 'party::' + x.lower(), inplace=True
-                )
-                # join locations and relationships on spatial_id's
-                joined = pd.merge(
-                    locations, relationships, left_on='spatialunit::id',
-                    right_on='tenurerelationship::spatial_unit_id',
-                    how='outer'
-                )
-                # then join to parties on party_id
-                merged = pd.merge(
-                    joined, parties, left_on='tenurerelationship::party_id',
-                    right_on='party::id', how='outer'
-                )
-                # drop unused columns
-                drop_cols = ['spatialunit::id', 'party::id']
-                merged.drop(drop_cols, inplace=True, axis=1)
-
-                return merged.to_csv(index=False, index_label=False)
-            else:
-                raise exceptions.DataImportError(
-                    _('Empty worksheet.'))
+            sheets = [Worksheet(workbook, name, prefix)
+                      for name, prefix in WORKSHEET_PREFIXES.items()]
+            if any(sheet.empty for sheet in sheets):
+                raise exceptions.DataImportError(_('Empty worksheet.'))
+            return self._join(*sheets)
         elif 'SU' in entity_types and 'PT' not in entity_types:
-            locations = df['locations']
-            # rename location type
-            locations.rename(
-                columns=lambda x: 'spatialunit::' + x.lower(), inplace=True
-            )
-            drop_cols = ['spatialunit::id']
-            locations.drop(drop_cols, inplace=True, axis=1)
-            return locations.to_csv(index=False, index_label=False)
+            return Worksheet(workbook, 'locations', 'spatialunit::').read()
         elif 'SU' not in entity_types and 'PT' in entity_types:
-            parties = df['parties']
-            parties.rename(
-                columns=lambda x: 'party::' + x.lower(), inplace=True
-            )
-            drop_cols = ['party::id']
-            parties.drop(drop_cols, inplace=True, axis=1)
-            return parties.to_csv(index=False, index_label=False)
+            return Worksheet(workbook, 'parties', 'party::').read()
         else:
             raise exceptions.DataImportError(
                 _('Unsupported import format.'))
-    except KeyError as e:
-        raise exceptions.DataImportError(
-            _("Missing '%s' worksheet.") % e.args[0])
+
+    def _join(self, locations, relationships, parties):
+        location_index = RowIndex(locations.read_with_ids())
+        party_index = RowIndex(parties.read_with_ids())
+        su_id = relationships.column('spatial_unit_id')
+        party_id = relationships.column('party_id')
+
+        empty_location = [''] * len(locations.headers)
+        empty_relationship = [''] * len(relationships.headers)
+        empty_party = [''] * len(parties.headers)
+
+        yield locations.headers + relationships.headers + parties.headers
+
+        try:
+            for relationship in relationships.rows():
+                location_rows = (location_index.match(relationship[su_id]) or
+                                 [empty_location])
+                party_rows = (party_index.match(relationship[party_id]) or
+                              [empty_party])
+                for location in location_rows:
+                    for party in party_rows:
+                        yield location + relationship + party
+
+            for location in location_index.remaining():
+                yield location + empty_relationship + empty_party
+            for party in party_index.remaining():
+                yield empty_location + empty_relationship + party
+        finally:
+            location_index.close()
+            party_index.close()
+
+
+class Worksheet:
+    """Streams the rows of one worksheet as lists of strings."""
+
+    def __init__(self, workbook, name, prefix):
+        try:
+            self._worksheet = workbook[name]
+        except KeyError:
+            raise exceptions.DataImportError(
+                _("Missing '%s' worksheet.") % name)
+
+        self.name = name
+        self.prefix = prefix
+        self._rows = iter(self._worksheet.iter_rows())
+        columns = [col.lower() for col in get_worksheet_headers(
+            self._worksheet, rows=self._rows)]
+
+        # the id column is only used to join worksheets
+        self._id = columns.index('id') if 'id' in columns else None
+        self._width = len(columns)
+        self.headers = [prefix + col for i, col in enumerate(columns)
+                        if i != self._id]
+
+        try:
+            first = next(self._values())
+        except StopIteration:
+            self.empty = True
+        else:
+            self.empty = False
+            self._first = first
+
+    def column(self, name):
+        try:
+            return self.headers.index(self.prefix + name)
+        except ValueError:
+            raise exceptions.DataImportError(
+                _("Missing '%s' column in '%s' worksheet.") % (
+                    name, self.name))
+
+    def _values(self):
+        for row in self._rows:
+            values = [cell_to_str(cell.value) for cell in row]
+            if not any(values):
+                continue
+            values = values[:self._width]
+            values.extend([''] * (self._width - len(values)))
+            yield values
+
+    def read_with_ids(self):
+        if self._id is None:
+            raise exceptions.DataImportError(
+                _("Missing '%s' column in '%s' worksheet.") % (
+                    'id', self.name))
+        for values in self._all_values():
+            row_id = values.pop(self._id)
+            yield row_id, values
+
+    def rows(self):
+        for values in self._all_values():
+            if self._id is not None:
+                del values[self._id]
+            yield values
+
+    def read(self):
+        yield self.headers
+        yield from self.rows()
+
+    def _all_values(self):
+        if not self.empty:
+            yield self._first
+            yield from self._values()
+
+
+class RowIndex:
+    """
+    Rows keyed by id, stored in a private temporary SQLite database that is
+    kept on disk once it outgrows SQLite's page cache.
+    """
+
+    def __init__(self, rows):
+        self._db = sqlite3.connect('')
+        self._db.execute(
+            'CREATE TABLE rows ('
+            ' pos INTEGER PRIMARY KEY, id TEXT, row TEXT,'
+            ' joined INTEGER NOT NULL DEFAULT 0)')
+        self._db.executemany(
+            'INSERT INTO rows (id, row) VALUES (?, ?)',
+            ((row_id, json.dumps(row)) for row_id, row in rows))
+        self._db.execute('CREATE INDEX rows_id ON rows (id)')
+
+    def match(self, row_id):
+        """Return all rows for ``row_id`` and mark them as joined."""
+        if not row_id:
+            return []
+        rows = [json.loads(row) for (row,) in self._db.execute(
+            'SELECT row FROM rows WHERE id = ? ORDER BY pos', (row_id,))]
+        if rows:
+            self._db.execute(
+                'UPDATE rows SET joined = 1 WHERE id = ?', (row_id,))
+        return rows
+
+    def remaining(self):
+        """Iterate over rows that have not been joined."""
+        cursor = self._db.execute(
+            'SELECT row FROM rows WHERE joined = 0 ORDER BY pos')
+        for (row,) in cursor:
+            yield json.loads(row)
+
+    def close(self):
+        self._db.close()
+
+
+def get_worksheet_headers(worksheet, rows=None):
+    if rows is None:
+        rows = worksheet.iter_rows()
+    try:
+        header_row = next(iter(rows))
+    except StopIteration:
+        return []
+    headers = [cell_to_str(cell.value) for cell in header_row]
+    while headers and not headers[-1]:
+        headers.pop()
+    return headers
+
+
+def cell_to_str(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value).upper()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from organization.models import Project, ProjectStatistics
+
+
+class Command(BaseCommand):
+    help = "Recounts the records of projects for the project statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument('projects', nargs='*', metavar='project',
+                            help="Slugs of the projects to recount "
+                                 "(default: all projects)")
+
+    def handle(self, projects, *args, **options):
+        if projects:
+            ids = list(Project.objects.filter(
+                slug__in=projects).values_list('id', flat=True))
+            ProjectStatistics.objects.rebuild(ids)
+            count = len(ids)
+        else:
+            ProjectStatistics.objects.rebuild()
+            count = ProjectStatistics.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            "Rebuilt the statistics of {} projects.".format(count)))
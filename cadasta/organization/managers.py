@@ -0,0 +1,45 @@
+from django.db import connection, models, transaction
+
+REBUILD_SQL = """
+INSERT INTO organization_projectstatistics (
+    project_id, num_locations, num_parties, num_relationships, num_resources,
+    last_updated, locations_version)
+SELECT
+    p.id,
+    (SELECT count(*) FROM spatial_spatialunit WHERE project_id = p.id),
+    (SELECT count(*) FROM party_party WHERE project_id = p.id),
+    (SELECT count(*) FROM party_tenurerelationship WHERE project_id = p.id),
+    (SELECT count(*) FROM resources_resource
+     WHERE project_id = p.id AND NOT archived),
+    GREATEST(
+        (SELECT max(last_updated) FROM spatial_spatialunit
+         WHERE project_id = p.id),
+        (SELECT max(last_updated) FROM party_party WHERE project_id = p.id),
+        (SELECT max(last_updated) FROM party_tenurerelationship
+         WHERE project_id = p.id),
+        (SELECT max(last_updated) FROM resources_resource
+         WHERE project_id = p.id)),
+    nextval('organization_locations_version_seq')
+FROM organization_project p
+"""
+
+
+class ProjectStatisticsManager(models.Manager):
+    def rebuild(self, project_ids=None):
+        """
+        Recounts the records of the projects with ``project_ids``, or of all
+        projects. Writes to the counted tables wait until the rebuild is
+        done, so that no change is lost.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('LOCK TABLE spatial_spatialunit, party_party, '
+                           'party_tenurerelationship, resources_resource '
+                           'IN SHARE MODE')
+            if project_ids is None:
+                self.all().delete()
+                cursor.execute(REBUILD_SQL)
+            else:
+                project_ids = list(project_ids)
+                self.filter(project_id__in=project_ids).delete()
+                cursor.execute(REBUILD_SQL + 'WHERE p.id = ANY(%s)',
+                               [project_ids])
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 09:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+COUNT_FUNC_SQL = """
+CREATE FUNCTION {func}() RETURNS trigger AS $$
+DECLARE
+    old_count integer := 0;
+    new_count integer := 0;
+BEGIN
+    IF (TG_OP <> 'INSERT')
+    THEN
+        IF ({condition_old})
+        THEN
+            old_count := 1;
+        END IF;
+    END IF;
+    IF (TG_OP <> 'DELETE')
+    THEN
+        IF ({condition_new})
+        THEN
+            new_count := 1;
+        END IF;
+    END IF;
+
+    IF (TG_OP = 'INSERT')
+    THEN
+        UPDATE organization_projectstatistics
+        SET {column} = {column} + new_count, last_updated = now()
+        WHERE project_id = NEW.project_id;
+    ELSIF (TG_OP = 'DELETE')
+    THEN
+        UPDATE organization_projectstatistics
+        SET {column} = {column} - old_count, last_updated = now()
+        WHERE project_id = OLD.project_id;
+    ELSIF (OLD.project_id = NEW.project_id)
+    THEN
+        UPDATE organization_projectstatistics
+        SET {column} = {column} - old_count + new_count, last_updated = now()
+        WHERE project_id = NEW.project_id;
+    ELSE
+        UPDATE organization_projectstatistics
+        SET {column} = {column} - old_count, last_updated = now()
+        WHERE project_id = OLD.project_id;
+        UPDATE organization_projectstatistics
+        SET {column} = {column} + new_count, last_updated = now()
+        WHERE project_id = NEW.project_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ language plpgsql;
+
+CREATE TRIGGER {trigger}
+    AFTER INSERT OR UPDATE OR DELETE
+    ON {table}
+    FOR EACH ROW
+    EXECUTE PROCEDURE {func}();
+"""
+
+DROP_SQL = """
+DROP TRIGGER {trigger} ON {table};
+DROP FUNCTION {func}();
+"""
+
+REBUILD_SQL = """
+INSERT INTO organization_projectstatistics (
+    project_id, num_locations, num_parties, num_relationships, num_resources,
+    last_updated)
+SELECT
+    p.id,
+    (SELECT count(*) FROM spatial_spatialunit WHERE project_id = p.id),
+    (SELECT count(*) FROM party_party WHERE project_id = p.id),
+    (SELECT count(*) FROM party_tenurerelationship WHERE project_id = p.id),
+    (SELECT count(*) FROM resources_resource
+     WHERE project_id = p.id AND NOT archived),
+    GREATEST(
+        (SELECT max(last_updated) FROM spatial_spatialunit
+         WHERE project_id = p.id),
+        (SELECT max(last_updated) FROM party_party WHERE project_id = p.id),
+        (SELECT max(last_updated) FROM party_tenurerelationship
+         WHERE project_id = p.id),
+        (SELECT max(last_updated) FROM resources_resource
+         WHERE project_id = p.id))
+FROM organization_project p
+"""
+
+
+def count_trigger(table, column, condition='TRUE'):
+    names = {
+        'table': table,
+        'func': 'count_project_{}'.format(column),
+        'trigger': 'count_project_{}_trigger'.format(column),
+    }
+    return migrations.RunSQL(
+        COUNT_FUNC_SQL.format(
+            column=column,
+            condition_old=condition.format(row='OLD'),
+            condition_new=condition.format(row='NEW'),
+            **names),
+        reverse_sql=DROP_SQL.format(**names),
+    )
+
+
+class Migration(migrations.Migration):
+
+    TABLE_NAME = 'organization_project'
+    FUNC_NAME = 'create_project_statistics'
+    TRIGGER_NAME = '{}_trigger'.format(FUNC_NAME)
+
+    dependencies = [
+        ('organization', '0008_add_audit_fields'),
+        ('party', '0006_increase_tenure_type_maxlength'),
+        ('resources', '0009_add_resource_thumbnails'),
+        ('spatial', '0012_populate_label_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStatistics',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='organization.Project')),
+                ('num_locations', models.IntegerField(default=0)),
+                ('num_parties', models.IntegerField(default=0)),
+                ('num_relationships', models.IntegerField(default=0)),
+                ('num_resources', models.IntegerField(default=0)),
+                ('last_updated', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.RunSQL(
+            REBUILD_SQL,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(
+            """
+            CREATE FUNCTION {func}() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO organization_projectstatistics (
+                    project_id, num_locations, num_parties,
+                    num_relationships, num_resources)
+                VALUES (NEW.id, 0, 0, 0, 0);
+                RETURN NULL;
+            END;
+            $$ language plpgsql;
+
+            CREATE TRIGGER {trigger}
+                AFTER INSERT
+                ON {table}
+                FOR EACH ROW
+                EXECUTE PROCEDURE {func}();
+            """.format(func=FUNC_NAME, trigger=TRIGGER_NAME, table=TABLE_NAME),
+            reverse_sql=DROP_SQL.format(
+                func=FUNC_NAME, trigger=TRIGGER_NAME, table=TABLE_NAME)
+        ),
+        count_trigger('spatial_spatialunit', 'num_locations'),
+        count_trigger('party_party', 'num_parties'),
+        count_trigger('party_tenurerelationship', 'num_relationships'),
+        count_trigger('resources_resource', 'num_resources',
+                      condition='NOT {row}.archived'),
+    ]
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 16:20
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+# Same counts as the functions of 0009_add_project_statistics, but the
+# statistics row is only updated when a number changes. Other writes, such
+# as attribute edits, no longer lock the row of the project, which a long
+# import would otherwise hold until it commits.
+COUNT_FUNC_SQL = """
+CREATE OR REPLACE FUNCTION {func}() RETURNS trigger AS $$
+DECLARE
+    old_count integer := 0;
+    new_count integer := 0;
+BEGIN
+    IF (TG_OP <> 'INSERT')
+    THEN
+        IF ({condition_old})
+        THEN
+            old_count := 1;
+        END IF;
+    END IF;
+    IF (TG_OP <> 'DELETE')
+    THEN
+        IF ({condition_new})
+        THEN
+            new_count := 1;
+        END IF;
+    END IF;
+
+    IF (TG_OP = 'INSERT')
+    THEN
+        IF (new_count <> 0)
+        THEN
+            UPDATE organization_projectstatistics
+            SET {column} = {column} + new_count, last_updated = now()
+            WHERE project_id = NEW.project_id;
+        END IF;
+    ELSIF (TG_OP = 'DELETE')
+    THEN
+        IF (old_count <> 0)
+        THEN
+            UPDATE organization_projectstatistics
+            SET {column} = {column} - old_count, last_updated = now()
+            WHERE project_id = OLD.project_id;
+        END IF;
+    ELSIF (OLD.project_id = NEW.project_id)
+    THEN
+        IF (old_count <> new_count)
+        THEN
+            UPDATE organization_projectstatistics
+            SET {column} = {column} - old_count + new_count,
+                last_updated = now()
+            WHERE project_id = NEW.project_id;
+        END IF;
+    ELSE
+        IF (old_count <> 0)
+        THEN
+            UPDATE organization_projectstatistics
+            SET {column} = {column} - old_count, last_updated = now()
+            WHERE project_id = OLD.project_id;
+        END IF;
+        IF (new_count <> 0)
+        THEN
+            UPDATE organization_projectstatistics
+            SET {column} = {column} + new_count, last_updated = now()
+            WHERE project_id = NEW.project_id;
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ language plpgsql;
+"""
+
+COUNTED_COLUMNS = (
+    ('num_locations', 'TRUE'),
+    ('num_parties', 'TRUE'),
+    ('num_relationships', 'TRUE'),
+    ('num_resources', 'NOT {row}.archived'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0009_add_project_statistics'),
+    ]
+
+    # The functions are replaced in place, and the ones they replace
+    # counted the same, so there is nothing to undo
+    operations = [
+        migrations.RunSQL(
+            COUNT_FUNC_SQL.format(
+                func='count_project_{}'.format(column),
+                column=column,
+                condition_old=condition.format(row='OLD'),
+                condition_new=condition.format(row='NEW')),
+            reverse_sql=migrations.RunSQL.noop)
+        for column, condition in COUNTED_COLUMNS
+    ]
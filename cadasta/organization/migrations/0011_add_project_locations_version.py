@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 16:50
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+# Versions are drawn from a sequence, so a version is never reused, even
+# after the statistics of a project are rebuilt
+SEQUENCE_SQL = """
+CREATE SEQUENCE organization_locations_version_seq;
+ALTER TABLE organization_projectstatistics
+    ALTER COLUMN locations_version SET DEFAULT 0;
+"""
+
+DROP_SEQUENCE_SQL = """
+DROP SEQUENCE organization_locations_version_seq;
+"""
+
+# Only the columns that are drawn on the map tiles bump the version
+VERSION_FUNC_SQL = """
+CREATE FUNCTION {func}() RETURNS trigger AS $$
+BEGIN
+    IF (TG_OP = 'INSERT')
+    THEN
+        UPDATE organization_projectstatistics
+        SET locations_version = nextval('organization_locations_version_seq')
+        WHERE project_id = NEW.project_id;
+    ELSIF (TG_OP = 'DELETE')
+    THEN
+        UPDATE organization_projectstatistics
+        SET locations_version = nextval('organization_locations_version_seq')
+        WHERE project_id = OLD.project_id;
+    ELSIF (OLD.project_id <> NEW.project_id)
+    THEN
+        UPDATE organization_projectstatistics
+        SET locations_version = nextval('organization_locations_version_seq')
+        WHERE project_id IN (OLD.project_id, NEW.project_id);
+    ELSIF (OLD.type IS DISTINCT FROM NEW.type OR
+           OLD.label IS DISTINCT FROM NEW.label OR
+           OLD.geometry::text IS DISTINCT FROM NEW.geometry::text)
+    THEN
+        UPDATE organization_projectstatistics
+        SET locations_version = nextval('organization_locations_version_seq')
+        WHERE project_id = NEW.project_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ language plpgsql;
+
+CREATE TRIGGER {trigger}
+    AFTER INSERT OR UPDATE OR DELETE
+    ON {table}
+    FOR EACH ROW
+    EXECUTE PROCEDURE {func}();
+"""
+
+DROP_SQL = """
+DROP TRIGGER {trigger} ON {table};
+DROP FUNCTION {func}();
+"""
+
+
+class Migration(migrations.Migration):
+
+    TABLE_NAME = 'spatial_spatialunit'
+    FUNC_NAME = 'bump_project_locations_version'
+    TRIGGER_NAME = '{}_trigger'.format(FUNC_NAME)
+
+    dependencies = [
+        ('organization', '0010_skip_unchanged_project_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectstatistics',
+            name='locations_version',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunSQL(SEQUENCE_SQL, reverse_sql=DROP_SEQUENCE_SQL),
+        migrations.RunSQL(
+            VERSION_FUNC_SQL.format(
+                func=FUNC_NAME, trigger=TRIGGER_NAME, table=TABLE_NAME),
+            reverse_sql=DROP_SQL.format(
+                func=FUNC_NAME, trigger=TRIGGER_NAME, table=TABLE_NAME)
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.utils.functional import cached_property
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django_countries.fields import CountryField
 from django.contrib.contenttypes.fields import GenericRelation
@@ -14,11 +15,12 @@ from shapely.geometry import Polygon
 from shapely.wkt import dumps
 
 from tutelary.decorators import permissioned_model
-from tutelary.models import Policy
 
+from accounts.permissions import get_policy
 from core.models import RandomIDModel, SlugModel
 from geography.models import WorldBorder
 from resources.mixins import ResourceModelMixin
+from .managers import ProjectStatisticsManager
 from .validators import validate_contact
 from .choices import ROLE_CHOICES, ACCESS_CHOICES
 from . import messages
@@ -26,9 +28,13 @@ from . import messages
 
 PERMISSIONS_DIR = settings.BASE_DIR + '/permissions/'
 
+# Cache key of the dashboard map features of public projects (see
+# organization.extents)
+PUBLIC_EXTENTS_CACHE_KEY = 'organization:public_extents'
+
 
 def get_policy_instance(policy_name, variables):
-    policy = Policy.objects.get(name=policy_name)
+    policy = get_policy(policy_name)
     return (policy, variables)
 
 
@@ -287,8 +293,14 @@ class Project(ResourceModelMixin, SlugModel, RandomIDModel):
 
     @cached_property
     def has_records(self):
-        check_records = ['parties', 'tenure_relationships', 'spatial_units']
-        return any([getattr(self, r).exists() for r in check_records])
+        try:
+            stats = self.stats
+        except ProjectStatistics.DoesNotExist:
+            check_records = ['parties', 'tenure_relationships',
+                             'spatial_units']
+            return any([getattr(self, r).exists() for r in check_records])
+        return (stats.num_parties > 0 or stats.num_relationships > 0 or
+                stats.num_locations > 0)
 
     def save(self, *args, **kwargs):
         if ((self.country is None or self.country == '') and
@@ -329,6 +341,50 @@ def check_extent(sender, instance, **kwargs):
         reassign_project_extent(instance)
 
 
+@receiver(models.signals.post_save, sender=Organization)
+@receiver(models.signals.post_delete, sender=Organization)
+@receiver(models.signals.post_save, sender=Project)
+@receiver(models.signals.post_delete, sender=Project)
+def clear_public_extents(sender, instance, **kwargs):
+    cache.delete(PUBLIC_EXTENTS_CACHE_KEY)
+
+
+class ProjectStatistics(models.Model):
+    """
+    Numbers of records of a project. The row of a project is created and
+    kept up to date by database triggers (see organization migrations 0009
+    and 0010) and can be recounted with the ``rebuildprojectstats``
+    command. The total area of the locations is kept on ``Project.area``.
+    """
+    project = models.OneToOneField(Project, primary_key=True,
+                                   related_name='stats')
+    num_locations = models.IntegerField(default=0)
+    num_parties = models.IntegerField(default=0)
+    num_relationships = models.IntegerField(default=0)
+    # Archived resources are not counted
+    num_resources = models.IntegerField(default=0)
+    # Time the numbers last changed
+    last_updated = models.DateTimeField(null=True)
+    # Changes whenever a location is added, removed, moved, or has its type
+    # or label changed (see organization migration 0011)
+    locations_version = models.BigIntegerField(default=0)
+
+    objects = ProjectStatisticsManager()
+
+    def __repr__(self):
+        repr_string = ('<ProjectStatistics project={obj.project_id}'
+                       ' num_locations={obj.num_locations}'
+                       ' num_parties={obj.num_parties}'
+                       ' num_relationships={obj.num_relationships}'
+                       ' num_resources={obj.num_resources}>')
+        return repr_string.format(obj=self)
+
+    @property
+    def has_content(self):
+        return (self.num_locations > 0 or self.num_parties > 0 or
+                self.num_resources > 0)
+
+
 class ProjectRole(RandomIDModel):
     project = models.ForeignKey(Project)
     user = models.ForeignKey('accounts.User')
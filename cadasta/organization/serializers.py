@@ -10,7 +10,8 @@ from django_countries.serializer_fields import CountryField
 from core import serializers as core_serializers
 from accounts.models import User
 from accounts.serializers import UserSerializer
-from .models import Organization, Project, OrganizationRole, ProjectRole
+from .models import (Organization, Project, ProjectStatistics,
+                     OrganizationRole, ProjectRole)
 from .forms import create_update_or_delete_project_role
 
 
@@ -67,12 +68,23 @@ class OrganizationSerializer(core_serializers.SanitizeFieldSerializer,
         return org
 
 
+class ProjectStatisticsSerializer(serializers.ModelSerializer):
+    area = serializers.FloatField(source='project.area', read_only=True)
+
+    class Meta:
+        model = ProjectStatistics
+        fields = ('num_locations', 'num_parties', 'num_relationships',
+                  'num_resources', 'area', 'last_updated',)
+        read_only_fields = fields
+
+
 class ProjectSerializer(core_serializers.SanitizeFieldSerializer,
                         core_serializers.DetailSerializer,
                         serializers.ModelSerializer):
     users = UserSerializer(many=True, read_only=True)
     organization = OrganizationSerializer(hide_detail=True, read_only=True)
     country = CountryField(required=False)
+    statistics = ProjectStatisticsSerializer(source='stats', read_only=True)
 
     def validate_name(self, value):
 
@@ -100,7 +112,7 @@ class ProjectSerializer(core_serializers.SanitizeFieldSerializer,
         model = Project
         fields = ('id', 'organization', 'country', 'name', 'description',
                   'archived', 'urls', 'contacts', 'users', 'access', 'slug',
-                  'extent',)
+                  'extent', 'statistics',)
         read_only_fields = ('id', 'country', 'slug')
         detail_only_fields = ('users',)
 
@@ -0,0 +1,105 @@
+"""
+Streaming export of the locations, parties and tenure relationships of a
+project, as a GeoJSON feature collection or as newline-delimited GeoJSON
+features.
+
+Rows are read through server-side cursors and written out as they arrive,
+and geometries are rendered by PostGIS (``ST_AsGeoJSON``) instead of being
+loaded into GEOS objects, so an export takes the same memory however large
+the project is.
+"""
+import json
+from collections import OrderedDict
+
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.core.serializers.json import DjangoJSONEncoder
+
+from party.models import Party, TenureRelationship
+from spatial.models import SpatialUnit
+
+# (entity, model, fields, geometry field). The first field is the feature ID
+EXPORT_SOURCES = (
+    ('location', SpatialUnit,
+     ('id', 'type', 'area', 'attributes'), 'geometry'),
+    ('party', Party,
+     ('id', 'name', 'type', 'attributes'), None),
+    ('relationship', TenureRelationship,
+     ('id', 'party_id', 'spatial_unit_id', 'tenure_type', 'attributes'), None),
+)
+EXPORT_CONTENT_TYPES = OrderedDict([
+    ('geojson', 'application/geo+json'),
+    ('ndjson', 'application/x-ndjson'),
+])
+# Features are written in chunks of about this many characters
+BUFFER_SIZE = 64 * 1024
+
+
+def render_feature(entity, fields, row, geometry=None):
+    properties = OrderedDict([('entity', entity)])
+    properties.update(zip(fields[1:], row[1:]))
+    return '{{"type": "Feature", "id": {}, "geometry": {}, ' \
+           '"properties": {}}}'.format(
+               json.dumps(row[0]), geometry or 'null',
+               json.dumps(properties, cls=DjangoJSONEncoder))
+
+
+def iter_features(project):
+    """
+    Yields the locations, parties and tenure relationships of ``project``
+    as GeoJSON features, each rendered to a string.
+    """
+    for entity, model, fields, geometry in EXPORT_SOURCES:
+        queryset = model.objects.filter(project=project).order_by()
+        if geometry is None:
+            rows = queryset.values_list(*fields)
+        else:
+            queryset = queryset.annotate(geojson=AsGeoJSON(geometry))
+            rows = queryset.values_list(*(fields + ('geojson',)))
+
+        # iterator() reads through a server-side cursor on PostgreSQL and
+        # does not keep the rows in the queryset cache
+        for row in rows.iterator():
+            if geometry is None:
+                yield render_feature(entity, fields, row)
+            else:
+                yield render_feature(entity, fields, row[:-1], row[-1])
+
+
+def buffer(chunks, size=BUFFER_SIZE):
+    """Joins ``chunks`` into strings of at least ``size`` characters."""
+    buffered = []
+    length = 0
+    for chunk in chunks:
+        buffered.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffered)
+            buffered = []
+            length = 0
+    if buffered:
+        yield ''.join(buffered)
+
+
+def iter_geojson(project):
+    yield '{"type": "FeatureCollection", "features": ['
+    separator = ''
+    for feature in iter_features(project):
+        yield separator + feature
+        separator = ', '
+    yield ']}\n'
+
+
+def iter_ndjson(project):
+    for feature in iter_features(project):
+        yield feature + '\n'
+
+
+def stream_export(project, export_type='geojson'):
+    """
+    Returns an iterator over the export of ``project`` in ``export_type``
+    (one of ``EXPORT_CONTENT_TYPES``), in chunks of about ``BUFFER_SIZE``
+    characters.
+    """
+    if export_type == 'ndjson':
+        return buffer(iter_ndjson(project))
+    return buffer(iter_geojson(project))
@@ -0,0 +1,170 @@
+"""
+Changes to the locations, parties and tenure relationships of a project
+since a sync token, for clients that keep a copy of the project.
+
+A token records, for each kind of entity, the ``(last_updated, id)`` key of
+the last change and the ``(history_date, history_id)`` key of the last
+deletion sent to the client, so that the next sync reads the live and the
+history tables from there onwards.
+
+Rows are stamped when they are saved but only become visible when their
+transaction commits, which for an import can be minutes later. A token
+therefore never moves past the start of the oldest transaction that is
+still writing, nor past the last ``SYNC_CHANGES_OVERLAP`` seconds.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.translation import ugettext as _
+from rest_framework.exceptions import NotFound
+
+from core.pagination import decode_cursor, encode_cursor, keyset_filter
+from party.models import Party, TenureRelationship
+from spatial.models import SpatialUnit
+
+CHANGE_SOURCES = (
+    ('locations', SpatialUnit),
+    ('parties', Party),
+    ('relationships', TenureRelationship),
+)
+UPDATE_KEY = ('last_updated', 'id')
+DELETE_KEY = ('history_date', 'history_id')
+
+# Start of the oldest other transaction that has written to the database.
+# pg_stat_activity only shows this for sessions of the same database user,
+# which all connections of the platform share.
+OLDEST_WRITE_SQL = """
+SELECT min(xact_start) FROM pg_stat_activity
+WHERE datname = current_database()
+  AND pid <> pg_backend_pid()
+  AND backend_xid IS NOT NULL
+"""
+
+
+def get_position(obj, key):
+    values = [getattr(obj, field) for field in key]
+    return [v.isoformat() if isinstance(v, datetime) else v for v in values]
+
+
+def decode_token(token):
+    """
+    Returns the positions stored in a sync token: an update and a deletion
+    position per change source, ``None`` if it has not been synced yet.
+    """
+    positions = decode_cursor(token, 2 * len(CHANGE_SOURCES))
+    if positions is None:
+        return [None] * (2 * len(CHANGE_SOURCES))
+    for position in positions:
+        if position is not None and (not isinstance(position, list) or
+                                     len(position) != 2):
+            raise NotFound(_("Invalid sync token."))
+    return positions
+
+
+def read_after(queryset, key, position, limit):
+    """
+    Returns up to ``limit`` rows of ``queryset`` after ``position`` in
+    ``key`` order, and whether more rows are waiting.
+    """
+    queryset = queryset.order_by(*key)
+    if position is not None:
+        queryset = queryset.filter(
+            keyset_filter(queryset.model, key, position))
+    rows = list(queryset[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def get_oldest_write_start():
+    with connection.cursor() as cursor:
+        cursor.execute(OLDEST_WRITE_SQL)
+        return cursor.fetchone()[0]
+
+
+def get_horizon():
+    """
+    Returns the time before which all changes are assumed to be committed.
+    """
+    horizon = timezone.now() - timedelta(
+        seconds=settings.SYNC_CHANGES_OVERLAP)
+    oldest_write = get_oldest_write_start()
+    if oldest_write is not None and oldest_write < horizon:
+        return oldest_write
+    return horizon
+
+
+def get_next_position(rows, more, key, horizon):
+    """
+    Returns the position after ``rows`` for the next sync, and whether more
+    rows can be read from there.
+    """
+    if rows and getattr(rows[-1], key[0]) < horizon:
+        return get_position(rows[-1], key), more
+    # Transactions that are still open may commit rows stamped before the
+    # last row, so the rows after the horizon are sent again. They are read
+    # again once the horizon has moved past them.
+    return [horizon.isoformat(), '' if key == UPDATE_KEY else 0], False
+
+
+def get_changes(project, token=None, limit=None):
+    """
+    Returns the changes to ``project`` since ``token``, the token for the
+    next sync and whether more changes are waiting.
+
+    The changes are a dict of ``{source: {'created': [...],
+    'updated': [...], 'deleted': [ids]}}``. Without a token, all entities
+    of the project are returned as created, and no deletions.
+    """
+    limit = limit or settings.SYNC_CHANGES_LIMIT
+    horizon = get_horizon()
+    positions = decode_token(token)
+
+    changes = OrderedDict()
+    next_positions = []
+    more_changes = False
+    for index, (name, model) in enumerate(CHANGE_SOURCES):
+        updated_at = positions[2 * index]
+        deleted_at = positions[2 * index + 1]
+
+        rows, more = read_after(model.objects.filter(project=project),
+                                UPDATE_KEY, updated_at, limit)
+        position, more = get_next_position(rows, more, UPDATE_KEY, horizon)
+        next_positions.append(position)
+        more_changes = more_changes or more
+
+        since = None
+        if updated_at is not None:
+            since = model._meta.get_field('last_updated').to_python(
+                updated_at[0])
+        created = [obj for obj in rows
+                   if since is None or obj.created_date > since]
+        updated = [obj for obj in rows
+                   if since is not None and obj.created_date <= since]
+
+        # A first sync starts from the current state, so deletions only
+        # matter from then on
+        deleted = []
+        if deleted_at is None:
+            next_positions.append(get_next_position(
+                [], False, DELETE_KEY, horizon)[0])
+        else:
+            tombstones = model.history.filter(
+                project_id=project.id, history_type='-').only(
+                'id', *DELETE_KEY)
+            tombstones, more = read_after(tombstones, DELETE_KEY, deleted_at,
+                                          limit)
+            position, more = get_next_position(tombstones, more, DELETE_KEY,
+                                               horizon)
+            next_positions.append(position)
+            more_changes = more_changes or more
+            deleted = [tombstone.id for tombstone in tombstones]
+
+        changes[name] = OrderedDict([
+            ('created', created),
+            ('updated', updated),
+            ('deleted', deleted),
+        ])
+
+    return changes, encode_cursor(next_positions), more_changes
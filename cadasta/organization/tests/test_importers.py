@@ -1,6 +1,7 @@
-import pytest
+from types import SimpleNamespace
 
-import pandas as pd
+import pytest
+from openpyxl import load_workbook
 from core.tests.utils.cases import FileStorageTestCase, UserTestCase
 from core.messages import SANITIZE_ERROR
 from django.contrib.contenttypes.models import ContentType
@@ -10,7 +11,7 @@ from django.test import TestCase
 from jsonattrs.models import Attribute, AttributeType, Schema
 from party.models import Party, TenureRelationship
 from party.choices import TENURE_RELATIONSHIP_TYPES
-from questionnaires.models import Questionnaire
+from questionnaires.models import Questionnaire, QuestionOption
 from questionnaires.tests import factories as q_factories
 from resources.tests.utils import clear_temp  # noqa
 from spatial.models import SpatialUnit
@@ -62,7 +63,7 @@ class BaseImporterTest(UserTestCase, TestCase):
         assert type(val) is float
         assert val == 0.0
 
-    def test_map_attrs_to_content_types_with_emoji(self):
+    def test_map_attrs_with_emoji(self):
         project = ProjectFactory.create(current_questionnaire='123abc')
         content_type = ContentType.objects.get(
             app_label='party', model='party'
@@ -97,11 +98,53 @@ class BaseImporterTest(UserTestCase, TestCase):
             }
         }
         importer = Importer(project=project)
+        plan = importer._compile_attr_map(headers, attributes, attr_map)
         with pytest.raises(ValidationError) as e:
-            importer._map_attrs_to_content_types(
-                headers, row, contenttypes, attributes, attr_map)
+            importer._map_attrs(row, contenttypes, plan)
         assert e.value.message == SANITIZE_ERROR
 
+    def test_compile_attr_map(self):
+        project = ProjectFactory.build()
+        importer = Importer(project=project)
+        attr_map = {
+            'party.party': {
+                'IN': {
+                    'age': (fake_attribute('age', 'integer'),
+                            'party.party', 'Party'),
+                    'crops': (fake_attribute('crops', 'select_multiple'),
+                              'party.party', 'Party'),
+                    'notes': (fake_attribute('notes', 'text'),
+                              'party.party', 'Party'),
+                }
+            }
+        }
+        headers = ['party_type', 'notes', 'party::crops', 'age']
+        plan = importer._compile_attr_map(
+            headers, ['party::age', 'party::crops'], attr_map)
+        assert len(plan) == 1
+        model, selector, attr_columns = plan[0]
+        assert (model, selector) == ('party.party', 'IN')
+        assert [(c[0], c[1]) for c in attr_columns] == [
+            ('age', 3), ('crops', 2)]
+
+        content_types = {
+            'party.party': {'type': 'IN', 'attributes': {}},
+            'spatial.spatialunit': None
+        }
+        importer._map_attrs(['IN', 'a note', 'maize, rice', '4.0'],
+                            content_types, plan)
+        assert content_types['party.party']['attributes'] == {
+            'age': 4, 'crops': ['maize', 'rice']}
+
+        content_types = {'party.party': {'type': 'GR', 'attributes': {}}}
+        importer._map_attrs(['GR', '', 'maize', '4'], content_types, plan)
+        assert content_types['party.party']['attributes'] == {}
+
+
+def fake_attribute(name, attr_type, required=False):
+    return SimpleNamespace(name=name, required=required,
+                           attr_type=SimpleNamespace(name=attr_type))
+
 
 class ImportValidatorTest(TestCase):
 
@@ -480,6 +523,77 @@ class CSVImportTest(UserTestCase, FileStorageTestCase, TestCase):
         assert len(tenure_relationships[0].attributes) == 2
         assert tenure_relationships[0].attributes == tr_attrs
 
+    def test_import_data_in_batches(self):
+        importer = csv.CSVImporter(
+            project=self.project, path=self.path + self.valid_csv)
+        config = {
+            'file': self.path + self.valid_csv,
+            'entity_types': ['PT', 'SU'],
+            'party_name_field': 'name_of_hh',
+            'party_type_field': 'party_type',
+            'location_type_field': 'location_type',
+            'geometry_field': 'location_geometry',
+            'attributes': self.attributes,
+            'project': self.project,
+            'allowed_tenure_types': [t[0] for t in TENURE_RELATIONSHIP_TYPES],
+            'allowed_location_types': [choice[0] for choice in TYPE_CHOICES],
+            'batch_size': 4
+        }
+        importer.import_data(config)
+        assert Party.objects.all().count() == 10
+        assert SpatialUnit.objects.all().count() == 10
+        assert TenureRelationship.objects.all().count() == 10
+        assert Party.history.filter(history_type='+').count() == 10
+        assert SpatialUnit.history.filter(history_type='+').count() == 10
+        assert TenureRelationship.history.filter(
+            history_type='+').count() == 10
+
+        # test spatial unit attribute and label creation
+        su = SpatialUnit.objects.get(
+            attributes__contains={'nid_number': '3913647224045'})
+        assert su.type == 'PA'
+        assert len(su.attributes) == 20
+        assert su.attributes['female_member'] == 4
+        assert su.attributes['location_problems'] == [
+            'conflict', 'risk_of_eviction'
+        ]
+        assert su.label == QuestionOption.objects.get(
+            name='PA', question__name='location_type').label_xlat
+
+        # test party and tenure relationship attribute creation
+        party = Party.objects.get(
+            attributes__contains={'Mobile_No': '০১৭৭২৫৬০১৯১'})
+        assert len(party.attributes) == 8
+        tenure_relationships = TenureRelationship.objects.filter(party=party)
+        assert len(tenure_relationships) == 1
+        assert tenure_relationships[0].attributes == {
+            'tenure_name': 'Customary', 'tenure_notes': 'a few notes'}
+
+    def test_import_data_in_batches_with_invalid_row(self):
+        importer = csv.CSVImporter(
+            project=self.project, path=self.path + self.valid_csv)
+        config = {
+            'file': self.path + self.valid_csv,
+            'entity_types': ['PT', 'SU'],
+            'party_name_field': 'name_of_hh',
+            'party_type_field': 'party_type',
+            'location_type_field': 'location_type',
+            'geometry_field': 'location_geometry',
+            'attributes': self.attributes,
+            'project': self.project,
+            'allowed_tenure_types': [t[0] for t in TENURE_RELATIONSHIP_TYPES],
+            'allowed_location_types': ['PA'],
+            'batch_size': 1
+        }
+        with pytest.raises(exceptions.DataImportError) as e:
+            importer.import_data(config)
+        assert str(e.value) == (
+            "Error importing file at line 3: Invalid location_type: 'BU'."
+        )
+        assert Party.objects.all().count() == 0
+        assert SpatialUnit.objects.all().count() == 0
+        assert TenureRelationship.objects.all().count() == 0
+
     def test_import_parties_only(self):
         importer = csv.CSVImporter(
             project=self.project, path=self.path + self.valid_csv)
@@ -841,38 +955,71 @@ class XLSImportTest(UserTestCase, FileStorageTestCase, TestCase):
         assert party.tenure_relationships.all().count() == 3
 
     def test_missing_relationship_tab(self):
-        df = pd.read_excel(self.path + self.valid_xls, sheetname=None)
-        del df['relationships']
+        workbook = load_workbook(self.path + self.valid_xls)
+        workbook.remove(workbook['relationships'])
         entity_types = ['SU', 'PT']
         with pytest.raises(exceptions.DataImportError) as e:
-            xls.get_csv_from_dataframe(df, entity_types)
+            xls.WorkbookReader(workbook, entity_types)
         assert e is not None
         assert str(e.value) == (
             "Error importing file: Missing 'relationships' worksheet."
         )
 
     def test_empty_party_data(self):
-        df = pd.read_excel(self.path + self.valid_xls, sheetname=None)
-        empty_parties = pd.DataFrame()
-        df['parties'] = empty_parties
+        workbook = load_workbook(self.path + self.valid_xls)
+        workbook.remove(workbook['parties'])
+        workbook.create_sheet('parties')
         entity_types = ['SU', 'PT']
         with pytest.raises(exceptions.DataImportError) as e:
-            xls.get_csv_from_dataframe(df, entity_types)
+            xls.WorkbookReader(workbook, entity_types)
         assert e is not None
         assert str(e.value) == (
             'Error importing file: Empty worksheet.'
         )
 
     def test_invalid_entity_type(self):
-        df = pd.read_excel(self.path + self.valid_xls, sheetname=None)
+        workbook = load_workbook(self.path + self.valid_xls, read_only=True)
         entity_types = ['INVALID']
         with pytest.raises(exceptions.DataImportError) as e:
-            xls.get_csv_from_dataframe(df, entity_types)
+            xls.WorkbookReader(workbook, entity_types)
         assert e is not None
         assert str(e.value) == (
             'Error importing file: Unsupported import format.'
         )
 
+    def test_workbook_reader(self):
+        workbook = load_workbook(
+            self.path + self.one_to_many_xls, read_only=True)
+        reader = xls.WorkbookReader(workbook, ['SU', 'PT'])
+        headers = next(reader)
+        assert 'spatialunit::id' not in headers
+        assert 'party::id' not in headers
+        assert headers[0] == 'spatialunit::type'
+        assert headers[-1] == 'party::class_hh'
+        rows = list(reader)
+        assert all(len(row) == len(headers) for row in rows)
+        assert reader.line_num == 17
+
+        su_id = headers.index('tenurerelationship::spatial_unit_id')
+        su_type = headers.index('spatialunit::type')
+        party_name = headers.index('party::name')
+        # 6 relationships, then 4 locations and 6 parties without one
+        assert len([r for r in rows if r[su_id]]) == 6
+        assert len([r for r in rows if not r[su_id] and r[su_type]]) == 4
+        assert len([r for r in rows if not r[su_type] and r[party_name]]) == 6
+
+    def test_get_header_map_is_cached(self):
+        importer = xls.XLSImporter(
+            project=self.project, path=self.path + self.valid_xls)
+        header_map = importer.get_header_map()
+        assert list(header_map.keys()) == [
+            'locations', 'parties', 'relationships']
+        assert 'id' not in header_map['locations']
+        assert 'mobile_no' in header_map['parties']
+        assert header_map['relationships'] == [
+            'tenure_type', 'tenure_name', 'tenure_notes']
+        assert importer.get_header_map() is header_map
+
 
 class ImportConditionalAttributesTest(UserTestCase, FileStorageTestCase,
                                       TestCase):
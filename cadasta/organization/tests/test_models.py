@@ -1,15 +1,22 @@
+import pytest
+from io import StringIO
 from pytest import approx
 from django.conf import settings
+from django.core.management import call_command
 from django.test import TestCase
 
 from tutelary.models import Policy
 
 from core.tests.utils.cases import UserTestCase
+from core.tests.utils.files import make_dirs  # noqa
 from accounts.tests.factories import UserFactory
 from geography import load as load_countries
+from party.tests.factories import PartyFactory, TenureRelationshipFactory
+from resources.tests.factories import ResourceFactory
 from spatial.tests.factories import SpatialUnitFactory
 from .factories import OrganizationFactory, ProjectFactory
-from ..models import OrganizationRole, ProjectRole
+from ..models import (OrganizationRole, Project, ProjectRole,
+                      ProjectStatistics)
 
 PERMISSIONS_DIR = settings.BASE_DIR + '/permissions/'
 
@@ -252,6 +259,130 @@ class ProjectAreaTest(TestCase):
         assert approx(self.project.area) == self.sum_areas(self.su1, self.su2)
 
 
+@pytest.mark.usefixtures('make_dirs')
+class ProjectStatisticsTest(TestCase):
+    """
+    Checks the triggers defined in migrations 0009_add_project_statistics
+    and 0010_skip_unchanged_project_statistics, which keep the numbers of
+    records of a project up to date.
+    """
+
+    def setUp(self):
+        self.project = ProjectFactory.create()
+
+    def get_stats(self, project=None):
+        return ProjectStatistics.objects.get(project=project or self.project)
+
+    def test_new_project(self):
+        stats = self.get_stats()
+        assert stats.num_locations == 0
+        assert stats.num_parties == 0
+        assert stats.num_relationships == 0
+        assert stats.num_resources == 0
+        assert stats.last_updated is None
+        assert stats.has_content is False
+
+    def test_add_records(self):
+        TenureRelationshipFactory.create(project=self.project)
+        ResourceFactory.create(project=self.project)
+        stats = self.get_stats()
+        assert stats.num_locations == 1
+        assert stats.num_parties == 1
+        assert stats.num_relationships == 1
+        assert stats.num_resources == 1
+        assert stats.last_updated is not None
+        assert stats.has_content is True
+
+    def test_delete_records(self):
+        rel = TenureRelationshipFactory.create(project=self.project)
+        rel.delete()
+        rel.party.delete()
+        rel.spatial_unit.delete()
+        stats = self.get_stats()
+        assert stats.num_locations == 0
+        assert stats.num_parties == 0
+        assert stats.num_relationships == 0
+
+    def test_archive_resources(self):
+        ResourceFactory.create(project=self.project, archived=True)
+        resource = ResourceFactory.create(project=self.project)
+        assert self.get_stats().num_resources == 1
+
+        resource.archived = True
+        resource.save()
+        assert self.get_stats().num_resources == 0
+
+        resource.archived = False
+        resource.save()
+        assert self.get_stats().num_resources == 1
+
+    def test_update_without_count_change(self):
+        party = PartyFactory.create(project=self.project)
+        ProjectStatistics.objects.filter(project=self.project).update(
+            last_updated=None)
+        party.name = 'Updated'
+        party.save()
+        assert self.get_stats().last_updated is None
+        assert self.get_stats().num_parties == 1
+
+    def test_move_record_to_other_project(self):
+        other_project = ProjectFactory.create()
+        party = PartyFactory.create(project=self.project)
+        party.project = other_project
+        party.save()
+        assert self.get_stats().num_parties == 0
+        assert self.get_stats(other_project).num_parties == 1
+
+    def test_locations_version(self):
+        version = self.get_stats().locations_version
+        location = SpatialUnitFactory.create(project=self.project)
+        assert self.get_stats().locations_version != version
+
+        version = self.get_stats().locations_version
+        location.attributes = {'notes': 'Notes'}
+        location.save()
+        assert self.get_stats().locations_version == version
+
+        location.delete()
+        assert self.get_stats().locations_version != version
+
+    def test_rebuild_changes_locations_version(self):
+        version = self.get_stats().locations_version
+        ProjectStatistics.objects.rebuild([self.project.id])
+        assert self.get_stats().locations_version != version
+
+    def test_has_records(self):
+        assert self.project.has_records is False
+        PartyFactory.create(project=self.project)
+        project = Project.objects.get(id=self.project.id)
+        assert project.has_records is True
+
+    def test_rebuild(self):
+        SpatialUnitFactory.create(project=self.project)
+        ResourceFactory.create(project=self.project)
+        ProjectStatistics.objects.filter(project=self.project).update(
+            num_locations=10, num_resources=0)
+        ProjectStatistics.objects.rebuild([self.project.id])
+        stats = self.get_stats()
+        assert stats.num_locations == 1
+        assert stats.num_resources == 1
+
+    def test_rebuild_command(self):
+        other_project = ProjectFactory.create()
+        PartyFactory.create(project=self.project)
+        PartyFactory.create(project=other_project)
+        ProjectStatistics.objects.all().delete()
+
+        call_command('rebuildprojectstats', self.project.slug,
+                     stdout=StringIO())
+        assert self.get_stats().num_parties == 1
+        assert not ProjectStatistics.objects.filter(
+            project=other_project).exists()
+
+        call_command('rebuildprojectstats', stdout=StringIO())
+        assert self.get_stats(other_project).num_parties == 1
+
+
 class ProjectRoleTest(UserTestCase, TestCase):
     def setUp(self):
         super().setUp()
@@ -15,6 +15,7 @@ from core.messages import SANITIZE_ERROR
 from accounts.tests.factories import UserFactory
 from .. import serializers
 from ..models import OrganizationRole, ProjectRole
+from party.tests.factories import PartyFactory
 from .factories import OrganizationFactory, ProjectFactory
 
 
@@ -455,6 +456,17 @@ class ProjectSerializerTest(TestCase):
                 "Project with this name already exists"]
         }
 
+    def test_serialize_statistics(self):
+        project = ProjectFactory.create()
+        PartyFactory.create(project=project)
+        project.refresh_from_db()
+
+        data = serializers.ProjectSerializer(project).data
+        assert data['statistics']['num_parties'] == 1
+        assert data['statistics']['num_locations'] == 0
+        assert data['statistics']['area'] == 0
+        assert data['statistics']['last_updated'] is not None
+
 
 class ProjectGeometrySerializerTest(TestCase):
     def test_method_fields_work(self):
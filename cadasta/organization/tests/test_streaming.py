@@ -0,0 +1,69 @@
+import json
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+
+from core.tests.utils.cases import UserTestCase
+from party.tests.factories import TenureRelationshipFactory
+from spatial.tests.factories import SpatialUnitFactory
+from .factories import ProjectFactory
+from ..streaming import buffer, iter_features, stream_export
+
+
+class StreamExportTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create()
+        self.location = SpatialUnitFactory.create(
+            project=self.project, geometry=Point(1, 2))
+        self.tenure = TenureRelationshipFactory.create(
+            project=self.project, spatial_unit=self.location)
+        TenureRelationshipFactory.create()
+
+    def features(self):
+        return {feature['id']: feature for feature in
+                (json.loads(f) for f in iter_features(self.project))}
+
+    def test_iter_features(self):
+        features = self.features()
+        assert set(features) == {self.location.id, self.tenure.party.id,
+                                 self.tenure.id}
+
+        location = features[self.location.id]
+        assert location['geometry'] == {'type': 'Point',
+                                        'coordinates': [1, 2]}
+        assert location['properties']['entity'] == 'location'
+        assert location['properties']['type'] == self.location.type
+
+        party = features[self.tenure.party.id]
+        assert party['geometry'] is None
+        assert party['properties']['name'] == self.tenure.party.name
+
+        tenure = features[self.tenure.id]
+        assert tenure['properties']['party_id'] == self.tenure.party.id
+        assert tenure['properties']['spatial_unit_id'] == self.location.id
+
+    def test_location_without_geometry(self):
+        location = SpatialUnitFactory.create(project=self.project,
+                                             geometry=None)
+        assert self.features()[location.id]['geometry'] is None
+
+    def test_stream_geojson(self):
+        content = json.loads(''.join(stream_export(self.project, 'geojson')))
+        assert content['type'] == 'FeatureCollection'
+        assert len(content['features']) == 3
+
+    def test_stream_empty_project(self):
+        content = ''.join(stream_export(ProjectFactory.create()))
+        assert json.loads(content) == {'type': 'FeatureCollection',
+                                       'features': []}
+
+    def test_stream_ndjson(self):
+        lines = ''.join(stream_export(self.project, 'ndjson')).splitlines()
+        assert len(lines) == 3
+        assert all(json.loads(line)['type'] == 'Feature' for line in lines)
+
+    def test_buffer(self):
+        assert list(buffer(['ab', 'c', 'de', 'f'], size=3)) == ['abc', 'def']
+        assert list(buffer(['ab', 'c', 'd'], size=3)) == ['abc', 'd']
+        assert list(buffer([], size=3)) == []
@@ -0,0 +1,110 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import NotFound
+
+from core.tests.utils.cases import UserTestCase
+from party.tests.factories import PartyFactory, TenureRelationshipFactory
+from spatial.tests.factories import SpatialUnitFactory
+from .factories import ProjectFactory
+from ..sync import get_changes, get_horizon, get_oldest_write_start
+
+
+def ids(objs):
+    return sorted(obj.id for obj in objs)
+
+
+@override_settings(SYNC_CHANGES_OVERLAP=0)
+class GetChangesTest(UserTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create()
+        self.tenure = TenureRelationshipFactory.create(project=self.project)
+        self.party = self.tenure.party
+        self.location = self.tenure.spatial_unit
+        TenureRelationshipFactory.create()
+
+    def test_first_sync(self):
+        changes, token, more = get_changes(self.project)
+        assert ids(changes['locations']['created']) == [self.location.id]
+        assert ids(changes['parties']['created']) == [self.party.id]
+        assert ids(changes['relationships']['created']) == [self.tenure.id]
+        for name in ('locations', 'parties', 'relationships'):
+            assert changes[name]['updated'] == []
+            assert changes[name]['deleted'] == []
+        assert token
+        assert more is False
+
+    def test_sync_without_changes(self):
+        _, token, _ = get_changes(self.project)
+        changes, next_token, more = get_changes(self.project, token)
+        for name in ('locations', 'parties', 'relationships'):
+            assert changes[name] == {
+                'created': [], 'updated': [], 'deleted': []}
+        assert more is False
+
+    def test_sync_changes(self):
+        _, token, _ = get_changes(self.project)
+
+        location = SpatialUnitFactory.create(project=self.project)
+        self.party.name = 'Updated'
+        self.party.save()
+        tenure_id = self.tenure.id
+        self.tenure.delete()
+
+        changes, token, more = get_changes(self.project, token)
+        assert ids(changes['locations']['created']) == [location.id]
+        assert ids(changes['parties']['updated']) == [self.party.id]
+        assert changes['relationships']['deleted'] == [tenure_id]
+
+        changes, _, _ = get_changes(self.project, token)
+        assert changes['locations']['created'] == []
+        assert changes['parties']['updated'] == []
+        assert changes['relationships']['deleted'] == []
+
+    def test_sync_in_parts(self):
+        PartyFactory.create_batch(2, project=self.project)
+        changes, token, more = get_changes(self.project, limit=2)
+        assert len(changes['parties']['created']) == 2
+        assert more is True
+
+        changes, token, more = get_changes(self.project, token, limit=2)
+        assert len(changes['parties']['created'] +
+                   changes['parties']['updated']) == 1
+        assert more is False
+
+    @override_settings(SYNC_CHANGES_OVERLAP=60)
+    def test_recent_changes_are_sent_again(self):
+        _, token, _ = get_changes(self.project)
+        changes, _, _ = get_changes(self.project, token)
+        assert ids(changes['parties']['created']) == [self.party.id]
+
+    def test_open_transactions_hold_back_the_token(self):
+        oldest_write = self.party.last_updated - timedelta(seconds=1)
+        with patch('organization.sync.get_oldest_write_start',
+                   return_value=oldest_write):
+            _, token, _ = get_changes(self.project)
+            assert get_horizon() == oldest_write
+        changes, _, _ = get_changes(self.project, token)
+        assert ids(changes['parties']['created']) == [self.party.id]
+
+    def test_more_changes_after_the_horizon(self):
+        PartyFactory.create_batch(2, project=self.project)
+        with patch('organization.sync.get_oldest_write_start',
+                   return_value=self.party.last_updated):
+            changes, token, more = get_changes(self.project, limit=2)
+        assert len(changes['parties']['created']) == 2
+        assert more is False
+
+        changes, _, _ = get_changes(self.project, token, limit=2)
+        assert len(changes['parties']['created'] +
+                   changes['parties']['updated']) == 2
+
+    def test_oldest_write_start_ignores_own_transaction(self):
+        assert get_oldest_write_start() is None
+
+    def test_invalid_token(self):
+        with pytest.raises(NotFound):
+            get_changes(self.project, 'not-a-token')
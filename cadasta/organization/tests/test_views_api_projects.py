@@ -2,12 +2,14 @@ import json
 
 from django.test import TestCase
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIRequestFactory, force_authenticate
 from tutelary.models import Policy, assign_user_policies
 from skivvy import APITestCase
 
 from core.tests.utils.cases import UserTestCase
 from accounts.tests.factories import UserFactory
 from accounts.models import User
+from party.tests.factories import PartyFactory
 from .factories import OrganizationFactory, ProjectFactory, clause
 from ..models import Project, ProjectRole, OrganizationRole
 from ..views import api
@@ -922,3 +924,99 @@ class ProjectDetailAPITest(APITestCase, UserTestCase, TestCase):
         assert response.status_code == 405
         self.project.refresh_from_db()
         assert Project.objects.filter(id=self.project.id).exists()
+
+
+class ProjectChangesAPITest(APITestCase, UserTestCase, TestCase):
+    view_class = api.ProjectChanges
+
+    def setup_models(self):
+        self.user = UserFactory.create()
+        assign_policies(self.user, add_clauses=[{
+            'effect': 'allow',
+            'object': ['project/*/*'],
+            'action': ['spatial.list', 'party.list', 'tenure_rel.list']
+        }])
+        self.organization = OrganizationFactory.create(slug='namati')
+        self.project = ProjectFactory.create(
+            slug='project', organization=self.organization, access='private')
+        self.party = PartyFactory.create(project=self.project)
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.organization.slug,
+            'project': self.project.slug
+        }
+
+    def test_get_changes(self):
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        assert response.content['more'] is False
+        assert [party['id'] for party in
+                response.content['parties']['created']] == [self.party.id]
+        assert response.content['locations'] == {
+            'created': [], 'updated': [], 'deleted': []}
+
+        party_id = self.party.id
+        self.party.delete()
+        response = self.request(
+            user=self.user, get_data={'since': response.content['next']})
+        assert response.status_code == 200
+        assert response.content['parties']['deleted'] == [party_id]
+
+    def test_get_changes_with_invalid_token(self):
+        response = self.request(user=self.user,
+                                get_data={'since': 'not-a-token'})
+        assert response.status_code == 404
+
+    def test_get_changes_with_unauthorized_user(self):
+        response = self.request(user=UserFactory.create())
+        assert response.status_code == 403
+
+
+class ProjectExportStreamAPITest(APITestCase, UserTestCase, TestCase):
+    view_class = api.ProjectExportStream
+
+    def setup_models(self):
+        self.user = UserFactory.create()
+        assign_policies(self.user)
+        self.organization = OrganizationFactory.create(slug='namati')
+        self.project = ProjectFactory.create(
+            slug='project', organization=self.organization)
+        self.party = PartyFactory.create(project=self.project)
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.organization.slug,
+            'project': self.project.slug
+        }
+
+    def stream(self, get_data=None):
+        request = APIRequestFactory().get('/', get_data)
+        force_authenticate(request, user=self.user)
+        return self.view_class.as_view()(request, **self.setup_url_kwargs())
+
+    def test_export_geojson(self):
+        response = self.stream()
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/geo+json'
+        assert response['Content-Disposition'] == (
+            'attachment; filename=project.geojson')
+        content = json.loads(b''.join(response.streaming_content).decode())
+        assert [feature['id'] for feature in content['features']] == [
+            self.party.id]
+
+    def test_export_ndjson(self):
+        response = self.stream({'type': 'ndjson'})
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)['id'] for line in lines] == [self.party.id]
+
+    def test_export_unknown_type(self):
+        response = self.request(user=self.user, get_data={'type': 'xls'})
+        assert response.status_code == 400
+
+    def test_export_with_unauthorized_user(self):
+        response = self.request(user=UserFactory.create())
+        assert response.status_code == 403
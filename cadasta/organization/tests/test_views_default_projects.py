@@ -19,7 +19,8 @@ from django.template.loader import render_to_string
 from django.test import TestCase
 from jsonattrs.models import Attribute, Schema
 from skivvy import remove_csrf
-from organization.models import OrganizationRole, Project, ProjectRole
+from organization.models import (OrganizationRole, Project, ProjectRole,
+                                 ProjectStatistics)
 from party.models import Party, TenureRelationship
 from party.tests.factories import PartyFactory
 from questionnaires.models import Questionnaire
@@ -447,6 +448,14 @@ class ProjectDashboardTest(FileStorageTestCase, ViewTestCase, UserTestCase,
                                                        num_parties=1,
                                                        num_resources=1)
 
+    def test_get_without_statistics(self):
+        PartyFactory.create(project=self.project)
+        ProjectStatistics.objects.filter(project=self.project).delete()
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        assert response.content == self.render_content(has_content=True,
+                                                       num_parties=1)
+
     def test_get_with_labels(self):
         file = self.get_file(
             '/questionnaires/tests/files/ok-multilingual.xlsx', 'rb')
@@ -36,4 +36,12 @@ urlpatterns = [
         '(?P<project>[-\w]+)/users/(?P<username>[-@+.\w]+)/$',
         api.ProjectUsersDetail.as_view(),
         name='project_users_detail'),
+    url(
+        r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/changes/$',
+        api.ProjectChanges.as_view(),
+        name='project_changes'),
+    url(
+        r'^(?P<organization>[-\w]+)/projects/(?P<project>[-\w]+)/export/$',
+        api.ProjectExportStream.as_view(),
+        name='project_export'),
 ]
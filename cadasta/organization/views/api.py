@@ -1,20 +1,30 @@
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.translation import ugettext as _
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied, NotAuthenticated
+from rest_framework.exceptions import (PermissionDenied, NotAuthenticated,
+                                       ValidationError)
 from rest_framework import generics, filters, status
+from rest_framework.views import APIView
 from tutelary.mixins import APIPermissionRequiredMixin, PermissionsFilterMixin
 from tutelary.models import check_perms
-from core.mixins import update_permissions
+from core.mixins import PublicPermissionsFilterMixin, update_permissions
 
 from accounts.models import User
+from party.serializers import PartySerializer, TenureRelationshipSerializer
+from spatial.serializers import SpatialUnitSerializer
 
 from ..models import Organization, OrganizationRole, ProjectRole
-from .. import serializers
+from .. import serializers, streaming, sync
 from . import mixins
 
 
 class OrganizationList(PermissionsFilterMixin,
+                       PublicPermissionsFilterMixin,
                        APIPermissionRequiredMixin,
                        generics.ListCreateAPIView):
     lookup_url_kwarg = 'organization'
@@ -34,6 +44,9 @@ class OrganizationList(PermissionsFilterMixin,
     permission_filter_queryset = (lambda self, view, o: ('org.view',)
                                   if o.archived is False
                                   else ('org.view_archived',))
+    # The default policy lets every user view active organizations
+    permission_filter_public = Q(archived=False)
+    permission_filter_public_actions = ('org.view',)
 
     def post(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
@@ -237,7 +250,7 @@ class ProjectDetail(APIPermissionRequiredMixin,
 
     def get_queryset(self):
         return self.get_organization(
-            lookup_kwarg='organization').projects.all()
+            lookup_kwarg='organization').projects.select_related('stats')
 
     def get_serializer(self, *args, **kwargs):
         if not check_perms(self.request.user,
@@ -276,3 +289,80 @@ class ProjectUsersDetail(APIPermissionRequiredMixin,
         ).delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProjectChanges(APIPermissionRequiredMixin,
+                     mixins.ProjectMixin,
+                     APIView):
+    """
+    Returns the locations, parties and tenure relationships of a project
+    that were created, updated or deleted since the sync token ``since``,
+    and the token to pass next time. ``more`` is set if the changes did
+    not fit in one response.
+    """
+    change_serializers = (
+        ('locations', SpatialUnitSerializer),
+        ('parties', PartySerializer),
+        ('relationships', TenureRelationshipSerializer),
+    )
+
+    def get_actions(self, request):
+        if self.get_project().archived:
+            view = 'project.view_archived'
+        elif self.get_project().public():
+            view = 'project.view'
+        else:
+            view = 'project.view_private'
+        return (view, 'spatial.list', 'party.list', 'tenure_rel.list')
+
+    permission_required = {
+        'GET': get_actions,
+    }
+
+    def get_perms_objects(self):
+        return [self.get_project()]
+
+    def get(self, request, *args, **kwargs):
+        project = self.get_project()
+        changes, token, more = sync.get_changes(
+            project, request.query_params.get('since'))
+
+        context = {'project': project, 'request': request}
+        data = OrderedDict([('next', token), ('more', more)])
+        for name, serializer_class in self.change_serializers:
+            data[name] = OrderedDict([
+                (kind, serializer_class(
+                    changes[name][kind], many=True, context=context).data)
+                for kind in ('created', 'updated')
+            ])
+            data[name]['deleted'] = changes[name]['deleted']
+        return Response(data)
+
+
+class ProjectExportStream(APIPermissionRequiredMixin,
+                          mixins.ProjectMixin,
+                          APIView):
+    """
+    Streams all locations, parties and tenure relationships of a project
+    as a GeoJSON feature collection, or as newline-delimited GeoJSON
+    features with ``type=ndjson``.
+    """
+    permission_required = {
+        'GET': 'project.download',
+    }
+
+    def get_perms_objects(self):
+        return [self.get_project()]
+
+    def get(self, request, *args, **kwargs):
+        project = self.get_project()
+        export_type = request.query_params.get('type', 'geojson')
+        if export_type not in streaming.EXPORT_CONTENT_TYPES:
+            raise ValidationError({'type': _("Unknown export type.")})
+
+        response = StreamingHttpResponse(
+            streaming.stream_export(project, export_type),
+            content_type=streaming.EXPORT_CONTENT_TYPES[export_type])
+        response['Content-Disposition'] = 'attachment; filename={}.{}'.format(
+            project.slug, export_type)
+        return response
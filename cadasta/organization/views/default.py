@@ -8,7 +8,7 @@ from django.conf import settings
 from django.core.files.storage import DefaultStorage, FileSystemStorage
 from django.core.urlresolvers import reverse
 from django.db import transaction
-from django.db.models import Sum, When, Case, IntegerField
+from django.db.models import Q, Sum, When, Case, IntegerField
 from django.shortcuts import get_object_or_404, redirect
 from django.utils.translation import ugettext as _
 from django.utils import timezone
@@ -17,7 +17,7 @@ from accounts.models import User
 import core.views.generic as generic
 from core import breakers
 from core.mixins import (LoginPermissionRequiredMixin, PermissionRequiredMixin,
-                         update_permissions)
+                         PublicPermissionsFilterMixin, update_permissions)
 from core.util import random_id
 from core.views import mixins as core_mixins
 from core.form_mixins import get_types
@@ -33,17 +33,23 @@ from ..choices import ROLE_CHOICES
 from .. import messages as error_messages
 from .. import forms
 from ..importers.exceptions import DataImportError
-from ..models import Organization, OrganizationRole, Project, ProjectRole
+from ..models import (Organization, OrganizationRole, Project, ProjectRole,
+                      ProjectStatistics)
 from ..tasks import schedule_project_export, export
 
 
-class OrganizationList(PermissionRequiredMixin, generic.ListView):
+class OrganizationList(PublicPermissionsFilterMixin,
+                       PermissionRequiredMixin,
+                       generic.ListView):
     model = Organization
     template_name = 'organization/organization_list.html'
     permission_required = 'org.list'
     permission_filter_queryset = (lambda self, view, o: ('org.view',)
                                   if o.archived is False
                                   else ('org.view_archived',))
+    # The default policy lets every user view active organizations
+    permission_filter_public = Q(archived=False)
+    permission_filter_public_actions = ('org.view',)
 
     # This queryset annotation is needed to avoid generating a query for each
     # organization in order to count the number of projects per org
@@ -411,14 +417,19 @@ class ProjectDashboard(PermissionRequiredMixin,
             for role in prj_members]
         members = sorted(org_roles + prj_roles, key=lambda t: t[0])
 
-        num_locations = self.object.spatial_units.count()
-        num_parties = self.object.parties.count()
-        num_resources = self.object.resource_set.filter(archived=False).count()
-        context['has_content'] = (
-            num_locations > 0 or num_parties > 0 or num_resources > 0)
-        context['num_locations'] = num_locations
-        context['num_parties'] = num_parties
-        context['num_resources'] = num_resources
+        try:
+            stats = self.object.stats
+        except ProjectStatistics.DoesNotExist:
+            stats = ProjectStatistics(
+                project=self.object,
+                num_locations=self.object.spatial_units.count(),
+                num_parties=self.object.parties.count(),
+                num_resources=self.object.resource_set.filter(
+                    archived=False).count())
+        context['has_content'] = stats.has_content
+        context['num_locations'] = stats.num_locations
+        context['num_parties'] = stats.num_parties
+        context['num_resources'] = stats.num_resources
         context['members'] = members
 
         context['export_disabled'] = breakers.celery.is_open
@@ -939,7 +950,8 @@ class ProjectDataImportWizard(mixins.ProjectMixin,
             'geometry_field': form_data[2]['geometry_field'],
             'attributes': map_attrs_data.getlist('attributes', None),
             'allowed_tenure_types': allowed_tenure_types,
-            'allowed_location_types': allowed_location_types
+            'allowed_location_types': allowed_location_types,
+            'batch_size': settings.IMPORT_BATCH_SIZE
         }
 
         importer = self._get_importer(type, path)
@@ -178,7 +178,7 @@ class ProjectQuerySetMixin:
                 # project managers can view private/public archived/active prjs
                 query |= Q(projectrole__user=user, projectrole__role='PM')
             projects = Project.objects.filter(query).distinct()
-        return projects.select_related('organization').order_by(
+        return projects.select_related('organization', 'stats').order_by(
             'organization__slug', 'slug')
 
 
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 11:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('party', '0006_increase_tenure_type_maxlength'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='party',
+            index=models.Index(fields=['project', 'last_updated', 'id'], name='party_party_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tenurerelationship',
+            index=models.Index(fields=['project', 'last_updated', 'id'], name='party_tenure_keyset_idx'),
+        ),
+    ]
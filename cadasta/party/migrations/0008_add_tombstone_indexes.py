@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 12:20
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+TOMBSTONE_INDEXES = (
+    ('party_party_tombstone_idx', 'party_historicalparty'),
+    ('party_tenure_tombstone_idx', 'party_historicaltenurerelationship'),
+)
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes the deletions recorded in the history tables, which project
+    syncs read as tombstones (see organization.sync).
+    """
+
+    dependencies = [
+        ('party', '0007_add_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX {index} ON {table} "
+            "(project_id, history_date, history_id) "
+            "WHERE history_type = '-';".format(index=index, table=table),
+            reverse_sql='DROP INDEX {index};'.format(index=index)
+        )
+        for index, table in TOMBSTONE_INDEXES
+    ]
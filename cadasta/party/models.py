@@ -17,7 +17,7 @@ from organization.models import Project
 from organization.validators import validate_contact
 from simple_history.models import HistoricalRecords
 
-from questionnaires.models import Question
+from questionnaires.registry import get_registry
 from resources.mixins import ResourceModelMixin
 from spatial.models import SpatialUnit
 from tutelary.decorators import permissioned_model
@@ -93,6 +93,12 @@ class Party(ResourceModelMixin, RandomIDModel):
 
     class Meta:
         ordering = ('name',)
+        indexes = [
+            # Keyset pagination of the project's parties (see
+            # core.pagination)
+            models.Index(fields=['project', 'last_updated', 'id'],
+                         name='party_party_keyset_idx'),
+        ]
 
     class TutelaryMeta:
         perm_type = 'party'
@@ -257,6 +263,14 @@ class TenureRelationship(ResourceModelMixin,
 
     history = HistoricalRecords()
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the project's tenure relationships (see
+            # core.pagination)
+            models.Index(fields=['project', 'last_updated', 'id'],
+                         name='party_tenure_keyset_idx'),
+        ]
+
     class TutelaryMeta:
         perm_type = 'tenure_rel'
         path_fields = ('project', 'id')
@@ -319,18 +333,16 @@ class TenureRelationship(ResourceModelMixin,
 
     @cached_property
     def tenure_type_label(self):
-        if not self.project.current_questionnaire:
+        registry = get_registry(self.project.current_questionnaire)
+        if registry is None:
             return dict(TENURE_RELATIONSHIP_TYPES)[self.tenure_type]
 
-        question = Question.objects.get(
-            questionnaire_id=self.project.current_questionnaire,
-            name='tenure_type'
-        )
-        label = question.options.get(name=self.tenure_type).label_xlat
+        label = registry.get_option_label_xlat('tenure_type',
+                                               self.tenure_type)
         if label is None or isinstance(label, str):
             return label
         else:
             return label.get(
                 get_language(),
-                label[question.questionnaire.default_language]
+                label[registry.default_language]
             )
@@ -8,6 +8,8 @@ from rest_framework.response import Response
 from tutelary.mixins import APIPermissionRequiredMixin
 
 from core.mixins import update_permissions
+from core.pagination import (CURSOR_QUERY_PARAM, KeysetPagination,
+                             paginate_keyset_results)
 from core.util import paginate_results
 from party.models import (PartyRelationship,
                           TenureRelationship)
@@ -29,6 +31,8 @@ class PartyList(APIPermissionRequiredMixin,
     filter_fields = ('name', 'type')
     search_fields = ('name',)
     ordering_fields = ('name', 'type')
+    pagination_class = KeysetPagination
+    cursor_ordering = ('last_updated', 'id')
     permission_required = {
         'GET': 'party.list',
         'POST': update_permissions('party.create')
@@ -58,6 +62,7 @@ class PartyResourceList(APIPermissionRequiredMixin,
                         mixins.PartyResourceMixin,
                         generics.ListCreateAPIView):
     serializer_class = ResourceSerializer
+    pagination_class = KeysetPagination
     filter_backends = (DjangoFilterBackend,
                        filters.SearchFilter,
                        filters.OrderingFilter,)
@@ -143,7 +148,11 @@ class RelationshipList(APIPermissionRequiredMixin,
             elif 'party' in kwargs:
                 tenure_rels = (manager.filter(party=kwargs['party']))
 
-        return Response(paginate_results(
+        # Relationships are paged by ID if the client passes a cursor
+        paginate = (paginate_keyset_results
+                    if CURSOR_QUERY_PARAM in request.query_params
+                    else paginate_results)
+        return Response(paginate(
             request,
             (spatial_rels, SpatialRelationshipDetailSerializer),
             (party_rels, serializers.PartyRelationshipDetailSerializer),
@@ -201,6 +210,8 @@ class TenureRelationshipList(APIPermissionRequiredMixin,
         'POST': update_permissions('tenure_rel.create')
     }
     serializer_class = serializers.TenureRelationshipSerializer
+    pagination_class = KeysetPagination
+    cursor_ordering = ('last_updated', 'id')
 
     def get_perms_objects(self):
         return [self.get_project()]
@@ -234,6 +245,7 @@ class TenureRelationshipResourceList(APIPermissionRequiredMixin,
                                      mixins.TenureRelationshipResourceMixin,
                                      generics.ListCreateAPIView):
     serializer_class = ResourceSerializer
+    pagination_class = KeysetPagination
     filter_backends = (DjangoFilterBackend,
                        filters.SearchFilter,
                        filters.OrderingFilter,)
@@ -7,7 +7,7 @@ from core.mixins import LoginPermissionRequiredMixin, update_permissions
 from organization.views import mixins as organization_mixins
 from resources.forms import AddResourceFromLibraryForm
 from resources.views import mixins as resource_mixins
-from questionnaires.models import Question, QuestionOption
+from questionnaires.registry import get_registry
 from . import mixins
 from .. import forms
 from .. import messages as error_messages
@@ -60,55 +60,23 @@ class PartiesDetail(LoginPermissionRequiredMixin,
         ).select_related('spatial_unit').defer('spatial_unit__attributes')
 
         project = context['object']
-        if project.current_questionnaire:
-            try:
-                name = Question.objects.get(
-                    name='party_name',
-                    questionnaire_id=project.current_questionnaire)
-                context['name_labels'] = template_xlang_labels(name.label_xlat)
-            except Question.DoesNotExist:
-                pass
-
-            try:
-                party_type = Question.objects.get(
-                    name='party_type',
-                    questionnaire_id=project.current_questionnaire)
+        registry = get_registry(project.current_questionnaire)
+        if registry is not None:
+            if 'party_name' in registry:
+                context['name_labels'] = template_xlang_labels(
+                    registry.get_label_xlat('party_name'))
+
+            if 'party_type' in registry:
                 context['type_labels'] = template_xlang_labels(
-                    party_type.label_xlat)
-            except Question.DoesNotExist:
-                pass
-            else:
-                try:
-                    option = QuestionOption.objects.get(
-                        question=party_type,
-                        name=context['party'].type)
+                    registry.get_label_xlat('party_type'))
+                option = registry.get_option_label_xlat(
+                    'party_type', context['party'].type)
+                if option is not None:
                     context['type_choice_labels'] = template_xlang_labels(
-                        option.label_xlat)
-                except QuestionOption.DoesNotExist:
-                    pass
-
-            try:
-                tenure_type = Question.objects.get(
-                    name='tenure_type',
-                    questionnaire_id=project.current_questionnaire)
-                tenure_opts = QuestionOption.objects.filter(
-                    question=tenure_type)
-                tenure_opts = dict(tenure_opts.values_list(
-                    'name', 'label_xlat'))
-            except Question.DoesNotExist:
-                tenure_opts = None
-
-            try:
-                location_type = Question.objects.get(
-                    name='location_type',
-                    questionnaire_id=project.current_questionnaire)
-                location_opts = QuestionOption.objects.filter(
-                    question=location_type)
-                location_opts = dict(
-                    location_opts.values_list('name', 'label_xlat'))
-            except Question.DoesNotExist:
-                location_opts = None
+                        option)
 
+            tenure_opts = registry.get_options('tenure_type')
+            location_opts = registry.get_options('location_type')
             for rel in context['relationships']:
                 if tenure_opts:
                     rel.type_labels = template_xlang_labels(
@@ -143,17 +111,12 @@ class PartiesEdit(LoginPermissionRequiredMixin,
         context = super().get_context_data(*args, **kwargs)
 
         project = context['object']
-        if project.current_questionnaire:
-            try:
-                party_type = Question.objects.get(
-                    name='party_type',
-                    questionnaire_id=project.current_questionnaire)
-                option = QuestionOption.objects.get(question=party_type,
-                                                    name=context['party'].type)
-                context['type_choice_labels'] = template_xlang_labels(
-                    option.label_xlat)
-            except Question.DoesNotExist:
-                pass
+        registry = get_registry(project.current_questionnaire)
+        if registry is not None and 'party_type' in registry:
+            option = registry.get_option_label_xlat(
+                'party_type', context['party'].type)
+            if option is not None:
+                context['type_choice_labels'] = template_xlang_labels(option)
 
         return context
 
@@ -216,24 +179,14 @@ class PartyRelationshipDetail(LoginPermissionRequiredMixin,
         context = super().get_context_data(*args, **kwargs)
 
         project = context['object']
-        if project.current_questionnaire:
-            try:
-                tenure_type = Question.objects.get(
-                    name='tenure_type',
-                    questionnaire_id=project.current_questionnaire)
-                context['type_labels'] = template_xlang_labels(
-                    tenure_type.label_xlat)
-            except Question.DoesNotExist:
-                pass
-            else:
-                try:
-                    option = QuestionOption.objects.get(
-                        question=tenure_type,
-                        name=context['relationship'].tenure_type)
-                    context['type_choice_labels'] = template_xlang_labels(
-                        option.label_xlat)
-                except QuestionOption.DoesNotExist:
-                    pass
+        registry = get_registry(project.current_questionnaire)
+        if registry is not None and 'tenure_type' in registry:
+            context['type_labels'] = template_xlang_labels(
+                registry.get_label_xlat('tenure_type'))
+            option = registry.get_option_label_xlat(
+                'tenure_type', context['relationship'].tenure_type)
+            if option is not None:
+                context['type_choice_labels'] = template_xlang_labels(option)
         user = self.request.user
         context['is_allowed_delete_rel'] = user.has_perm(
             'tenure_rel.delete', context['relationship']
@@ -11,7 +11,7 @@ from pyxform.builder import create_survey_element_from_dict
 from pyxform.errors import PyXFormError
 from pyxform.xls2json import parse_file_to_json
 from core.messages import SANITIZE_ERROR
-from core.validators import sanitize_string
+from core.validators import sanitize_strings
 from .choices import QUESTION_TYPES, XFORM_GEOM_FIELDS
 from .exceptions import InvalidQuestionnaire
 from .messages import MISSING_RELEVANT, INVALID_ACCURACY
@@ -195,15 +195,19 @@ def fix_languages(node):
 
 
 def santize_form(form_json):
-    for key, value in form_json.items():
+    if not sanitize_strings(iter_form_values(form_json)):
+        raise InvalidQuestionnaire([SANITIZE_ERROR])
+
+
+def iter_form_values(form_json):
+    for value in form_json.values():
         if isinstance(value, list):
             for list_item in value:
-                santize_form(list_item)
+                yield from iter_form_values(list_item)
         elif isinstance(value, dict):
-            santize_form(value)
+            yield from iter_form_values(value)
         else:
-            if not sanitize_string(value):
-                raise InvalidQuestionnaire([SANITIZE_ERROR])
+            yield value
 
 
 class QuestionnaireManager(models.Manager):
@@ -2,11 +2,14 @@ import hashlib
 from datetime import datetime
 from buckets.fields import S3FileField
 from core.models import RandomIDModel
+from core.schema_cache import schema_cache
+from django.core.cache import cache
 from django.db import models
 from django.dispatch import receiver
 from django.utils.translation import ugettext as _
 from django.utils.translation import get_language
 from django.contrib.postgres.fields import JSONField
+from jsonattrs.models import Schema
 from simple_history.models import HistoricalRecords
 from tutelary.decorators import permissioned_model
 
@@ -210,3 +213,37 @@ def set_label_on_spatialunits(sender, instance, **kwargs):
         type=instance.name,
         project__current_questionnaire=instance.question.questionnaire.id,
     ).update(label=instance.label_xlat)
+
+
+@receiver(models.signals.post_save, sender=Questionnaire)
+@receiver(models.signals.post_delete, sender=Questionnaire)
+def invalidate_questionnaire_schema_cache(sender, instance, **kwargs):
+    schema_cache.invalidate(instance.project_id, instance.id)
+
+
+@receiver(models.signals.post_save, sender=Schema)
+@receiver(models.signals.post_delete, sender=Schema)
+def invalidate_schema_cache(sender, instance, **kwargs):
+    schema_cache.invalidate_selectors(instance.selectors)
+
+
+def get_registry_cache_key(questionnaire_id):
+    return 'questionnaires:registry:{}'.format(questionnaire_id)
+
+
+@receiver(models.signals.post_save, sender=Questionnaire)
+@receiver(models.signals.post_delete, sender=Questionnaire)
+def invalidate_registry(sender, instance, **kwargs):
+    cache.delete(get_registry_cache_key(instance.id))
+
+
+@receiver(models.signals.post_save, sender=Question)
+@receiver(models.signals.post_delete, sender=Question)
+def invalidate_question_registry(sender, instance, **kwargs):
+    cache.delete(get_registry_cache_key(instance.questionnaire_id))
+
+
+@receiver(models.signals.post_save, sender=QuestionOption)
+@receiver(models.signals.post_delete, sender=QuestionOption)
+def invalidate_option_registry(sender, instance, **kwargs):
+    cache.delete(get_registry_cache_key(instance.question.questionnaire_id))
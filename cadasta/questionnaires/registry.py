@@ -0,0 +1,100 @@
+"""
+Labels and options of the questions of a questionnaire, keyed by question
+name. They are loaded in one query and cached by questionnaire ID until the
+questionnaire or one of its questions or options changes.
+"""
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from .models import Questionnaire, get_registry_cache_key
+
+
+class QuestionRegistry:
+    def __init__(self, default_language, questions):
+        self.default_language = default_language
+        self.questions = questions
+
+    def __contains__(self, name):
+        return name in self.questions
+
+    def get_label_xlat(self, name):
+        """Returns the (multilingual) label of question ``name``."""
+        return self.questions[name]['label_xlat']
+
+    def has_options(self, name):
+        return self.questions[name]['type'] in ['S1', 'SM']
+
+    def get_options(self, name):
+        """
+        Returns the options of question ``name`` as an ordered mapping of
+        option names to (multilingual) labels. The mapping is empty if the
+        question does not exist.
+        """
+        question = self.questions.get(name)
+        return question['options'] if question else OrderedDict()
+
+    def get_option_label_xlat(self, name, option):
+        """
+        Returns the (multilingual) label of ``option`` of question ``name``,
+        or ``None`` if there is no such option.
+        """
+        return self.get_options(name).get(option)
+
+    def translate(self, label_xlat):
+        """
+        Returns a multilingual label in the active language, or the
+        questionnaire's default language.
+        """
+        if isinstance(label_xlat, dict):
+            return label_xlat.get(get_language(),
+                                  label_xlat.get(self.default_language))
+        return label_xlat
+
+
+def load_questions(questionnaire_id):
+    rows = list(Questionnaire.objects.filter(
+        id=questionnaire_id).values_list(
+            'default_language', 'questions__id', 'questions__name',
+            'questions__type', 'questions__label_xlat',
+            'questions__options__name', 'questions__options__label_xlat',
+    ).order_by('questions__index', 'questions__options__index'))
+    if not rows:
+        return None
+
+    default_language = rows[0][0]
+    questions = OrderedDict()
+    for (_, question_id, name, type, label_xlat,
+         option, option_label_xlat) in rows:
+        if question_id is None:
+            continue
+        # If names are repeated, the first question of a name is used
+        question = questions.setdefault(name, {
+            'id': question_id,
+            'type': type,
+            'label_xlat': label_xlat,
+            'options': OrderedDict(),
+        })
+        if option is not None and question['id'] == question_id:
+            question['options'][option] = option_label_xlat
+
+    return default_language, questions
+
+
+def get_registry(questionnaire_id):
+    """
+    Returns the ``QuestionRegistry`` of a questionnaire, or ``None`` if
+    there is no questionnaire with ``questionnaire_id``.
+    """
+    if not questionnaire_id:
+        return None
+    key = get_registry_cache_key(questionnaire_id)
+    loaded = cache.get(key)
+    if loaded is None:
+        loaded = load_questions(questionnaire_id)
+        if loaded is None:
+            return None
+        cache.set(key, loaded, settings.QUESTION_REGISTRY_CACHE_TIMEOUT)
+    return QuestionRegistry(*loaded)
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.translation import override
+
+from . import factories
+from ..models import get_registry_cache_key
+from ..registry import get_registry
+
+
+@override_settings(CACHES=dict(
+    settings.CACHES,
+    default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+))
+class QuestionRegistryTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.questionnaire = factories.QuestionnaireFactory.create(
+            default_language='en')
+        self.question = factories.QuestionFactory.create(
+            type='S1',
+            name='tenure_type',
+            label={'en': 'Tenure type', 'de': 'Besitzart'},
+            questionnaire=self.questionnaire)
+        factories.QuestionOptionFactory.create(
+            question=self.question,
+            name='FH',
+            label={'en': 'Freehold', 'de': 'Eigentum'})
+        factories.QuestionOptionFactory.create(
+            question=self.question,
+            name='LH',
+            label={'en': 'Leasehold'})
+        factories.QuestionFactory.create(
+            type='TX',
+            name='party_name',
+            label='Name',
+            questionnaire=self.questionnaire)
+
+    def test_get_registry(self):
+        registry = get_registry(self.questionnaire.id)
+        assert registry.default_language == 'en'
+        assert 'tenure_type' in registry
+        assert 'location_type' not in registry
+        assert registry.get_label_xlat('party_name') == 'Name'
+        assert registry.has_options('tenure_type') is True
+        assert registry.has_options('party_name') is False
+        assert list(registry.get_options('tenure_type').keys()) == [
+            'FH', 'LH']
+        assert registry.get_options('party_name') == {}
+        assert registry.get_options('location_type') == {}
+        assert registry.get_option_label_xlat('tenure_type', 'FH') == {
+            'en': 'Freehold', 'de': 'Eigentum'}
+        assert registry.get_option_label_xlat('tenure_type', 'XX') is None
+
+    def test_translate(self):
+        registry = get_registry(self.questionnaire.id)
+        labels = registry.get_options('tenure_type')
+        with override('de'):
+            assert registry.translate(labels['FH']) == 'Eigentum'
+            assert registry.translate(labels['LH']) == 'Leasehold'
+        assert registry.translate('Name') == 'Name'
+
+    def test_get_registry_is_cached(self):
+        get_registry(self.questionnaire.id)
+        with self.assertNumQueries(0):
+            registry = get_registry(self.questionnaire.id)
+        assert 'tenure_type' in registry
+
+    def test_get_registry_without_questionnaire(self):
+        assert get_registry(None) is None
+        assert get_registry('abc') is None
+        assert cache.get(get_registry_cache_key('abc')) is None
+
+    def test_get_registry_without_questions(self):
+        questionnaire = factories.QuestionnaireFactory.create()
+        registry = get_registry(questionnaire.id)
+        assert registry.questions == {}
+
+    def test_question_change_invalidates_cache(self):
+        get_registry(self.questionnaire.id)
+        self.question.label_xlat = {'en': 'Type of tenure'}
+        self.question.save()
+        registry = get_registry(self.questionnaire.id)
+        assert registry.get_label_xlat('tenure_type') == {
+            'en': 'Type of tenure'}
+
+    def test_option_change_invalidates_cache(self):
+        get_registry(self.questionnaire.id)
+        factories.QuestionOptionFactory.create(
+            question=self.question, name='CU', label='Customary')
+        registry = get_registry(self.questionnaire.id)
+        assert 'CU' in registry.get_options('tenure_type')
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 11:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0009_add_resource_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['project', 'id'], name='resources_keyset_idx'),
+        ),
+    ]
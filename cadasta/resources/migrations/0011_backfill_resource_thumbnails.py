@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 17:10
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+# Images uploaded before thumbnails were recorded already had their
+# 128x128 thumbnail created when they were saved
+BACKFILL_SQL = """
+UPDATE resources_resource SET thumbnails = '[128]'::jsonb
+WHERE thumbnails IS NULL
+  AND mime_type LIKE '%image%'
+  AND mime_type NOT LIKE '%tif%'
+  AND mime_type NOT LIKE '%svg%'
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0010_add_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -1,6 +1,3 @@
-import os
-import tempfile
-
 from datetime import datetime
 
 import magic
@@ -12,7 +9,7 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.gis.db.models import GeometryCollectionField
 from django.contrib.postgres.fields import JSONField
-from django.db import models
+from django.db import models, transaction
 from django.dispatch import receiver
 from django.utils.translation import ugettext as _
 from django.utils.encoding import iri_to_uri
@@ -24,13 +21,17 @@ from . import messages
 from .exceptions import InvalidGPXFile
 from .managers import ResourceManager
 from .processors.gpx import GPXProcessor
-from .utils import io, thumbnail
+from .tasks import queue_spatial_resources, queue_thumbnails
+from .utils import thumbnail
 from .validators import ACCEPTED_TYPES, validate_file_type
 
 content_types = models.Q(app_label='organization', model='project')
 
 GPX_MIME_TYPES = ('application/xml', 'text/xml', 'application/gpx+xml')
 
+# Number of bytes read to detect the mime type of a file
+MAGIC_BUFFER_SIZE = 64 * 1024
+
 
 @permissioned_model
 class Resource(RandomIDModel):
@@ -39,6 +40,7 @@ class Resource(RandomIDModel):
     file = S3FileField(upload_to='resources', accepted_types=ACCEPTED_TYPES)
     original_file = models.CharField(max_length=200)
     file_versions = JSONField(null=True, blank=True)
+    thumbnails = JSONField(null=True, blank=True)
     mime_type = models.CharField(max_length=100,
                                  validators=[validate_file_type])
     archived = models.BooleanField(default=False)
@@ -56,6 +58,12 @@ class Resource(RandomIDModel):
 
     class Meta:
         ordering = ('name',)
+        indexes = [
+            # Keyset pagination of the project's resources (see
+            # core.pagination)
+            models.Index(fields=['project', 'id'],
+                         name='resources_keyset_idx'),
+        ]
 
     class TutelaryMeta:
         perm_type = 'resource'
@@ -103,15 +111,17 @@ class Resource(RandomIDModel):
     def file_type(self):
         return self.file_name.lower().split('.')[-1]
 
+    @property
+    def has_thumbnails(self):
+        return ('image' in self.mime_type and
+                all(img not in self.mime_type for img in ['tif', 'svg']))
+
     @property
     def thumbnail(self):
         if not hasattr(self, '_thumbnail'):
             icon = settings.ICON_LOOKUPS.get(self.mime_type, None)
-            if ('image' in self.mime_type and
-                    all(img not in self.mime_type for img in ['tif', 'svg'])):
-                ext = self.file_name.split('.')[-1]
-                base_url = self.file.url[:self.file.url.rfind('.')]
-                self._thumbnail = base_url + '-128x128.' + ext
+            if self.has_thumbnails:
+                self._thumbnail = self.get_thumbnail_url(128)
             elif icon:
                 self._thumbnail = settings.ICON_URL.format(icon)
             else:
@@ -119,6 +129,102 @@ class Resource(RandomIDModel):
 
         return self._thumbnail
 
+    @property
+    def thumbnail_file_url(self):
+        """
+        Like ``thumbnail``, but the URL of the image itself until its
+        thumbnail has been created, for API clients that cannot follow the
+        thumbnail view.
+        """
+        if self.has_thumbnails and 128 not in (self.thumbnails or []):
+            return self.file.url
+        return self.thumbnail
+
+    def get_thumbnail_url(self, size):
+        """
+        Returns the URL of the ``size`` x ``size`` thumbnail of an image.
+        Until the thumbnail has been created this is the URL of a view that
+        creates it.
+        """
+        if size in (self.thumbnails or []):
+            return self.get_thumbnail_file_url(size)
+        return iri_to_uri(reverse(
+            'resources:project_thumbnail',
+            kwargs={
+                'organization': self.project.organization.slug,
+                'project': self.project.slug,
+                'resource': self.id,
+                'size': size,
+            },
+        ))
+
+    def get_thumbnail_file_url(self, size):
+        ext = self.file_name.split('.')[-1]
+        base_url = self.file.url[:self.file.url.rfind('.')]
+        return '{}-{}x{}.{}'.format(base_url, size, size, ext)
+
+    def create_thumbnails(self, sizes=None):
+        """
+        Creates square thumbnails of the resource's image for each of
+        ``sizes`` (by default ``RESOURCE_THUMBNAIL_SIZES``), and records
+        them in ``thumbnails``.
+        """
+        sizes = sizes or settings.RESOURCE_THUMBNAIL_SIZES
+        file_name = self.file_name
+        name = file_name[:file_name.rfind('.')]
+        ext = file_name.split('.')[-1]
+        if self.file.field.upload_to:
+            name = self.file.field.upload_to + '/' + name
+
+        file = self.file.open()
+        try:
+            image = thumbnail.open_scaled(file, (max(sizes), max(sizes)))
+            format = image.format
+            for size, thumb in thumbnail.make_many(
+                    image, [(size, size) for size in sizes]):
+                self.file.storage.save(
+                    '{}-{}x{}.{}'.format(name, size[0], size[1], ext),
+                    thumbnail.to_bytes(thumb, format))
+        finally:
+            file.close()
+
+        # Written with update() so that thumbnails are not recorded in the
+        # resource's history
+        with transaction.atomic():
+            resource = Resource.objects.select_for_update().get(id=self.id)
+            if resource.file.url != self.file.url:
+                return
+            self.thumbnails = sorted(set(resource.thumbnails or []) |
+                                     set(sizes))
+            Resource.objects.filter(id=self.id).update(
+                thumbnails=self.thumbnails)
+
+    def create_spatial_resources(self):
+        """
+        Creates a spatial resource for the tracks, routes and waypoints of
+        the resource's GPX file.
+        """
+        file = self.file.open()
+        try:
+            # need to double check the mime-type here as browser detection
+            # of gpx mime type is not reliable
+            mime_type = magic.from_buffer(
+                file.read(MAGIC_BUFFER_SIZE), mime=True)
+            if mime_type not in GPX_MIME_TYPES:
+                raise InvalidGPXFile(
+                    _("Invalid GPX mime type: {error}".format(
+                        error=mime_type))
+                )
+            file.seek(0)
+            layers = GPXProcessor(file).get_layers()
+        finally:
+            file.close()
+
+        for layer in layers.keys():
+            if len(layers[layer]) > 0:
+                SpatialResource.objects.create(
+                    resource=self, name=layer, geom=layers[layer])
+
     @property
     def num_entities(self):
         if not hasattr(self, '_num_entities'):
@@ -127,8 +233,13 @@ class Resource(RandomIDModel):
         return self._num_entities
 
     def save(self, *args, **kwargs):
-        create_thumbnails(self, (not self.id))
+        new_image = self.has_thumbnails and (
+            not self.id or self._original_url != self.file.url)
+        if new_image:
+            self.thumbnails = None
         super().save(*args, **kwargs)
+        if new_image:
+            transaction.on_commit(lambda: queue_thumbnails(self))
 
     @property
     def ui_class_name(self):
@@ -159,56 +270,15 @@ def archive_file(sender, instance, **kwargs):
         ContentObject.objects.filter(resource=instance).delete()
 
 
-def create_thumbnails(instance, created):
-    if created or instance._original_url != instance.file.url:
-        if 'image' in instance.mime_type and 'svg' not in instance.mime_type:
-            io.ensure_dirs()
-            file_name = instance.file.url.split('/')[-1]
-            name = file_name[:file_name.rfind('.')]
-            ext = file_name.split('.')[-1]
-            write_path = os.path.join(settings.MEDIA_ROOT,
-                                      'temp',
-                                      name + '-128x128.' + ext)
-
-            size = 128, 128
-
-            file = instance.file.open()
-            thumb = thumbnail.make(file, size)
-            thumb.save(write_path)
-            if instance.file.field.upload_to:
-                name = instance.file.field.upload_to + '/' + name
-            with open(write_path, 'rb') as src:
-                instance.file.storage.save(name + '-128x128.' + ext,
-                                           src.read())
-            file.close()
-
-
 @receiver(models.signals.post_save, sender=Resource)
 def create_spatial_resource(sender, instance, created, **kwargs):
     if created or instance._original_url != instance.file.url:
         if instance.mime_type in GPX_MIME_TYPES:
-            temp = io.ensure_dirs()
-            with tempfile.NamedTemporaryFile(mode='wb', dir=temp) as f:
-                instance_file = instance.file.open()
-                f.write(instance_file.read())
-                instance_file.close()
-                f.seek(0)
-                # need to double check the mime-type here as browser detection
-                # of gpx mime type is not reliable
-                mime_type = magic.from_file(f.name, mime=True)
-                if mime_type in GPX_MIME_TYPES:
-                    processor = GPXProcessor(f.name)
-                    layers = processor.get_layers()
-                    for layer in layers.keys():
-                        if len(layers[layer]) > 0:
-                            SpatialResource.objects.create(
-                                resource=instance, name=layer,
-                                geom=layers[layer])
-                else:
-                    raise InvalidGPXFile(
-                        _("Invalid GPX mime type: {error}".format(
-                            error=mime_type))
-                    )
+            if settings.RESOURCE_ASYNC_GPX:
+                transaction.on_commit(
+                    lambda: queue_spatial_resources(instance))
+            else:
+                instance.create_spatial_resources()
 
 
 class ContentObject(RandomIDModel):
@@ -1,34 +1,81 @@
+import re
+from xml.etree import ElementTree
+
+from django.conf import settings
 from django.contrib.gis.geos import (GeometryCollection, LineString,
                                      MultiLineString, MultiPoint, Point)
 from django.utils.translation import ugettext as _
-from gpxpy import gpx, parser
 
 from ..exceptions import InvalidGPXFile
 
+XML_VERSION = re.compile(
+    br'^(?:\xef\xbb\xbf)?\s*<\?xml[^>]*?version\s*=\s*["\']([^"\']*)["\']')
+
 
 class GPXProcessor:
+    """
+    Reads the tracks, routes and waypoints of a GPX file, given as a path
+    or a binary file object.
+
+    The file is streamed with ``iterparse`` and every element is dropped
+    once it has been read, so that only the coordinates of the points are
+    kept in memory.
+    """
 
     def __init__(self, gpx_file):
-        with open(gpx_file, 'r') as f:
-            try:
-                p = parser.GPXParser(f)
-                self.gpx = p.parse(f)
-            except gpx.GPXException as e:
-                raise InvalidGPXFile(_("Invalid GPX file: %s" % str(e)))
+        self.tracks = []
+        self.routes = []
+        self.waypoints = []
+        try:
+            if isinstance(gpx_file, str):
+                with open(gpx_file, 'rb') as f:
+                    self._parse(f)
+            else:
+                self._parse(gpx_file)
+        except (ElementTree.ParseError, TypeError, ValueError) as e:
+            raise InvalidGPXFile(_("Invalid GPX file: %s" % str(e)))
+
+    def _parse(self, f):
+        check_xml_version(f.read(256))
+        f.seek(0)
+
+        parents = []
+        points = None
+        for event, element in ElementTree.iterparse(
+                f, events=('start', 'end')):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if event == 'start':
+                if tag in ('trkseg', 'rte'):
+                    points = []
+                parents.append(element)
+                continue
+
+            if tag in ('trkpt', 'rtept') and points is not None:
+                points.append(parse_point(element))
+            elif tag == 'wpt':
+                self.waypoints.append(parse_point(element))
+            elif tag == 'trkseg':
+                self.tracks.append(points)
+                points = None
+            elif tag == 'rte':
+                self.routes.append(points)
+                points = None
+
+            parents.pop()
+            if parents:
+                parents[-1].remove(element)
 
     def get_layers(self):
         layers = {}
-        if self.gpx.tracks:
-            layers['tracks'] = GeometryCollection(
-                MultiLineString(parse_tracks(self.gpx.tracks))
-            )
-        if self.gpx.routes:
-            layers['routes'] = GeometryCollection(
-                MultiLineString(parse_routes(self.gpx.routes))
-            )
-        if self.gpx.waypoints:
+        tracks = parse_lines(self.tracks)
+        if tracks:
+            layers['tracks'] = GeometryCollection(MultiLineString(tracks))
+        routes = parse_lines(self.routes)
+        if routes:
+            layers['routes'] = GeometryCollection(MultiLineString(routes))
+        if self.waypoints:
             layers['waypoints'] = GeometryCollection(
-                MultiPoint(parse_waypoints(self.gpx.waypoints))
+                MultiPoint([Point(coords) for coords in self.waypoints])
             )
         if not layers:
             raise InvalidGPXFile(
@@ -37,28 +84,28 @@ class GPXProcessor:
         return layers
 
 
-def parse_segment(segment):
-    return [Point(p.longitude, p.latitude).coords for p in segment.points]
-
-
-def parse_tracks(tracks):
-    multiline = []
-    for track in tracks:
-        for segment in track.segments:
-            points = parse_segment(segment)
-            if len(points) > 1:
-                multiline.append(LineString(points))
-    return multiline
+def check_xml_version(head):
+    match = XML_VERSION.match(head)
+    if match and match.group(1) not in (b'1.0', b'1.1'):
+        raise ValueError(
+            "unsupported XML version %s" % match.group(1).decode())
 
 
-def parse_waypoints(waypoints):
-    return [Point(point.longitude, point.latitude) for point in waypoints]
+def parse_point(element):
+    return float(element.get('lon')), float(element.get('lat'))
 
 
-def parse_routes(routes):
+def parse_lines(lines):
+    """
+    Returns a LineString for each list of coordinates with at least two
+    points, simplified to ``GPX_SIMPLIFY_TOLERANCE`` if it is set.
+    """
+    tolerance = settings.GPX_SIMPLIFY_TOLERANCE
     multiline = []
-    for route in routes:
-        points = parse_segment(route)
+    for points in lines:
         if len(points) > 1:
-            multiline.append(LineString(points))
+            line = LineString(points)
+            if tolerance:
+                line = line.simplify(tolerance, preserve_topology=True)
+            multiline.append(line)
     return multiline
@@ -22,6 +22,8 @@ class ResourceSerializer(SanitizeFieldSerializer, serializers.ModelSerializer):
     links = ContentObjectSerializer(
         many=True, required=False, source='content_objects')
     contributor = serializers.SerializerMethodField()
+    thumbnail = serializers.CharField(source='thumbnail_file_url',
+                                      read_only=True)
 
     class Meta:
         model = Resource
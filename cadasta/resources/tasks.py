@@ -0,0 +1,68 @@
+import logging
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+from core import breakers
+from tasks.celery import app
+from .exceptions import InvalidGPXFile
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(name='resources.create_thumbnails')
+def create_thumbnails(resource_id):
+    Resource = apps.get_model('resources', 'Resource')
+    resource = Resource.objects.filter(id=resource_id).first()
+    if resource is not None and resource.has_thumbnails:
+        resource.create_thumbnails()
+
+
+@app.task(name='resources.create_spatial_resources')
+def create_spatial_resources(resource_id):
+    Resource = apps.get_model('resources', 'Resource')
+    resource = Resource.objects.filter(id=resource_id).first()
+    if resource is not None:
+        resource.create_spatial_resources()
+
+
+def queue_thumbnails(resource):
+    """
+    Schedules the creation of the thumbnails of a resource. If the task
+    cannot be scheduled, each thumbnail is created when it is first
+    requested.
+    """
+    try:
+        create_thumbnails.apply_async(
+            kwargs={'resource_id': resource.id},
+            creator_id=resource.contributor_id,
+            related_content_type_id=ContentType.objects.get_for_model(
+                resource).id,
+            related_object_id=resource.id
+        )
+    except breakers.celery.expected_errors:
+        logger.exception("Failed to queue thumbnails of resource %s.",
+                         resource.id)
+
+
+def queue_spatial_resources(resource):
+    """
+    Schedules the creation of the spatial resources of a GPX resource. If
+    the task cannot be scheduled, they are created right away, and errors
+    in the file are logged.
+    """
+    try:
+        create_spatial_resources.apply_async(
+            kwargs={'resource_id': resource.id},
+            creator_id=resource.contributor_id,
+            related_content_type_id=ContentType.objects.get_for_model(
+                resource).id,
+            related_object_id=resource.id
+        )
+    except breakers.celery.expected_errors:
+        logger.exception("Failed to queue spatial resources of resource %s.",
+                         resource.id)
+        try:
+            resource.create_spatial_resources()
+        except InvalidGPXFile:
+            logger.exception("Invalid GPX file of resource %s.", resource.id)
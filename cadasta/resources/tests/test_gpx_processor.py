@@ -1,9 +1,12 @@
+import io
 import os
 
+import pytest
 from django.conf import settings
 from django.contrib.gis.geos import GeometryCollection
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from ..exceptions import InvalidGPXFile
 from ..processors.gpx import GPXProcessor
 
 path = os.path.dirname(settings.BASE_DIR)
@@ -60,3 +63,27 @@ class GPXProcessorTest(TestCase):
         g = GPXProcessor(file_path)
         layers = g.get_layers()
         assert len(layers.keys()) == 2
+
+    def test_read_file_object(self):
+        file_path = path + '/resources/tests/files/track_seg.gpx'
+        with open(file_path, 'rb') as f:
+            g = GPXProcessor(f)
+        assert [len(points) for points in g.tracks] == [2, 1, 188]
+        assert g.tracks[0][0] == (-122.5179408, 45.5366218)
+
+    def test_invalid_xml(self):
+        with pytest.raises(InvalidGPXFile) as e:
+            GPXProcessor(io.BytesIO(b'<gpx><trk><trkseg></gpx>'))
+        assert str(e.value).startswith("Invalid GPX file")
+
+    def test_invalid_point(self):
+        with pytest.raises(InvalidGPXFile):
+            GPXProcessor(io.BytesIO(
+                b'<gpx><wpt lat="1.0"/></gpx>'))
+
+    @override_settings(GPX_SIMPLIFY_TOLERANCE=0.001)
+    def test_simplify_tracks(self):
+        file_path = path + '/resources/tests/files/tracks.gpx'
+        g = GPXProcessor(file_path)
+        track = g.get_layers()['tracks'][0][0]
+        assert 1 < track.num_points < len(g.tracks[0])
@@ -145,3 +145,36 @@ class TestRandomizeImportedFilenames(MigrationTestCase):
         random_filename = resource.file.url[resource.file.url.rfind('/'):]
         assert random_filename.endswith('.csv')
         assert len(random_filename.split('.')[0].strip('/')) == 24
+
+
+class TestBackfillResourceThumbnails(MigrationTestCase):
+    migrate_from = '0010_add_keyset_index'
+    migrate_to = '0011_backfill_resource_thumbnails'
+
+    def setUpBeforeMigration(self, apps_before):
+        Resource = apps_before.get_model('resources', 'Resource')
+        User = apps_before.get_model('accounts', 'User')
+        Organization = apps_before.get_model('organization', 'Organization')
+        Project = apps_before.get_model('organization', 'Project')
+
+        user = User.objects.create(username='testuser')
+        org = Organization.objects.create(name='Test Org')
+        project = Project.objects.create(name='Test Proj', organization=org)
+
+        base_path = (
+            'https://s3-us-west-2.amazonaws.com/cadasta-resources/'
+            'resources/'
+        )
+        for name, mime_type in (('image.jpg', 'image/jpeg'),
+                                ('image.tif', 'image/tiff'),
+                                ('text.csv', 'text/csv')):
+            Resource.objects.create(
+                id=random_id(), name=name, file=base_path + name,
+                mime_type=mime_type, contributor=user, project=project
+            )
+
+    def test_migration(self):
+        Resource = self.apps_after.get_model('resources', 'Resource')
+        assert Resource.objects.get(name='image.jpg').thumbnails == [128]
+        assert Resource.objects.get(name='image.tif').thumbnails is None
+        assert Resource.objects.get(name='text.csv').thumbnails is None
@@ -1,11 +1,13 @@
 import os
+from unittest.mock import patch
 
 import pytest
+from PIL import Image
 
 from core.tests.utils.cases import UserTestCase, FileStorageTestCase
 from core.tests.utils.files import make_dirs  # noqa
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.translation import gettext as _
 
 from accounts.tests.factories import UserFactory
@@ -54,10 +56,37 @@ class ResourceTest(UserTestCase, FileStorageTestCase, TestCase):
     def test_thumbnail_img(self):
         resource = ResourceFactory.build(
             file='http://example.com/dir/filename.jpg',
-            mime_type='image/jpg'
+            mime_type='image/jpg',
+            thumbnails=[128, 512, 1024]
         )
         assert (resource.thumbnail ==
                 'http://example.com/dir/filename-128x128.jpg')
+        assert (resource.get_thumbnail_url(512) ==
+                'http://example.com/dir/filename-512x512.jpg')
+
+    def test_thumbnail_img_not_created(self):
+        resource = ResourceFactory.create(mime_type='image/jpeg')
+        assert resource.thumbnails is None
+        assert resource.thumbnail == (
+            '/organizations/{org}/projects/{prj}/'
+            'resources/{id}/thumbnails/128/'.format(
+                org=resource.project.organization.slug,
+                prj=resource.project.slug,
+                id=resource.id))
+
+    def test_thumbnail_file_url(self):
+        resource = ResourceFactory.build(
+            file='http://example.com/dir/filename.jpg',
+            mime_type='image/jpg')
+        assert (resource.thumbnail_file_url ==
+                'http://example.com/dir/filename.jpg')
+
+        resource = ResourceFactory.build(
+            file='http://example.com/dir/filename.jpg',
+            mime_type='image/jpg',
+            thumbnails=[128])
+        assert (resource.thumbnail_file_url ==
+                'http://example.com/dir/filename-128x128.jpg')
 
     def test_thumbnail_pdf(self):
         resource = ResourceFactory.build(
@@ -207,10 +236,54 @@ class ResourceTest(UserTestCase, FileStorageTestCase, TestCase):
         resource = ResourceFactory.create(file=file_name,
                                           mime_type='image/jpeg',
                                           contributor=contributor)
-        resource.save()
-        assert os.path.isfile(os.path.join(
-            settings.MEDIA_ROOT, 's3/uploads/resources/thumb_test-128x128.jpg')
-        )
+        resource.create_thumbnails()
+        for size in (128, 512, 1024):
+            path = os.path.join(
+                settings.MEDIA_ROOT,
+                's3/uploads/resources/thumb_test-{0}x{0}.jpg'.format(size))
+            assert os.path.isfile(path)
+            with Image.open(path) as thumb:
+                assert thumb.format == 'JPEG'
+                assert max(thumb.size) <= size
+
+        resource.refresh_from_db()
+        assert resource.thumbnails == [128, 512, 1024]
+        assert (resource.thumbnail ==
+                file_name[:file_name.rfind('.')] + '-128x128.jpg')
+
+    def test_create_thumbnail_png(self):
+        file = self.get_file('/xforms/tests/files/test_image_one.png', 'rb')
+        file_name = self.storage.save('resources/thumb_test.png', file.read())
+        file.close()
+        resource = ResourceFactory.create(file=file_name,
+                                          mime_type='image/png')
+        resource.create_thumbnails([128])
+        path = os.path.join(settings.MEDIA_ROOT,
+                            's3/uploads/resources/thumb_test-128x128.png')
+        with Image.open(path) as thumb:
+            assert thumb.format == 'PNG'
+        resource.refresh_from_db()
+        assert resource.thumbnails == [128]
+
+    def test_queue_thumbnails_on_save(self):
+        file = self.get_file('/resources/tests/files/image.jpg', 'rb')
+        file_name = self.storage.save('resources/thumb_new.jpg', file.read())
+        file.close()
+        resource = ResourceFactory.create(mime_type='image/jpeg',
+                                          thumbnails=[128])
+
+        with patch('resources.models.queue_thumbnails') as queue, \
+                patch('resources.models.transaction.on_commit',
+                      side_effect=lambda func: func()):
+            resource.name = 'Renamed'
+            resource.save()
+            assert not queue.called
+            assert resource.thumbnails == [128]
+
+            resource.file = file_name
+            resource.save()
+            queue.assert_called_once_with(resource)
+            assert resource.thumbnails is None
 
     def test_create_no_thumbnail_non_images(self):
         file = self.get_file('/resources/tests/files/text.txt', 'rb')
@@ -241,6 +314,19 @@ class ResourceTest(UserTestCase, FileStorageTestCase, TestCase):
         assert spatial_resources[0].name == 'waypoints'
         assert spatial_resources[0].attributes == {}
 
+    @override_settings(RESOURCE_ASYNC_GPX=True)
+    def test_queue_spatial_resource(self):
+        file = self.get_file('/resources/tests/files/tracks.gpx', 'rb')
+        file_name = self.storage.save('resources/tracks.gpx', file.read())
+        file.close()
+        with patch('resources.models.queue_spatial_resources') as queue, \
+                patch('resources.models.transaction.on_commit',
+                      side_effect=lambda func: func()):
+            resource = ResourceFactory.create(
+                file=file_name, mime_type='text/xml')
+        queue.assert_called_once_with(resource)
+        assert resource.spatial_resources.count() == 0
+
     def test_invalid_gpx_mime_type(self):
         file = self.get_file('/resources/tests/files/mp3.xml', 'rb')
         file_name = self.storage.save('resources/mp3.xml', file.read())
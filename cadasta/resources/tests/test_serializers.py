@@ -27,6 +27,15 @@ class ResourceSerializerTest(UserTestCase, FileStorageTestCase, TestCase):
         assert serialized_resource['description'] == resource.description
         assert serialized_resource['file'] == resource.file.url
 
+    def test_serialize_thumbnail(self):
+        resource = ResourceFactory.create(mime_type='image/jpeg')
+        assert ResourceSerializer(resource).data['thumbnail'] == (
+            resource.file.url)
+
+        resource.thumbnails = [128]
+        assert ResourceSerializer(resource).data['thumbnail'] == (
+            resource.get_thumbnail_file_url(128))
+
     def test_create_project_resource(self):
         file = self.get_file('/resources/tests/files/image.jpg', 'rb')
         file_name = self.storage.save('resources/image.jpg', file.read())
@@ -52,9 +61,7 @@ class ResourceSerializerTest(UserTestCase, FileStorageTestCase, TestCase):
         assert project.resources.count() == 1
         assert project.resources.first().name == data['name']
         assert project.resources.first().contributor == user
-        assert os.path.isfile(os.path.join(
-            settings.MEDIA_ROOT, 's3/uploads/resources/image-128x128.jpg')
-        )
+        assert project.resources.first().thumbnails is None
 
     def test_create_project_resource_without_mime_type(self):
         file = self.get_file('/resources/tests/files/text.txt', 'rb')
@@ -0,0 +1,90 @@
+from unittest.mock import patch, MagicMock
+
+import pytest
+from celery import Task
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, override_settings
+from kombu.exceptions import OperationalError
+
+from core.tests.utils.cases import UserTestCase, FileStorageTestCase
+from core.tests.utils.files import make_dirs  # noqa
+
+from ..models import Resource
+from ..tasks import (create_spatial_resources, create_thumbnails,
+                     queue_spatial_resources, queue_thumbnails)
+from .factories import ResourceFactory
+
+
+@pytest.mark.usefixtures('make_dirs')
+class TaskTest(UserTestCase, FileStorageTestCase, TestCase):
+
+    def test_create_thumbnails(self):
+        assert isinstance(create_thumbnails, Task)
+        assert create_thumbnails.name == 'resources.create_thumbnails'
+
+        resource = ResourceFactory.create(mime_type='image/jpeg')
+        create_thumbnails(resource.id)
+        resource.refresh_from_db()
+        assert resource.thumbnails == [128, 512, 1024]
+
+    def test_create_thumbnails_of_deleted_resource(self):
+        with patch.object(Resource, 'create_thumbnails') as create:
+            create_thumbnails('abc123')
+        assert not create.called
+
+    @patch('resources.tasks.create_thumbnails')
+    def test_queue_thumbnails(self, task):
+        resource = ResourceFactory.create(mime_type='image/jpeg')
+        queue_thumbnails(resource)
+        task.apply_async.assert_called_once_with(
+            kwargs={'resource_id': resource.id},
+            creator_id=resource.contributor_id,
+            related_content_type_id=ContentType.objects.get_for_model(
+                resource).id,
+            related_object_id=resource.id
+        )
+
+    @patch('resources.tasks.create_thumbnails.apply_async',
+           MagicMock(side_effect=OperationalError))
+    @patch('resources.tasks.logger')
+    def test_queue_thumbnails_unavailable(self, logger):
+        resource = ResourceFactory.create(mime_type='image/jpeg')
+        queue_thumbnails(resource)
+        assert logger.exception.called
+
+    def _create_gpx_resource(self, name):
+        file = self.get_file('/resources/tests/files/' + name, 'rb')
+        file_name = self.storage.save('resources/' + name, file.read())
+        file.close()
+        with override_settings(RESOURCE_ASYNC_GPX=True):
+            return ResourceFactory.create(file=file_name,
+                                          mime_type='text/xml')
+
+    def test_create_spatial_resources(self):
+        assert isinstance(create_spatial_resources, Task)
+        assert (create_spatial_resources.name ==
+                'resources.create_spatial_resources')
+
+        resource = self._create_gpx_resource('routes_tracks.gpx')
+        assert resource.spatial_resources.count() == 0
+        create_spatial_resources(resource.id)
+        assert sorted(resource.spatial_resources.values_list(
+            'name', flat=True)) == ['routes', 'tracks']
+
+    @patch('resources.tasks.create_spatial_resources.apply_async',
+           MagicMock(side_effect=OperationalError))
+    @patch('resources.tasks.logger')
+    def test_queue_spatial_resources_unavailable(self, logger):
+        resource = self._create_gpx_resource('tracks.gpx')
+        queue_spatial_resources(resource)
+        assert logger.exception.call_count == 1
+        assert resource.spatial_resources.count() == 1
+
+    @patch('resources.tasks.create_spatial_resources.apply_async',
+           MagicMock(side_effect=OperationalError))
+    @patch('resources.tasks.logger')
+    def test_queue_spatial_resources_invalid_file(self, logger):
+        resource = self._create_gpx_resource('invalidgpx.xml')
+        queue_spatial_resources(resource)
+        assert logger.exception.call_count == 2
+        assert resource.spatial_resources.count() == 0
@@ -108,3 +108,22 @@ class RessourceUrlTest(TestCase):
         assert resolved.kwargs['organization'] == 'org-slug'
         assert resolved.kwargs['project'] == 'proj-slug'
         assert resolved.kwargs['resource'] == 'abc123'
+
+    def test_project_resource_thumbnail(self):
+        url = reverse('resources:project_thumbnail',
+                      kwargs={'organization': 'org-slug',
+                              'project': 'proj-slug',
+                              'resource': 'abc123',
+                              'size': 128})
+        assert url == ('/organizations/org-slug/projects/proj-slug/resources/'
+                       'abc123/thumbnails/128/')
+
+        resolved = resolve(
+            '/organizations/org-slug/projects/proj-slug/resources/abc123/'
+            'thumbnails/128/')
+        assert (resolved.func.__name__ ==
+                default.ResourceThumbnail.__name__)
+        assert resolved.kwargs['organization'] == 'org-slug'
+        assert resolved.kwargs['project'] == 'proj-slug'
+        assert resolved.kwargs['resource'] == 'abc123'
+        assert resolved.kwargs['size'] == '128'
@@ -1,3 +1,4 @@
+import io
 import os
 from PIL import Image
 from django.test import TestCase
@@ -35,3 +36,22 @@ class ThumbnailTest(TestCase):
         thumb = thumbnail.make(image, (100, 100))
         assert thumb.size[0] == 100
         assert thumb.size[1] == 100
+
+    def test_open_scaled(self):
+        image = thumbnail.open_scaled(
+            path + '/resources/tests/files/image.jpg', (100, 100))
+        assert image.format == 'JPEG'
+        assert min(image.size) >= 100
+
+    def test_make_many(self):
+        image = thumbnail.open_scaled(
+            path + '/resources/tests/files/image.jpg', (100, 100))
+        thumbs = list(thumbnail.make_many(image, [(50, 50), (100, 100)]))
+        assert [size for size, thumb in thumbs] == [(100, 100), (50, 50)]
+        assert thumbs[0][1].size == (100, 100)
+        assert thumbs[1][1].size == (50, 50)
+
+    def test_to_bytes(self):
+        image = Image.new('RGBA', (10, 10))
+        content = thumbnail.to_bytes(image, 'JPEG')
+        assert Image.open(io.BytesIO(content)).format == 'JPEG'
@@ -1,6 +1,10 @@
 import copy
 import json
+import os
+from unittest.mock import patch
+
 import pytest
+from django.conf import settings
 from django.http import Http404
 from django.test import TestCase
 from django.core.urlresolvers import reverse
@@ -948,3 +952,63 @@ class ResourceDetachTest(ViewTestCase, UserTestCase,
         assert self.resource.num_entities == 2
         assert self.project.resources.count() == 1
         assert self.location.resources.count() == 1
+
+
+@pytest.mark.usefixtures('make_dirs')
+class ResourceThumbnailTest(ViewTestCase, UserTestCase, FileStorageTestCase,
+                            TestCase):
+    view_class = default.ResourceThumbnail
+
+    def setup_models(self):
+        self.project = ProjectFactory.create()
+        self.resource = ResourceFactory.create(project=self.project,
+                                               mime_type='image/jpeg')
+        self.user = UserFactory.create()
+        assign_permissions(self.user)
+
+    def setup_url_kwargs(self):
+        return {
+            'organization': self.project.organization.slug,
+            'project': self.project.slug,
+            'resource': self.resource.id,
+            'size': '512',
+        }
+
+    def test_get_thumbnail(self):
+        response = self.request(user=self.user)
+        assert response.status_code == 302
+        assert response.location == self.resource.get_thumbnail_file_url(512)
+
+        self.resource.refresh_from_db()
+        assert self.resource.thumbnails == [512]
+        assert os.path.isfile(os.path.join(
+            settings.MEDIA_ROOT, 's3/uploads/resources/image-512x512.jpg'))
+
+    def test_get_created_thumbnail(self):
+        self.resource.create_thumbnails()
+        with patch.object(Resource, 'create_thumbnails') as create:
+            response = self.request(user=self.user)
+        assert response.status_code == 302
+        assert response.location == self.resource.get_thumbnail_file_url(512)
+        assert not create.called
+
+    def test_get_unknown_size(self):
+        with pytest.raises(Http404):
+            self.request(user=self.user, url_kwargs={'size': '100'})
+
+    def test_get_non_image(self):
+        self.resource.mime_type = 'text/plain'
+        self.resource.save()
+        with pytest.raises(Http404):
+            self.request(user=self.user)
+
+    def test_get_with_unauthorized_user(self):
+        response = self.request(user=UserFactory.create())
+        assert response.status_code == 302
+        assert ("You don't have permission to view this resource."
+                in response.messages)
+
+    def test_get_with_unauthenticated_user(self):
+        response = self.request()
+        assert response.status_code == 302
+        assert '/account/login/' in response.location
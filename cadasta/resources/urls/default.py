@@ -36,6 +36,10 @@ urls = [
         r'^resources/(?P<resource>[-\w]+)/detach/(?P<attachment>[-\w]+)/$',
         default.ResourceDetach.as_view(),
         name='detach'),
+    url(
+        r'^resources/(?P<resource>[-\w]+)/thumbnails/(?P<size>\d+)/$',
+        default.ResourceThumbnail.as_view(),
+        name='project_thumbnail'),
 ]
 
 urlpatterns = [
@@ -1,3 +1,5 @@
+import io
+
 from PIL import Image
 
 
@@ -29,14 +31,45 @@ def crop(img):
     return region
 
 
+def open_scaled(img, size):
+    """
+    Opens an image, letting the JPEG decoder scale it down as far as
+    possible while both sides stay at least as long as the largest side of
+    ``size``.
+    """
+    im = Image.open(img)
+    side = max(size)
+    im.draft(im.mode, (side, side))
+    return im
+
+
 def make(img, size):
-    im = fix_orientation(Image.open(img))
-    copy = im.copy()
-    cropped_img = crop(copy)
+    cropped_img = crop(fix_orientation(open_scaled(img, size)))
     cropped_img.thumbnail(size, Image.ANTIALIAS)
     return cropped_img
 
 
+def make_many(img, sizes):
+    """
+    Yields square thumbnails of an image, as returned by ``open_scaled``
+    for the largest of ``sizes``, from the largest to the smallest size.
+    Each thumbnail is scaled down from the previous one.
+    """
+    thumb = crop(fix_orientation(img))
+    for size in sorted(sizes, reverse=True):
+        thumb = thumb.copy()
+        thumb.thumbnail(size, Image.ANTIALIAS)
+        yield size, thumb
+
+
+def to_bytes(img, format):
+    buffer = io.BytesIO()
+    if format == 'JPEG' and img.mode not in ('RGB', 'L', 'CMYK'):
+        img = img.convert('RGB')
+    img.save(buffer, format=format)
+    return buffer.getvalue()
+
+
 # Code below this point is adapted from
 #
 #  https://github.com/kylefox/python-image-orientation-patch
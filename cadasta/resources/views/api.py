@@ -5,6 +5,7 @@ from rest_framework import filters, generics
 from tutelary.mixins import APIPermissionRequiredMixin
 
 from core.mixins import update_permissions
+from core.pagination import KeysetPagination
 from resources.models import ContentObject
 
 from . import mixins
@@ -47,6 +48,7 @@ class ProjectResources(APIPermissionRequiredMixin,
     }
 
     serializer_class = serializers.ResourceSerializer
+    pagination_class = KeysetPagination
     permission_filter_queryset = filter_archived_resources
     use_resource_library_queryset = True
 
@@ -84,6 +86,7 @@ class ProjectSpatialResources(APIPermissionRequiredMixin,
     filter_fields = ('id', 'name')
     search_fields = ('id', 'name',)
     ordering_fields = ('name')
+    pagination_class = KeysetPagination
     permission_required = {
         'GET': 'resource.list'
     }
@@ -2,6 +2,7 @@ import django.views.generic as base_generic
 from core.mixins import LoginPermissionRequiredMixin, update_permissions
 from core.views import generic
 from core.views.mixins import ArchiveMixin
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.forms import ValidationError
 from django.http import Http404
@@ -190,3 +191,23 @@ class ResourceDetach(LoginPermissionRequiredMixin,
                 'project': self.kwargs['project'],
             }
         )
+
+
+class ResourceThumbnail(LoginPermissionRequiredMixin,
+                        mixins.ResourceObjectMixin,
+                        base_generic.RedirectView):
+    permission_required = 'resource.view'
+    permission_denied_message = error_messages.RESOURCE_VIEW
+
+    def get_redirect_url(self, *args, **kwargs):
+        resource = self.get_object()
+        size = int(self.kwargs['size'])
+        if (not resource.has_thumbnails or
+                size not in settings.RESOURCE_THUMBNAIL_SIZES):
+            raise Http404
+
+        # Thumbnails are created by a worker once a resource is saved, but
+        # if it has not happened yet the thumbnail is created now
+        if size not in (resource.thumbnails or []):
+            resource.create_thumbnails([size])
+        return resource.get_thumbnail_file_url(size)
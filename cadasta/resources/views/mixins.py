@@ -17,10 +17,10 @@ class ResourceViewMixin:
     def get_queryset(self):
         if hasattr(self, 'use_resource_library_queryset'):
             return self.get_project().resource_set.all().select_related(
-                'contributor')
+                'contributor', 'project__organization')
         else:
             return self.get_content_object().resources.all().select_related(
-                'contributor')
+                'contributor', 'project__organization')
 
     def get_model_context(self):
         return {
@@ -1,7 +1,9 @@
+import json
 import os
 
 from zipfile import ZipFile
 
+from .base import read_es_dump
 from .shape import ShapeExporter
 from .xls import XLSExporter
 from .resource import ResourceExporter
@@ -16,9 +18,32 @@ class AllExporter():
         shp_exporter = ShapeExporter(self.project, is_standalone=False)
         xls_exporter = XLSExporter(self.project)
         res_exporter = ResourceExporter(self.project)
-        shp_dir_path = shp_exporter.make_download(es_dump_path)
-        xls_path, _ = xls_exporter.make_download(es_dump_path)
-        path, mime_type = res_exporter.make_download(es_dump_path)
+        shp_exporter.start_download(es_dump_path)
+        xls_exporter.start_download(es_dump_path)
+        res_exporter.start_download(es_dump_path)
+
+        # Read and parse the ES dump once, passing each entity to all
+        # exporters. When not standalone, the shapefile exporter only reads
+        # the title of the metadatum.
+        def write_entity(entity, metadatum):
+            xls_exporter.write_xls_row(entity, metadatum)
+            shp_exporter.write_csv_row_and_shp(entity, metadatum)
+
+        # The resource exporter downloads files in the background, which
+        # must be stopped and cleaned up if any of the exporters fails
+        try:
+            for es_type, source_line in read_es_dump(es_dump_path):
+                if es_type == 'resource':
+                    res_exporter.write_resource(json.loads(source_line))
+                else:
+                    xls_exporter.process_source(es_type, source_line,
+                                                write_entity)
+
+            shp_dir_path = shp_exporter.finish_download()
+            xls_path, _ = xls_exporter.finish_download()
+            path, mime_type = res_exporter.finish_download()
+        finally:
+            res_exporter.cleanup()
 
         with ZipFile(path, 'a') as myzip:
             myzip.write(xls_path, arcname='data.xlsx')
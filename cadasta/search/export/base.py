@@ -1,4 +1,5 @@
 import json
+import re
 from collections import OrderedDict
 
 from django.contrib.contenttypes.models import ContentType
@@ -8,6 +9,9 @@ from party.models import TENURE_RELATIONSHIP_TYPES
 from core.form_mixins import get_types
 from .utils import convert_postgis_ewkb_to_ewkt
 
+ES_DUMP_BUFFER_SIZE = 1024 * 1024
+ES_TYPE = re.compile(r'"_type"\s*:\s*"([^"]*)"')
+
 
 class Exporter(SchemaSelectorMixin):
 
@@ -51,40 +55,86 @@ class Exporter(SchemaSelectorMixin):
             },
         }
 
-        # Create ordered dict of all attributes, conditional or not
         for metadatum in self.metadata.values():
-            attr_columns = OrderedDict(
-                (a, '') for a in metadatum['model_attrs'])
-            schema_columns = OrderedDict(
-                (a.name, '')
-                for attrs in metadatum['schema_attrs'].values()
-                for a in attrs.values())
-            attr_columns.update(schema_columns)
-            metadatum['attr_columns'] = attr_columns
+            metadatum['conditional_selector'] = self.get_conditional_selector(
+                metadatum['content_type'])
+            self.compile_columns(metadatum)
 
-    def get_attr_values(self, item, metadatum):
-        attr_values = {}
-        for attr in metadatum['model_attrs']:
-            attr_values[attr] = item[attr]
+    def compile_columns(self, metadatum):
+        """
+        Computes the columns of a metadatum and, for each entity type, where
+        the value of each column is read from. Must be called again if
+        ``model_attrs`` changes.
+        """
+        model_attrs = metadatum['model_attrs']
+
+        # Create ordered dict of all attributes, conditional or not
+        attr_columns = OrderedDict((a, '') for a in model_attrs)
+        schema_columns = OrderedDict(
+            (a.name, '')
+            for attrs in metadatum['schema_attrs'].values()
+            for a in attrs.values())
+        attr_columns.update(schema_columns)
+        metadatum['attr_columns'] = attr_columns
 
-        conditional_selector = self.get_conditional_selector(
-            metadatum['content_type'])
+        def get_layout(attributes):
+            # None: empty cell, True: attribute value, False: model field
+            layout = []
+            for column in attr_columns:
+                if column in attributes:
+                    layout.append((column, True))
+                elif column in model_attrs:
+                    layout.append((column, False))
+                else:
+                    layout.append((column, None))
+            return layout
+
+        metadatum['row_layouts'] = {
+            entity_type: get_layout(attributes)
+            for entity_type, attributes in metadatum['schema_attrs'].items()
+        }
+        metadatum['row_layouts'][None] = get_layout({})
+
+    def get_row_layout(self, item, metadatum):
+        conditional_selector = metadatum['conditional_selector']
         if conditional_selector:
             entity_type = item[conditional_selector]
-            attributes = metadatum['schema_attrs'].get(entity_type, {})
         else:
-            attributes = metadatum['schema_attrs'].get('DEFAULT', {})
-        for attr, _ in attributes.items():
-            attr_value = item['attributes'].get(attr, '')
-            if type(attr_value) == list:
-                attr_value = ', '.join(attr_value)
-            attr_values[attr] = attr_value
+            entity_type = 'DEFAULT'
+        layouts = metadatum['row_layouts']
+        return layouts.get(entity_type, layouts[None])
+
+    def get_row(self, item, metadatum):
+        """Returns the values of ``item`` in the order of ``attr_columns``."""
+        attributes = item['attributes']
+        row = []
+        for column, is_attr in self.get_row_layout(item, metadatum):
+            if is_attr is None:
+                row.append('')
+            elif is_attr:
+                row.append(get_attr_value(attributes, column))
+            else:
+                row.append(item[column])
+        return row
 
+    def get_attr_values(self, item, metadatum):
+        attr_values = {attr: item[attr] for attr in metadatum['model_attrs']}
+        for column, is_attr in self.get_row_layout(item, metadatum):
+            if is_attr:
+                attr_values[column] = get_attr_value(
+                    item['attributes'], column)
         return attr_values
 
+    def process_dump(self, es_dump_path, write_callback):
+        for es_type, source_line in read_es_dump(es_dump_path):
+            self.process_source(es_type, source_line, write_callback)
+
     def process_entity(self, es_type_line, es_source_line, write_callback):
-        # Extract ES type and source and skip if not loc/party/rel
-        es_type = json.loads(es_type_line)['index']['_type']
+        self.process_source(
+            get_es_type(es_type_line), es_source_line, write_callback)
+
+    def process_source(self, es_type, es_source_line, write_callback):
+        # Skip if not loc/party/rel
         if es_type not in ('spatial', 'party'):
             return
         source = json.loads(es_source_line)
@@ -99,7 +149,8 @@ class Exporter(SchemaSelectorMixin):
                 metadatum = self.metadata['party']
 
         # Reformat data to match model_attrs
-        source['attributes'] = json.loads(source['attributes']['value'])
+        if metadatum['model_name'] != 'TenureRelationship':
+            source['attributes'] = json.loads(source['attributes']['value'])
         if metadatum['model_name'] == 'SpatialUnit':
             if source['geometry'] is None:
                 ewkt = ''
@@ -121,3 +172,28 @@ class Exporter(SchemaSelectorMixin):
 
         # Call callback
         write_callback(source, metadatum)
+
+
+def get_attr_value(attributes, name):
+    attr_value = attributes.get(name, '')
+    if isinstance(attr_value, list):
+        attr_value = ', '.join(attr_value)
+    return attr_value
+
+
+def get_es_type(es_type_line):
+    match = ES_TYPE.search(es_type_line)
+    if match:
+        return match.group(1)
+    return json.loads(es_type_line)['index']['_type']
+
+
+def read_es_dump(es_dump_path):
+    """
+    Yields the ES type and the unparsed source line of each entity in an ES
+    dump file. The file is read in large buffered chunks.
+    """
+    with open(es_dump_path, encoding='utf-8',
+              buffering=ES_DUMP_BUFFER_SIZE) as f:
+        for type_line, source_line in zip(f, f):
+            yield get_es_type(type_line), source_line
@@ -1,92 +1,173 @@
 import json
+import logging
 import os
-import subprocess
+import tempfile
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 from openpyxl import Workbook
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
 from zipfile import ZipFile
 
 from resources.models import ContentObject
+from .base import read_es_dump
 
 MIME_TYPE = 'application/zip'
 
+logger = logging.getLogger(__name__)
+
 
 class ResourceExporter():
 
+    # Number of files downloaded at the same time, and number of files that
+    # can be downloaded before being written to the zip.
+    MAX_WORKERS = 8
+    MAX_IN_FLIGHT = 32
+    TIMEOUT = 60
+    CHUNK_SIZE = 64 * 1024
+
     def __init__(self, project):
         self.project = project
 
     def make_download(self, es_dump_path):
-        base_path = os.path.splitext(es_dump_path)[0]
-        has_resources = False
-
-        # Create worksheet for resources metadata
-        workbook = Workbook(write_only=True)
-        worksheet = workbook.create_sheet(title='resources')
-        worksheet.append(['id', 'name', 'description', 'filename',
-                          'locations', 'parties', 'relationships'])
-
-        # Create temp dir where S3 files will be downloaded
-        dir_path = base_path + '-res-dir'
-        os.makedirs(dir_path)
+        self.start_download(es_dump_path)
+        try:
+            for es_type, source_line in read_es_dump(es_dump_path):
+                # Skip if not resource
+                if es_type == 'resource':
+                    self.write_resource(json.loads(source_line))
+            return self.finish_download()
+        finally:
+            self.cleanup()
+
+    def start_download(self, es_dump_path):
+        self.base_path = os.path.splitext(es_dump_path)[0]
+        self.resources = []
+        self.filenames = {}
 
         # Create zip file and start processing
-        zip_path = base_path + '-res.zip'
-        filenames = {}
-        with ZipFile(zip_path, 'a') as myzip:
-
-            f = open(es_dump_path, encoding='utf-8')
-            while True:
-                # Read 2 lines in the dump file
-                type_line = f.readline()
-                source_line = f.readline()
-                if not type_line:
-                    break
-
-                # Extract ES type and source and skip if not resource
-                es_type = json.loads(type_line)['index']['_type']
-                if es_type != 'resource':
-                    continue
-                has_resources = True
-                source = json.loads(source_line)
-
-                # Fetch file from S3 using curl and add to zip file
-                # and ensuring filenames are unique
-                temp_resource_path = dir_path + '/' + source['original_file']
-                subprocess.run([
-                    'curl', '-o', temp_resource_path, '-XGET', source['file']
-                ])
-                filename = source['original_file']
-                if filename not in filenames:
-                    filenames[filename] = 1
-                else:
-                    filenames[filename] += 1
-                    basename, ext = os.path.splitext(filename)
-                    filename = '{} ({}){}'.format(
-                        basename, filenames[filename], ext)
-                    source['original_file'] = filename
-                myzip.write(temp_resource_path,
-                            arcname='resources/' + filename)
-
-                self.append_resource_metadata(source, worksheet)
-
-            if has_resources:
-                xls_path = base_path + '-res.xlsx'
+        self.zip_path = self.base_path + '-res.zip'
+        self.zip_file = ZipFile(self.zip_path, 'a')
+
+        # Files are fetched from S3 by a pool of threads sharing a
+        # connection pool
+        self.session = Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.MAX_WORKERS, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        self.in_flight = deque()
+
+    def write_resource(self, source):
+        self.in_flight.append(
+            (source, self.executor.submit(self.fetch_file, source['file'])))
+        while len(self.in_flight) >= self.MAX_IN_FLIGHT:
+            self.write_next_file()
+
+    def fetch_file(self, url):
+        # Files are streamed to disk, so only the chunks being copied are
+        # held in memory. Returns None if the file could not be fetched.
+        fd, path = tempfile.mkstemp(dir=os.path.dirname(self.zip_path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with self.session.get(url, timeout=self.TIMEOUT,
+                                      stream=True) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(self.CHUNK_SIZE):
+                        f.write(chunk)
+        except RequestException as e:
+            os.remove(path)
+            logger.warning("Skipping resource file %s in export of project "
+                           "%s: %s", url, self.project.slug, e)
+            return None
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+
+    def write_next_file(self):
+        # Files are written in the order of the dump, ensuring filenames
+        # are unique
+        source, future = self.in_flight.popleft()
+        path = future.result()
+        if path is None:
+            # Resources whose file is missing are left out of the export
+            return
+        filename = source['original_file']
+        if filename not in self.filenames:
+            self.filenames[filename] = 1
+        else:
+            self.filenames[filename] += 1
+            basename, ext = os.path.splitext(filename)
+            filename = '{} ({}){}'.format(
+                basename, self.filenames[filename], ext)
+            source['original_file'] = filename
+        try:
+            self.zip_file.write(path, arcname='resources/' + filename)
+        finally:
+            os.remove(path)
+        self.resources.append(source)
+
+    def finish_download(self):
+        try:
+            while self.in_flight:
+                self.write_next_file()
+
+            if self.resources:
+                # Create worksheet for resources metadata
+                workbook = Workbook(write_only=True)
+                worksheet = workbook.create_sheet(title='resources')
+                worksheet.append(['id', 'name', 'description', 'filename',
+                                  'locations', 'parties', 'relationships'])
+                links = self.get_resource_links(
+                    [source['id'] for source in self.resources])
+                for source in self.resources:
+                    self.append_resource_metadata(
+                        source, worksheet, links[source['id']])
+
+                xls_path = self.base_path + '-res.xlsx'
                 workbook.save(filename=xls_path)
-                myzip.write(xls_path, arcname='resources.xlsx')
-
-            myzip.close()
-            f.close()
-
-        return zip_path, MIME_TYPE
-
-    def append_resource_metadata(self, source, worksheet):
+                self.zip_file.write(xls_path, arcname='resources.xlsx')
+        finally:
+            self.cleanup()
+        return self.zip_path, MIME_TYPE
+
+    def cleanup(self):
+        # Called once the download is finished or has failed, and safe to
+        # call again
+        self.discard_in_flight()
+        self.session.close()
+        self.zip_file.close()
+
+    def discard_in_flight(self):
+        # Only left over if a download failed; removes the files that were
+        # already fetched
+        for _, future in self.in_flight:
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        while self.in_flight:
+            _, future = self.in_flight.popleft()
+            if (future.done() and not future.cancelled() and
+                    future.exception() is None and
+                    future.result() is not None):
+                os.remove(future.result())
+
+    def get_resource_links(self, resource_ids):
+        links = defaultdict(list)
+        content_objects = ContentObject.objects.filter(
+            resource__id__in=resource_ids).values_list(
+                'resource_id', 'content_type__model', 'object_id')
+        for resource_id, model, object_id in content_objects:
+            links[resource_id].append((model, object_id))
+        return links
+
+    def append_resource_metadata(self, source, worksheet, links):
         location_ids = []
         party_ids = []
         tenure_rel_ids = []
 
-        links = ContentObject.objects.filter(
-            resource__id=source['id']).values_list(
-                'content_type__model', 'object_id')
         for link in links:
             if link[0] == 'spatialunit':
                 location_ids.append(link[1])
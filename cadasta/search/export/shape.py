@@ -5,7 +5,7 @@ from zipfile import ZipFile
 from osgeo import ogr, osr
 from django.template.loader import render_to_string
 
-from .base import Exporter
+from .base import ES_DUMP_BUFFER_SIZE, Exporter
 
 MIME_TYPE = 'application/zip'
 shp_types = {
@@ -25,26 +25,21 @@ class ShapeExporter(Exporter):
         super().__init__(project)
 
     def make_download(self, es_dump_path):
-        base_path = os.path.splitext(es_dump_path)[0]
+        self.start_download(es_dump_path)
+        self.process_dump(es_dump_path, self.write_csv_row_and_shp)
+        return self.finish_download()
+
+    def start_download(self, es_dump_path):
+        self.base_path = os.path.splitext(es_dump_path)[0]
 
         # CSV files do not need the EWKT geometry
         self.metadata['location']['model_attrs'] = ['id', 'type']
-        self.metadata['location']['attr_columns'].pop('geometry.ewkt')
+        self.compile_columns(self.metadata['location'])
 
-        self.dir_path = base_path + '-shp-dir'
+        self.dir_path = self.base_path + '-shp-dir'
         self.shp_datasource = self.create_shp_datasource()
 
-        f = open(es_dump_path, encoding='utf-8')
-        while True:
-            # Read 2 lines in the dump file
-            type_line = f.readline()
-            source_line = f.readline()
-            if not type_line:
-                break
-            self.process_entity(
-                type_line, source_line, self.write_csv_row_and_shp)
-        f.close()
-
+    def finish_download(self):
         # Clean up
         for metadatum in self.metadata.values():
             f = metadatum.get('csv_file')
@@ -63,7 +58,7 @@ class ShapeExporter(Exporter):
             f.close()
 
         if self.is_standalone:
-            zip_path = base_path + '-shp.zip'
+            zip_path = self.base_path + '-shp.zip'
             with ZipFile(zip_path, 'a') as myzip:
                 for f in os.listdir(self.dir_path):
                     myzip.write(os.path.join(self.dir_path, f), arcname=f)
@@ -83,17 +78,15 @@ class ShapeExporter(Exporter):
             # Create CSV file if not yet created
             if not metadatum.get('csv_file'):
                 fn = os.path.join(self.dir_path, metadatum['title'] + '.csv')
-                f = open(fn, 'w+', newline='')
+                f = open(fn, 'w+', newline='',
+                         buffering=ES_DUMP_BUFFER_SIZE)
                 metadatum['csv_file'] = f
                 w = csv.writer(f)
                 metadatum['csv_writer'] = w
                 w.writerow(metadatum['attr_columns'].keys())
 
-            attr_values = self.get_attr_values(entity, metadatum)
-            data = metadatum['attr_columns'].copy()
-            data.update(attr_values)
-            writer = metadatum['csv_writer']
-            writer.writerow(list(data.values()))
+            metadatum['csv_writer'].writerow(
+                self.get_row(entity, metadatum))
 
         if metadatum['title'] == 'locations':
             self.write_shp_layer(entity)
@@ -0,0 +1,46 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Thread
+
+
+class FileServer(ThreadingMixIn, HTTPServer):
+    """
+    Serves files from memory on a local port, standing in for S3 in export
+    tests.
+    """
+    daemon_threads = True
+
+    def __init__(self, files):
+        self.files = files
+        self.request_count = 0
+        super().__init__(('127.0.0.1', 0), FileRequestHandler)
+
+    def url(self, path):
+        return 'http://127.0.0.1:{}/{}'.format(self.server_port, path)
+
+    def __enter__(self):
+        Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class FileRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.request_count += 1
+        content = self.server.files.get(self.path.lstrip('/'))
+        if content is None:
+            self.send_response(404)
+            content = b''
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
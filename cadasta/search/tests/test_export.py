@@ -9,6 +9,7 @@ from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 from openpyxl import load_workbook
+from unittest.mock import patch
 from zipfile import ZipFile
 
 from core.models import RandomIDModel
@@ -26,7 +27,9 @@ from questionnaires.managers import create_attrs_schema, get_attr_type_ids
 from questionnaires.tests import attr_schemas
 from questionnaires.tests.factories import QuestionnaireFactory
 from .fake_results import get_fake_es_api_results
-from ..export.base import Exporter
+from .file_server import FileServer
+from ..export import all as export_all
+from ..export.base import Exporter, get_es_type, read_es_dump
 from ..export.all import AllExporter
 from ..export.resource import ResourceExporter
 from ..export.shape import ShapeExporter
@@ -197,6 +200,60 @@ class ExporterTest(BaseTestClass):
             else:
                 assert attr_values[key] == key.upper()
 
+    def test_get_row(self):
+        party_data = {
+            'id': 'ID',
+            'name': 'NAME',
+            'type': 'GR',
+            'attributes': {
+                'notes': ['1', '2'],
+                'number_of_members': 'NUMBER_OF_MEMBERS',
+                'gender': 'GENDER',
+            },
+        }
+
+        exporter = Exporter(self.project)
+        metadatum = exporter.metadata['party']
+        assert exporter.get_row(party_data, metadatum) == [
+            'ID', 'NAME', 'GR', '1, 2', '', '', '', 'NUMBER_OF_MEMBERS', '']
+
+        party_data['type'] = 'XX'
+        assert exporter.get_row(party_data, metadatum) == [
+            'ID', 'NAME', 'XX', '', '', '', '', '', '']
+
+    def test_compile_columns(self):
+        exporter = Exporter(self.project)
+        metadatum = exporter.metadata['location']
+        metadatum['model_attrs'] = ['id', 'type']
+        exporter.compile_columns(metadatum)
+
+        assert list(metadatum['attr_columns'].keys()) == [
+            'id', 'type', 'quality', 'infrastructure']
+        location_data = {
+            'id': 'ID',
+            'type': 'TYPE',
+            'geometry.ewkt': 'GEOMETRY.EWKT',
+            'attributes': {'quality': 'QUALITY'},
+        }
+        assert exporter.get_row(location_data, metadatum) == [
+            'ID', 'TYPE', 'QUALITY', '']
+
+    def test_read_es_dump(self):
+        es_dump_path = os.path.join(
+            os.path.dirname(settings.BASE_DIR),
+            'search/tests/files/test_es_dump_basic.esjson'
+        )
+        entities = list(read_es_dump(es_dump_path))
+        assert [es_type for es_type, _ in entities] == [
+            'spatial', 'party', 'party', 'resource']
+        assert json.loads(entities[0][1])['id'] == 'ID0'
+
+    def test_get_es_type(self):
+        assert get_es_type('{"index": {"_type": "spatial"}}') == 'spatial'
+        assert get_es_type(
+            '{"index":{"_index":"project-1","_type":"party","_id":"1"}}'
+        ) == 'party'
+
     def test_process_location_entity(self):
         es_type_line = '{"index": {"_type": "spatial"} }'
         dummies = []
@@ -678,6 +735,94 @@ class ResourceExporterTest(BaseTestClass):
         assert mime_type == ('application/zip')
         assert ZipFile(zip_path).namelist() == []
 
+    def test_make_download_from_file_server(self):
+        res = ResourceFactory.create(project=self.project)
+        loc = SpatialUnitFactory.create(project=self.project)
+        ContentObject.objects.create(resource=res, content_object=loc)
+
+        ensure_dirs()
+        files = {'file{}'.format(i): 'content {}'.format(i).encode()
+                 for i in range(50)}
+        with FileServer(files) as server:
+            es_dump_path = write_resource_dump(
+                'test-res4.esjson', server, len(files), first_id=res.id)
+            exporter = ResourceExporter(self.project)
+            exporter.MAX_IN_FLIGHT = 4
+            zip_path, _ = exporter.make_download(es_dump_path)
+            assert server.request_count == 50
+
+        with ZipFile(zip_path) as myzip:
+            files = myzip.namelist()
+            assert len(files) == 51
+            assert myzip.read('resources/file.txt') == b'content 0'
+            assert myzip.read('resources/file (2).txt') == b'content 1'
+            assert myzip.read('resources/file (50).txt') == b'content 49'
+
+            myzip.extract('resources.xlsx', test_dir)
+            wb = load_workbook(os.path.join(test_dir, 'resources.xlsx'))
+            ws = wb['resources']
+            assert ws['A2'].value == res.id
+            assert ws['D2'].value == 'file.txt'
+            assert ws['E2'].value == loc.id
+            assert ws['A3'].value == 'RES1'
+            assert ws['D3'].value == 'file (2).txt'
+            assert ws['E3'].value is None
+            assert ws.max_row == 51
+
+    def test_make_download_with_missing_file(self):
+        ensure_dirs()
+        files = {'file{}'.format(i): b'content' for i in range(5)}
+        del files['file2']
+        with FileServer(files) as server:
+            es_dump_path = write_resource_dump(
+                'test-res6.esjson', server, 5)
+            exporter = ResourceExporter(self.project)
+            zip_path, _ = exporter.make_download(es_dump_path)
+
+        assert [source['id'] for source in exporter.resources] == [
+            'RES0', 'RES1', 'RES3', 'RES4']
+        with ZipFile(zip_path) as myzip:
+            assert len(myzip.namelist()) == 5
+            assert 'resources/file (4).txt' in myzip.namelist()
+            assert 'resources/file (5).txt' not in myzip.namelist()
+        assert not [name for name in os.listdir(test_dir)
+                    if name.startswith('tmp')]
+
+    def test_make_download_with_failed_write(self):
+        ensure_dirs()
+        files = {'file{}'.format(i): b'content' for i in range(10)}
+        with FileServer(files) as server:
+            es_dump_path = write_resource_dump(
+                'test-res7.esjson', server, 10)
+            exporter = ResourceExporter(self.project)
+            exporter.MAX_IN_FLIGHT = 4
+            with patch.object(ZipFile, 'write', side_effect=OSError):
+                with pytest.raises(OSError):
+                    exporter.make_download(es_dump_path)
+
+        # Files that were already fetched are removed, and the zip closed
+        assert not exporter.in_flight
+        assert exporter.zip_file.fp is None
+        assert not [name for name in os.listdir(test_dir)
+                    if name.startswith('tmp')]
+
+
+def write_resource_dump(filename, server, num_files, first_id='RES0'):
+    es_dump_path = os.path.join(test_dir, filename)
+    with open(es_dump_path, 'w') as f:
+        for i in range(num_files):
+            f.write('{"index": {"_type": "resource"}}\n')
+            f.write(json.dumps({
+                'id': first_id if i == 0 else 'RES{}'.format(i),
+                'name': 'File {}'.format(i),
+                'description': '',
+                'file': server.url('file{}'.format(i)),
+                'original_file': 'file.txt',
+                'mime_type': 'text/plain',
+                'archived': False,
+            }) + '\n')
+    return es_dump_path
+
 
 @pytest.mark.usefixtures('clear_temp')
 @pytest.mark.usefixtures('make_dirs')
@@ -824,6 +969,56 @@ class AllExporterTest(BaseTestClass):
             assert sheetnames == ['Sheet']
             assert wb['Sheet']['A1'].value is None
 
+    def test_make_download_reads_dump_once(self):
+        ensure_dirs()
+        original_es_dump_path = os.path.join(
+            os.path.dirname(settings.BASE_DIR),
+            'search/tests/files/test_es_dump_null_geometry.esjson'
+        )
+        es_dump_path = os.path.join(test_dir, 'test-all3.esjson')
+        shutil.copy(original_es_dump_path, es_dump_path)
+
+        exporter = AllExporter(self.project)
+        with patch.object(export_all, 'read_es_dump',
+                          wraps=read_es_dump) as read_dump, \
+                patch.object(Exporter, 'process_source', autospec=True,
+                             side_effect=Exporter.process_source) as process:
+            zip_path, _ = exporter.make_download(es_dump_path)
+
+        assert read_dump.call_count == 1
+        assert process.call_count == 1
+
+        with ZipFile(zip_path) as myzip:
+            assert myzip.namelist() == ['data.xlsx']
+            myzip.extract('data.xlsx', test_dir)
+            wb = load_workbook(os.path.join(test_dir, 'data.xlsx'))
+            assert wb.get_sheet_names() == ['locations']
+            ws = wb['locations']
+            assert ws['A1'].value == 'id'
+            assert ws['B1'].value == 'geometry.ewkt'
+            assert ws['A2'].value == 'ID0'
+
+    def test_make_download_cleans_up_on_failure(self):
+        ensure_dirs()
+        original_es_dump_path = os.path.join(
+            os.path.dirname(settings.BASE_DIR),
+            'search/tests/files/test_es_dump_null_geometry.esjson'
+        )
+        es_dump_path = os.path.join(test_dir, 'test-all4.esjson')
+        shutil.copy(original_es_dump_path, es_dump_path)
+
+        exporter = AllExporter(self.project)
+        with patch.object(ResourceExporter, 'cleanup', autospec=True,
+                          side_effect=ResourceExporter.cleanup) as cleanup, \
+                patch.object(XLSExporter, 'finish_download',
+                             side_effect=ValueError):
+            with pytest.raises(ValueError):
+                exporter.make_download(es_dump_path)
+
+        assert cleanup.call_count == 1
+        res_exporter = cleanup.call_args[0][0]
+        assert res_exporter.zip_file.fp is None
+
 
 class UtilsTest(TestCase):
 
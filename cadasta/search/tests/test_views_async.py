@@ -610,6 +610,44 @@ class SearchAPITest(APITestCase, UserTestCase, TestCase):
             '_source': {},
         }) is None
 
+    def test_get_entities(self):
+        results = self.results['hits']['hits']
+        view = self.view_class()
+        with self.assertNumQueries(4):
+            entities = view.get_entities(results)
+            urls = [
+                view.get_entity(
+                    r['_type'], r['_source'], entities).get_absolute_url()
+                for r in results[1:]
+            ]
+            assert view.get_entity(
+                'party', self.tenure_rel_result['_source'],
+                entities).spatial_unit.name == self.su.name
+
+        assert entities == {
+            SpatialUnit: {self.su.id: self.su},
+            Party: {self.party.id: self.party},
+            TenureRelationship: {self.tenure_rel.id: self.tenure_rel},
+            Resource: {self.resource.id: self.resource},
+        }
+        assert urls == [
+            self.su.get_absolute_url(),
+            self.party.get_absolute_url(),
+            self.tenure_rel.get_absolute_url(),
+            self.resource.get_absolute_url(),
+        ]
+
+    def test_get_entity_missing_from_entities(self):
+        assert self.view_class().get_entity(
+            'spatial', self.su_result['_source'], {}) is None
+
+    def test_get_schema_attributes_is_cached(self):
+        view = self.view_class()
+        su2 = SpatialUnitFactory.create(project=self.project)
+        attrs = view.get_schema_attributes(self.su)
+        with self.assertNumQueries(0):
+            assert view.get_schema_attributes(su2) is attrs
+
     def test_get_entity_location(self):
         assert self.view_class().get_entity(
             'spatial', self.su_result['_source']) == self.su
@@ -1,14 +1,14 @@
 import json
 # import os
 import requests
+from collections import defaultdict
 # import subprocess
 # import time
 
 from django.conf import settings
 # from django.http import HttpResponse, HttpResponseBadRequest
 from django.utils.translation import ugettext as _
-from django.core.exceptions import ObjectDoesNotExist
-from django.template.loader import render_to_string
+from django.template.loader import get_template
 # from django.views.generic.base import View
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -35,11 +35,49 @@ api_url = (
     settings.ES_SCHEME + '://' + settings.ES_HOST + ':' + settings.ES_PORT)
 party_type_choices = {c[0]: c[1] for c in Party.TYPE_CHOICES}
 
+# Models a search result can refer to, for each ES type, in the order in
+# which they are tried, and the related objects needed to display them
+ENTITY_MAPPINGS = {
+    'spatial': (
+        {
+            'model': SpatialUnit,
+            'id_field_name': 'id',
+        },
+    ),
+    'party': (
+        {
+            'model': TenureRelationship,
+            'id_field_name': 'tenure_id',
+        },
+        {
+            'model': Party,
+            'id_field_name': 'id',
+        },
+    ),
+    'resource': (
+        {
+            'model': Resource,
+            'id_field_name': 'id',
+        },
+    ),
+}
+ENTITY_RELATED = {
+    SpatialUnit: ('project__organization',),
+    TenureRelationship: ('project__organization', 'spatial_unit'),
+    Party: ('project__organization',),
+    Resource: ('project__organization',),
+}
+
 
 class Search(tmixins.APIPermissionRequiredMixin, ProjectMixin, APIView):
 
     permission_required = 'project.view_private'
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.schema_attributes = {}
+        self.result_template = None
+
     def get_perms_objects(self):
         return [self.get_project()]
 
@@ -89,10 +127,11 @@ class Search(tmixins.APIPermissionRequiredMixin, ProjectMixin, APIView):
             else:
                 timestamp = results[0]['_source'].get('@timestamp')
 
+            entities = self.get_entities(results)
             for result in results:
                 if result['_type'] == 'project':
                     continue
-                augmented_result = self.augment_result(result)
+                augmented_result = self.augment_result(result, entities)
                 if augmented_result is None:
                     continue
                 html = self.htmlize_result(augmented_result)
@@ -142,12 +181,12 @@ class Search(tmixins.APIPermissionRequiredMixin, ProjectMixin, APIView):
         except requests.exceptions.RequestException:
             return _("unknown")
 
-    def augment_result(self, result):
+    def augment_result(self, result, entities=None):
         """Returns an augmented data suitable for plugging into HTML
         given the raw ES result."""
         es_type = result['_type']
         source = result['_source']
-        entity = self.get_entity(es_type, source)
+        entity = self.get_entity(es_type, source, entities)
         if entity is None:
             return None
         model = type(entity)
@@ -163,42 +202,36 @@ class Search(tmixins.APIPermissionRequiredMixin, ProjectMixin, APIView):
 
         return augmented_result
 
-    def get_entity(self, es_type, source):
-        """Returns the model instance for a search result given its ES type and
-        the result source document, which should contain the database ID."""
-        mappings = {
-            'spatial': (
-                {
-                    'model': SpatialUnit,
-                    'id_field_name': 'id',
-                },
-            ),
-            'party': (
-                {
-                    'model': TenureRelationship,
-                    'id_field_name': 'tenure_id',
-                },
-                {
-                    'model': Party,
-                    'id_field_name': 'id',
-                },
-            ),
-            'resource': (
-                {
-                    'model': Resource,
-                    'id_field_name': 'id',
-                },
-            ),
-        }
-        mapping = mappings.get(es_type)
-        if mapping:
-            for model_map in mapping:
-                id = source.get(model_map['id_field_name'])
+    def get_entities(self, results):
+        """Loads the model instances for a list of ES results, with one
+        query per model. Returns a dict mapping each model to a dict of
+        instances by ID."""
+        ids = defaultdict(set)
+        for result in results:
+            for model_map in ENTITY_MAPPINGS.get(result['_type'], ()):
+                id = result['_source'].get(model_map['id_field_name'])
                 if id:
-                    try:
-                        return model_map['model'].objects.get(id=id)
-                    except ObjectDoesNotExist:
-                        pass
+                    ids[model_map['model']].add(id)
+
+        return {
+            model: model.objects.select_related(
+                *ENTITY_RELATED[model]).in_bulk(list(model_ids))
+            for model, model_ids in ids.items()
+        }
+
+    def get_entity(self, es_type, source, entities=None):
+        """Returns the model instance for a search result given its ES type and
+        the result source document, which should contain the database ID.
+        Instances are looked up in ``entities``, as returned by
+        ``get_entities``, if given."""
+        if entities is None:
+            entities = self.get_entities(
+                [{'_type': es_type, '_source': source}])
+        for model_map in ENTITY_MAPPINGS.get(es_type, ()):
+            id = source.get(model_map['id_field_name'])
+            entity = entities.get(model_map['model'], {}).get(id)
+            if entity is not None:
+                return entity
         return None
 
     def get_main_label(self, model, source):
@@ -214,8 +247,7 @@ class Search(tmixins.APIPermissionRequiredMixin, ProjectMixin, APIView):
         """Returns additional display data for the result."""
         if type(entity) == SpatialUnit:
             attributes = []
-            schema = Schema.objects.from_instance(entity)
-            attrs = [a for s in schema for a in s.attributes.all()]
+            attrs = self.get_schema_attributes(entity)
             attributes.extend([
                 (a.long_name, a.render(entity.attributes.get(a.name, '—')))
                 for a in attrs if not a.omit and 'name' in a.name
@@ -235,10 +267,22 @@ class Search(tmixins.APIPermissionRequiredMixin, ProjectMixin, APIView):
             ]
         return attributes
 
+    def get_schema_attributes(self, entity):
+        """Returns the schema attributes of an entity. Attributes are loaded
+        once for all entities with the same schemas."""
+        schemas = Schema.objects.from_instance(entity)
+        key = tuple(s.pk for s in schemas)
+        if key not in self.schema_attributes:
+            self.schema_attributes[key] = [
+                a for s in schemas for a in s.attributes.all()]
+        return self.schema_attributes[key]
+
     def htmlize_result(self, result):
         """Formats the search result into an HTML snippet."""
-        return render_to_string(
-            'search/search_result_item.html', {'result': result})
+        if self.result_template is None:
+            self.result_template = get_template(
+                'search/search_result_item.html')
+        return self.result_template.render({'result': result})
 
 
 # class SearchExport(tmixins.PermissionRequiredMixin, ProjectMixin, View):
@@ -1,5 +1,15 @@
+from django.utils.translation import ugettext_lazy as _
+from rest_framework.exceptions import APIException
+
+
 class SpatialRelationshipError(Exception):
     """Exception raised for illegal location relationship assignment.
     """
     def __init__(self, msg):
         super().__init__("illegal relationship: " + msg)
+
+
+class TilesNotSupported(APIException):
+    """Raised when the database cannot generate vector tiles."""
+    status_code = 501
+    default_detail = _("Vector tiles are not supported by this server.")
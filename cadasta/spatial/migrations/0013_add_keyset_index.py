@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 11:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spatial', '0012_populate_label_field'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spatialunit',
+            index=models.Index(fields=['project', 'last_updated', 'id'], name='spatial_su_keyset_idx'),
+        ),
+    ]
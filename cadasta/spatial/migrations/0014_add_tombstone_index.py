@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.11 on 2026-10-18 12:20
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+TOMBSTONE_INDEXES = (
+    ('spatial_su_tombstone_idx', 'spatial_historicalspatialunit'),
+)
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes the deletions recorded in the history table, which project
+    syncs read as tombstones (see organization.sync).
+    """
+
+    dependencies = [
+        ('spatial', '0013_add_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX {index} ON {table} "
+            "(project_id, history_date, history_id) "
+            "WHERE history_type = '-';".format(index=index, table=table),
+            reverse_sql='DROP INDEX {index};'.format(index=index)
+        )
+        for index, table in TOMBSTONE_INDEXES
+    ]
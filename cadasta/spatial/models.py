@@ -19,7 +19,7 @@ from .choices import TYPE_CHOICES
 from resources.mixins import ResourceModelMixin
 from jsonattrs.fields import JSONAttributeField
 from jsonattrs.decorators import fix_model_for_attributes
-from questionnaires.models import Questionnaire, QuestionOption
+from questionnaires.registry import get_registry
 
 
 @fix_model_for_attributes
@@ -70,6 +70,12 @@ class SpatialUnit(ResourceModelMixin, RandomIDModel):
 
     class Meta:
         ordering = ('type',)
+        indexes = [
+            # Keyset pagination of the project's locations (see
+            # core.pagination)
+            models.Index(fields=['project', 'last_updated', 'id'],
+                         name='spatial_su_keyset_idx'),
+        ]
 
     class TutelaryMeta:
         perm_type = 'spatial'
@@ -140,9 +146,8 @@ class SpatialUnit(ResourceModelMixin, RandomIDModel):
             return translated_label
 
         # If label failed to translate, fallback to default language
-        rel_questionnaire = Questionnaire.objects.get(
-            id=self.project.current_questionnaire)
-        return self.label.get(rel_questionnaire.default_language)
+        registry = get_registry(self.project.current_questionnaire)
+        return self.label.get(registry.default_language)
 
 
 def reassign_spatial_geometry(instance):
@@ -290,11 +295,10 @@ def set_label_on_spatialunits(sender, instance, **kwargs):
         if unchanged:
             return
 
-    try:
-        rel_questionoption = QuestionOption.objects.get(
-            name=instance.type,
-            question__name='location_type',
-            question__questionnaire__id=instance.project.current_questionnaire)
-    except QuestionOption.DoesNotExist:
+    registry = get_registry(instance.project.current_questionnaire)
+    if registry is None:
         return
-    instance.label = rel_questionoption.label_xlat
+    label = registry.get_option_label_xlat('location_type', instance.type)
+    if label is None:
+        return
+    instance.label = label
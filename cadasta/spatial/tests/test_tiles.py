@@ -0,0 +1,81 @@
+from django.test import TestCase
+
+from organization.models import ProjectStatistics
+from organization.tests.factories import ProjectFactory
+from core.tests.utils.cases import UserTestCase
+from .factories import SpatialUnitFactory
+from ..models import SpatialUnit
+from .. import tiles
+
+
+class TileBoundsTest(TestCase):
+
+    def test_tile_bounds(self):
+        extent = tiles.WEB_MERCATOR_EXTENT
+        assert tiles.tile_bounds(0, 0, 0) == (-extent, -extent,
+                                              extent, extent)
+        assert tiles.tile_bounds(1, 0, 0) == (-extent, 0, 0, extent)
+        assert tiles.tile_bounds(1, 1, 1) == (0, -extent, extent, 0)
+
+    def test_is_valid_tile(self):
+        assert tiles.is_valid_tile(0, 0, 0)
+        assert tiles.is_valid_tile(2, 3, 3)
+        assert not tiles.is_valid_tile(2, 4, 0)
+        assert not tiles.is_valid_tile(2, 0, 4)
+        assert not tiles.is_valid_tile(tiles.MAX_ZOOM + 1, 0, 0)
+
+
+class TileTest(UserTestCase, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create()
+        self.location = SpatialUnitFactory.create(
+            project=self.project, geometry='SRID=4326;POINT (10 10)')
+
+    def test_get_tile_etag(self):
+        etag = tiles.get_tile_etag(self.project, 0, 0, 0, 'en')
+        assert tiles.get_tile_etag(self.project, 0, 0, 0, 'en') == etag
+        assert tiles.get_tile_etag(self.project, 0, 0, 0, 'fr') != etag
+        assert tiles.get_tile_etag(self.project, 1, 1, 0, 'en') != etag
+        assert tiles.get_tile_etag(
+            self.project, 0, 0, 0, 'en', exclude=self.location.id) != etag
+
+        self.location.type = 'BU'
+        self.location.save()
+        updated = tiles.get_tile_etag(self.project, 0, 0, 0, 'en')
+        assert updated != etag
+
+        SpatialUnitFactory.create(project=self.project)
+        assert tiles.get_tile_etag(self.project, 0, 0, 0, 'en') != updated
+
+    def test_get_tile_etag_after_queryset_update(self):
+        etag = tiles.get_tile_etag(self.project, 0, 0, 0, 'en')
+        SpatialUnit.objects.filter(id=self.location.id).update(
+            attributes={'notes': 'Notes'})
+        assert tiles.get_tile_etag(self.project, 0, 0, 0, 'en') == etag
+
+        SpatialUnit.objects.filter(id=self.location.id).update(
+            label={'en': 'Label'})
+        assert tiles.get_tile_etag(self.project, 0, 0, 0, 'en') != etag
+
+    def test_get_tile_etag_without_statistics(self):
+        ProjectStatistics.objects.filter(project=self.project).delete()
+        etag = tiles.get_tile_etag(self.project, 0, 0, 0, 'en')
+        SpatialUnitFactory.create(project=self.project)
+        assert tiles.get_tile_etag(self.project, 0, 0, 0, 'en') != etag
+
+    def test_get_tile(self):
+        if not tiles.mvt_supported():
+            self.skipTest('PostGIS does not support ST_AsMVT')
+
+        tile = tiles.get_tile(self.project, 0, 0, 0, 'en')
+        assert tiles.LAYER_NAME.encode() in tile
+        assert self.location.id.encode() in tile
+
+        tile = tiles.get_tile(self.project, 0, 0, 0, 'en',
+                              exclude=self.location.id)
+        assert self.location.id.encode() not in tile
+
+        # The location lies in the north-east quadrant
+        assert tiles.get_tile(self.project, 1, 0, 1, 'en') == b''
@@ -19,3 +19,22 @@ class SpatialUrlTest(TestCase):
         assert resolved.func.__name__ == async.SpatialUnitList.__name__
         assert resolved.kwargs['organization'] == 'habitat'
         assert resolved.kwargs['project'] == '123abc'
+
+    def test_project_spatial_unit_tile(self):
+        actual = reverse('async:spatial:tile',
+                         kwargs={
+                            'organization': 'habitat',
+                            'project': '123abc',
+                            'z': 3, 'x': 4, 'y': 5,
+                         })
+        expected = ('/async/organizations/habitat/projects/123abc/spatial/'
+                    'tiles/3/4/5.mvt')
+        assert actual == expected
+
+        resolved = resolve(expected)
+        assert resolved.func.__name__ == async.SpatialUnitTile.__name__
+        assert resolved.kwargs['organization'] == 'habitat'
+        assert resolved.kwargs['project'] == '123abc'
+        assert resolved.kwargs['z'] == '3'
+        assert resolved.kwargs['x'] == '4'
+        assert resolved.kwargs['y'] == '5'
@@ -1,5 +1,7 @@
 import json
+from unittest.mock import ANY, patch
 
+from django.core.urlresolvers import reverse
 from django.test import TestCase
 
 from tutelary.models import Policy, assign_user_policies
@@ -10,6 +12,7 @@ from core.tests.utils.cases import UserTestCase
 from accounts.tests.factories import UserFactory
 from organization.tests.factories import ProjectFactory
 from organization.models import OrganizationRole
+from .. import tiles
 from ..views import async
 from .factories import SpatialUnitFactory
 
@@ -195,3 +198,82 @@ class SpatialUnitListAPITest(APITestCase, UserTestCase, TestCase):
         self.prj.save()
         response = self.request(user=user)
         assert response.status_code == 200
+
+
+class SpatialUnitTileTest(UserTestCase, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory.create()
+        assign_policies(self.user)
+        self.prj = ProjectFactory.create(slug='test-project', access='public')
+        self.location = SpatialUnitFactory.create(
+            project=self.prj, geometry='SRID=4326;POINT (10 10)')
+
+    def get(self, z=0, x=0, y=0, user=None, **headers):
+        if user is not None:
+            self.client.force_login(user)
+        return self.client.get(reverse('async:spatial:tile', kwargs={
+            'organization': self.prj.organization.slug,
+            'project': self.prj.slug,
+            'z': z, 'x': x, 'y': y,
+        }), **headers)
+
+    def test_get_tile(self):
+        with patch('spatial.tiles.mvt_supported', return_value=True), \
+                patch('spatial.tiles.get_tile', return_value=b'tile') as t:
+            response = self.get(user=self.user)
+        assert response.status_code == 200
+        assert response.content == b'tile'
+        assert response['Content-Type'] == 'application/vnd.mapbox-vector-tile'
+        assert response['ETag']
+        assert 'public' in response['Cache-Control']
+        assert 'max-age=60' in response['Cache-Control']
+        t.assert_called_once_with(self.prj, 0, 0, 0, ANY, exclude=None)
+
+    def test_get_tile_not_modified(self):
+        with patch('spatial.tiles.mvt_supported', return_value=True), \
+                patch('spatial.tiles.get_tile', return_value=b'tile') as t:
+            etag = self.get(user=self.user)['ETag']
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304
+            assert response['ETag'] == etag
+            assert t.call_count == 1
+
+            self.location.type = 'BU'
+            self.location.save()
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200
+            assert response['ETag'] != etag
+
+    def test_get_private_tile(self):
+        self.prj.access = 'private'
+        self.prj.save()
+        with patch('spatial.tiles.mvt_supported', return_value=True), \
+                patch('spatial.tiles.get_tile', return_value=b'tile'):
+            response = self.get(user=self.user)
+        assert response.status_code == 200
+        assert 'private' in response['Cache-Control']
+
+    def test_get_private_tile_with_unauthorized_user(self):
+        self.prj.access = 'private'
+        self.prj.save()
+        with patch('spatial.tiles.mvt_supported', return_value=True):
+            response = self.get()
+        assert response.status_code == 403
+
+    def test_get_invalid_tile(self):
+        response = self.get(z=1, x=2, y=0, user=self.user)
+        assert response.status_code == 404
+
+    def test_get_tile_not_supported(self):
+        with patch('spatial.tiles.mvt_supported', return_value=False):
+            response = self.get(user=self.user)
+        assert response.status_code == 501
+
+    def test_get_tile_from_database(self):
+        if not tiles.mvt_supported():
+            self.skipTest('PostGIS does not support ST_AsMVT')
+        response = self.get(user=self.user)
+        assert response.status_code == 200
+        assert self.location.id.encode() in response.content
@@ -0,0 +1,126 @@
+"""
+Mapbox Vector Tiles of the locations of a project, generated by PostGIS
+(``ST_AsMVT``, available from PostGIS 2.4).
+"""
+import hashlib
+
+from django.db import connection
+from django.db.models import Count, Max
+
+from organization.models import ProjectStatistics
+from questionnaires.models import Questionnaire
+
+# Half the width of the Web Mercator (EPSG:3857) world, in meters
+WEB_MERCATOR_EXTENT = 20037508.342789244
+
+MAX_ZOOM = 22
+LAYER_NAME = 'spatial_units'
+
+# Size of a tile in tile coordinates, and the extra space kept around it
+# so that polygon outlines are not cut at the tile border
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+TILE_SQL = """
+SELECT ST_AsMVT(tile, %(layer)s, %(extent)s, 'geom') FROM (
+  SELECT
+    id,
+    type,
+    CASE jsonb_typeof(label)
+      WHEN 'string' THEN label #>> '{}'
+      WHEN 'object' THEN COALESCE(label ->> %(language)s,
+                                  label ->> %(default_language)s)
+    END AS label,
+    ST_AsMVTGeom(
+      ST_SimplifyPreserveTopology(
+        ST_Transform(geometry::geometry, 3857), %(tolerance)s),
+      ST_MakeEnvelope(%(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 3857),
+      %(extent)s, %(buffer)s, true) AS geom
+  FROM spatial_spatialunit
+  WHERE project_id = %(project_id)s
+    AND id <> %(exclude)s
+    AND geometry && ST_Transform(ST_MakeEnvelope(
+      %(xmin)s - %(margin)s, %(ymin)s - %(margin)s,
+      %(xmax)s + %(margin)s, %(ymax)s + %(margin)s, 3857), 4326)::geography
+) AS tile
+WHERE geom IS NOT NULL
+"""
+
+_mvt_supported = None
+
+
+def mvt_supported():
+    """Returns whether the database can generate vector tiles."""
+    global _mvt_supported
+    if _mvt_supported is None:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT postgis_lib_version()')
+            version = cursor.fetchone()[0]
+        major, minor = (int(v) for v in version.split('.')[:2])
+        _mvt_supported = (major, minor) >= (2, 4)
+    return _mvt_supported
+
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_bounds(z, x, y):
+    """Returns the Web Mercator bounds of tile ``x``, ``y`` at zoom ``z``."""
+    size = 2 * WEB_MERCATOR_EXTENT / 2 ** z
+    xmin = -WEB_MERCATOR_EXTENT + x * size
+    ymax = WEB_MERCATOR_EXTENT - y * size
+    return xmin, ymax - size, xmin + size, ymax
+
+
+def get_tile_etag(project, z, x, y, language, exclude=None):
+    """
+    Returns an ETag for a tile that changes whenever a location of the
+    project is added, updated or removed, or the project's questionnaire
+    (which provides the location labels) is replaced.
+    """
+    version = ProjectStatistics.objects.filter(
+        project_id=project.id).values_list(
+            'locations_version', flat=True).first()
+    if version is None:
+        # The statistics of the project are missing until they are rebuilt
+        state = project.spatial_units.aggregate(
+            count=Count('id'), last_updated=Max('last_updated'))
+        version = '{}:{}'.format(
+            state['count'],
+            state['last_updated'] and state['last_updated'].isoformat())
+    key = ':'.join(str(v) for v in (
+        project.id, project.current_questionnaire, version,
+        z, x, y, language, exclude or ''))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def get_tile(project, z, x, y, language, exclude=None):
+    """
+    Returns tile ``x``, ``y`` at zoom level ``z`` of the locations of
+    ``project`` in Mapbox Vector Tile format. Each feature carries the ID,
+    type and label (in ``language``) of a location. Geometries are
+    simplified to the resolution of the tile.
+    """
+    xmin, ymin, xmax, ymax = tile_bounds(z, x, y)
+    tile_size = xmax - xmin
+
+    default_language = Questionnaire.objects.filter(
+        id=project.current_questionnaire).values_list(
+            'default_language', flat=True).first()
+
+    with connection.cursor() as cursor:
+        cursor.execute(TILE_SQL, {
+            'layer': LAYER_NAME,
+            'extent': TILE_EXTENT,
+            'buffer': TILE_BUFFER,
+            'tolerance': tile_size / TILE_EXTENT,
+            'margin': tile_size * TILE_BUFFER / TILE_EXTENT,
+            'xmin': xmin, 'ymin': ymin, 'xmax': xmax, 'ymax': ymax,
+            'language': language,
+            'default_language': default_language or language,
+            'project_id': project.id,
+            'exclude': exclude or '',
+        })
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile is not None else b''
@@ -8,6 +8,10 @@ urls = [
         r'^$',
         async.SpatialUnitList.as_view(),
         name='list'),
+    url(
+        r'^tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt$',
+        async.SpatialUnitTile.as_view(),
+        name='tile'),
 ]
 
 
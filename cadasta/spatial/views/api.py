@@ -3,6 +3,7 @@ from rest_framework import generics, filters, status
 from rest_framework.response import Response
 from tutelary.mixins import APIPermissionRequiredMixin
 from core.mixins import update_permissions
+from core.pagination import KeysetPagination
 
 from resources.serializers import ResourceSerializer
 from spatial import serializers
@@ -25,6 +26,8 @@ class SpatialUnitList(APIPermissionRequiredMixin,
                        filters.SearchFilter,
                        filters.OrderingFilter,)
     filter_fields = ('type',)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('last_updated', 'id')
 
     permission_required = {
         'GET': get_actions,
@@ -58,6 +61,7 @@ class SpatialUnitResourceList(APIPermissionRequiredMixin,
                               mixins.SpatialUnitResourceMixin,
                               generics.ListCreateAPIView):
     serializer_class = ResourceSerializer
+    pagination_class = KeysetPagination
     filter_backends = (DjangoFilterBackend,
                        filters.SearchFilter,
                        filters.OrderingFilter,)
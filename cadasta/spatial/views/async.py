@@ -1,20 +1,23 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                quote_etag)
+from django.utils.translation import get_language
 from tutelary.mixins import APIPermissionRequiredMixin
 from rest_framework import generics
 from rest_framework_gis.pagination import GeoJsonPagination
 
 from . import mixins
-from .. import serializers
+from .. import serializers, tiles
+from ..exceptions import TilesNotSupported
 
 
 class Paginator(GeoJsonPagination):
     page_size = 250
 
 
-class SpatialUnitList(APIPermissionRequiredMixin,
-                      mixins.SpatialQuerySetMixin,
-                      generics.ListAPIView):
-    pagination_class = Paginator
-    serializer_class = serializers.SpatialUnitGeoJsonSerializer
+class SpatialUnitListPermissionMixin(APIPermissionRequiredMixin,
+                                     mixins.SpatialQuerySetMixin):
 
     def get_actions(self, request):
         if self.get_project().archived:
@@ -28,9 +31,49 @@ class SpatialUnitList(APIPermissionRequiredMixin,
         'GET': get_actions
     }
 
+    def get_perms_objects(self):
+        return [self.get_project()]
+
+
+class SpatialUnitList(SpatialUnitListPermissionMixin,
+                      generics.ListAPIView):
+    pagination_class = Paginator
+    serializer_class = serializers.SpatialUnitGeoJsonSerializer
+
     def get_queryset(self, *args, **kwargs):
         queryset = super().get_queryset(*args, **kwargs)
         return queryset.exclude(id=self.request.GET.get('exclude'))
 
-    def get_perms_objects(self):
-        return [self.get_project()]
+
+class SpatialUnitTile(SpatialUnitListPermissionMixin,
+                      generics.GenericAPIView):
+    """
+    Returns a Mapbox Vector Tile of the project's locations. Tiles can be
+    cached by clients for ``SPATIAL_TILE_MAX_AGE`` seconds and are then
+    revalidated with their ETag.
+    """
+
+    def get(self, request, *args, **kwargs):
+        z, x, y = (int(self.kwargs[k]) for k in ('z', 'x', 'y'))
+        if not tiles.is_valid_tile(z, x, y):
+            raise Http404
+        if not tiles.mvt_supported():
+            raise TilesNotSupported
+
+        project = self.get_project()
+        language = get_language()
+        exclude = request.GET.get('exclude')
+
+        etag = quote_etag(tiles.get_tile_etag(
+            project, z, x, y, language, exclude=exclude))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                tiles.get_tile(project, z, x, y, language, exclude=exclude),
+                content_type='application/vnd.mapbox-vector-tile')
+
+        response['ETag'] = etag
+        visibility = 'public' if project.public() else 'private'
+        patch_cache_control(response, max_age=settings.SPATIAL_TILE_MAX_AGE,
+                            **{visibility: True})
+        return response
@@ -7,7 +7,7 @@ from organization.views import mixins as organization_mixins
 from party.messages import TENURE_REL_CREATE
 from resources.forms import AddResourceFromLibraryForm
 from resources.views import mixins as resource_mixins
-from questionnaires.models import Question, QuestionOption
+from questionnaires.registry import get_registry
 
 from . import mixins
 from .. import messages as error_messages
@@ -81,39 +81,22 @@ class LocationDetail(LoginPermissionRequiredMixin,
         ).select_related('party').defer('party__attributes')
 
         project = context['object']
-        if project.current_questionnaire:
-            try:
-                question = Question.objects.get(
-                    name='location_type',
-                    questionnaire_id=project.current_questionnaire)
+        registry = get_registry(project.current_questionnaire)
+        if registry is not None:
+            if 'location_type' in registry:
                 context['type_labels'] = template_xlang_labels(
-                    question.label_xlat)
-            except Question.DoesNotExist:
-                pass
-            else:
-                try:
-                    option = QuestionOption.objects.get(
-                        question=question,
-                        name=context['location'].type)
+                    registry.get_label_xlat('location_type'))
+                option = registry.get_option_label_xlat(
+                    'location_type', context['location'].type)
+                if option is not None:
                     context['type_choice_labels'] = template_xlang_labels(
-                        option.label_xlat)
-                except QuestionOption.DoesNotExist:
-                    pass
-
-            try:
-                tenure_type = Question.objects.get(
-                    name='tenure_type',
-                    questionnaire_id=project.current_questionnaire)
-                tenure_opts = QuestionOption.objects.filter(
-                    question=tenure_type)
-                tenure_opts = dict(tenure_opts.values_list(
-                    'name', 'label_xlat'))
+                        option)
 
+            if 'tenure_type' in registry:
+                tenure_opts = registry.get_options('tenure_type')
                 for rel in context['relationships']:
                     rel.type_labels = template_xlang_labels(
                         tenure_opts.get(rel.tenure_type))
-            except Question.DoesNotExist:
-                pass
 
         location = context['location']
         user = self.request.user
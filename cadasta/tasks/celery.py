@@ -2,6 +2,7 @@ from celery import Celery
 from django.conf import settings
 import logging
 
+from cadasta.workertoolbox import DEFAULT_QUEUES
 from cadasta.workertoolbox.conf import Config
 from cadasta.workertoolbox.setup import setup_app
 
@@ -27,6 +28,8 @@ def get_app(conf):
 conf = Config(
     broker_transport=settings.CELERY_BROKER_TRANSPORT,
     QUEUE_PREFIX=settings.CELERY_QUEUE_PREFIX,
+    QUEUES=DEFAULT_QUEUES + ('resources', 'xforms'),
+    imports=('resources.tasks', 'xforms.tasks'),
     SETUP_SENTRY_LOGGING=False,
     SETUP_FILE_LOGGING=False,
 )
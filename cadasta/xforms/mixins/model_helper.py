@@ -1,3 +1,8 @@
+import uuid
+from xml.etree.ElementTree import ParseError
+from xml.parsers.expat import ExpatError
+
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.core.files.storage import get_storage_class
 from django.contrib.gis.geos import GEOSGeometry
@@ -5,22 +10,23 @@ from django.contrib.gis.db import models as geo_models
 from django.db.models.functions import Cast
 from django.db import transaction
 from django.utils.translation import ugettext as _
-from jsonattrs.models import Attribute, AttributeType
-from tutelary.models import Policy
+from jsonattrs.models import Attribute
+from accounts.permissions import get_policy
+from organization.importers.batch import ModelBatch
 from party.models import Party, TenureRelationship
 from pyxform.xform2json import XFormToDict
 from questionnaires.models import Questionnaire, Question
 from resources.models import Resource
 from spatial.models import SpatialUnit
 from xforms.exceptions import InvalidXMLSubmission
-from xforms.models import XFormSubmission
+from xforms.models import XFormSubmission, get_select_multiple_cache_key
 from xforms.utils import odk_geom_to_wkt
 from core.messages import SANITIZE_ERROR
-from core.validators import sanitize_string
+from core.validators import sanitize_strings
 
 
 def get_policy_instance(policy_name, variables=None):
-    return (Policy.objects.get(name=policy_name), variables)
+    return (get_policy(policy_name), variables)
 
 
 class ModelHelper():
@@ -64,15 +70,24 @@ class ModelHelper():
         if project.current_questionnaire != questionnaire.id:
             raise InvalidXMLSubmission(_('Form out of date'))
 
+        # All records of the submission are written together once they
+        # have been validated
+        batch = ModelBatch(project, batch_size=None, history_user=user)
+        select_multiple = self.get_select_multiple_questions(questionnaire)
+
         parties, party_resources = self.create_party(
             data=data,
-            project=project
+            project=project,
+            batch=batch,
+            select_multiple=select_multiple
         )
 
         locations, location_resources = self.create_spatial_unit(
             data=data,
             project=project,
-            party=parties
+            party=parties,
+            batch=batch,
+            select_multiple=select_multiple
         )
 
         (tenure_relationships,
@@ -80,9 +95,13 @@ class ModelHelper():
             data=data,
             project=project,
             parties=parties,
-            locations=locations
+            locations=locations,
+            batch=batch,
+            select_multiple=select_multiple
         )
 
+        self._save_batch(batch, locations)
+
         return (questionnaire,
                 parties, party_resources,
                 locations, location_resources,
@@ -97,37 +116,46 @@ class ModelHelper():
             return None
 
         previous_submission = previous_submission[0]
+        select_multiple = self.get_select_multiple_questions(questionnaire)
 
         party_objects, party_resources = self.create_party(
             data=data,
             project=questionnaire.project,
-            duplicate=previous_submission)
+            duplicate=previous_submission,
+            select_multiple=select_multiple)
 
         location_objects, location_resources = self.create_spatial_unit(
             data=data,
             project=questionnaire.project,
-            duplicate=previous_submission)
+            duplicate=previous_submission,
+            select_multiple=select_multiple)
 
         tenure_objects, tenure_resources = self.create_tenure_relationship(
             data=data,
             project=questionnaire.project,
             parties=party_objects,
             locations=location_objects,
-            duplicate=previous_submission)
+            duplicate=previous_submission,
+            select_multiple=select_multiple)
 
         return (questionnaire,
                 party_objects, party_resources,
                 location_objects, location_resources,
                 tenure_objects, tenure_resources)
 
-    def create_party(self, data, project, duplicate=None):
+    def create_party(self, data, project, duplicate=None, batch=None,
+                     select_multiple=None):
         party_objects = []
         party_resources = []
+        save = batch is None and not duplicate
+        if save:
+            batch = ModelBatch(project, batch_size=None)
 
         if duplicate:
             get_or_create_party = duplicate.parties.get
         else:
-            get_or_create_party = Party.objects.create
+            def get_or_create_party(**fields):
+                return batch.add(Party, fields)
 
         try:
             party_groups = self._format_repeat(data, ['party'])
@@ -136,7 +164,8 @@ class ModelHelper():
                     project=project,
                     name=group['party_name'],
                     type=group['party_type'],
-                    attributes=self._get_attributes(group, 'party')
+                    attributes=self._get_attributes(group, 'party',
+                                                    select_multiple)
                 )
 
                 party_resources.append(
@@ -144,15 +173,21 @@ class ModelHelper():
                 )
                 party_objects.append(party)
 
+            if save:
+                self._save_batch(batch)
+
         except Exception as e:
             raise InvalidXMLSubmission(_(
                 "Party error: {}".format(e)))
         return party_objects, party_resources
 
-    def create_spatial_unit(self, data, project,
-                            party=None, duplicate=None):
+    def create_spatial_unit(self, data, project, party=None, duplicate=None,
+                            batch=None, select_multiple=None):
         location_resources = []
         location_objects = []
+        save = batch is None and not duplicate
+        if save:
+            batch = ModelBatch(project, batch_size=None)
 
         try:
             location_group = self._format_repeat(data, ['location'])
@@ -163,7 +198,8 @@ class ModelHelper():
                 attrs = dict(
                     project=project,
                     type=group['location_type'],
-                    attributes=self._get_attributes(group, 'location')
+                    attributes=self._get_attributes(group, 'location',
+                                                    select_multiple)
                 )
 
                 if duplicate:
@@ -174,28 +210,36 @@ class ModelHelper():
                         geom=Cast('geometry', GeometryField())
                     ).get(geom=geom, **attrs)
                 else:
-                    location = SpatialUnit.objects.create(geometry=geom,
-                                                          **attrs)
+                    location = batch.add(SpatialUnit,
+                                         dict(geometry=geom, **attrs))
 
                 location_resources.append(
                     self._get_resource_names(group, location, 'location')
                 )
                 location_objects.append(location)
 
+            if save:
+                self._save_batch(batch, location_objects)
+
         except Exception as e:
             raise InvalidXMLSubmission(_(
                 'Location error: {}'.format(e)))
         return location_objects, location_resources
 
     def create_tenure_relationship(self, data, parties, locations, project,
-                                   duplicate=None):
+                                   duplicate=None, batch=None,
+                                   select_multiple=None):
         tenure_resources = []
         tenure_objects = []
+        save = batch is None and not duplicate
+        if save:
+            batch = ModelBatch(project, batch_size=None)
 
         if duplicate:
             get_or_create_tenure_rels = duplicate.tenure_relationships.get
         else:
-            get_or_create_tenure_rels = TenureRelationship.objects.create
+            def get_or_create_tenure_rels(**fields):
+                return batch.add(TenureRelationship, fields)
 
         try:
             if data.get('tenure_type'):
@@ -218,7 +262,8 @@ class ModelHelper():
                         tenure_type=tenure_group[t]['tenure_type'],
                         attributes=self._get_attributes(
                             tenure_group[t],
-                            'tenure_relationship')
+                            'tenure_relationship',
+                            select_multiple)
                     )
                     tenure_objects.append(tenure)
                     tenure_resources.append(
@@ -226,11 +271,43 @@ class ModelHelper():
                             tenure_group[t], tenure, 'tenure')
                     )
 
+            if save:
+                self._save_batch(batch)
+
         except Exception as e:
             raise InvalidXMLSubmission(_(
                 "Tenure relationship error: {}".format(e)))
         return tenure_objects, tenure_resources
 
+    def _save_batch(self, batch, locations=()):
+        batch.flush()
+
+        # Areas are calculated by the database when locations are inserted
+        polygons = [location for location in locations
+                    if location.geometry and
+                    location.geometry.geom_type in ('Polygon',
+                                                    'MultiPolygon')]
+        if polygons:
+            areas = dict(SpatialUnit.objects.filter(
+                id__in=[location.id for location in polygons]
+            ).values_list('id', 'area'))
+            for location in polygons:
+                location.area = areas[location.id]
+
+    def get_select_multiple_questions(self, questionnaire):
+        """
+        Returns the names of the questionnaire's select_multiple questions,
+        whose answers are stored as lists.
+        """
+        key = get_select_multiple_cache_key(questionnaire.id)
+        names = cache.get(key)
+        if names is None:
+            names = frozenset(Question.objects.filter(
+                questionnaire=questionnaire, type='SM'
+            ).values_list('name', flat=True))
+            cache.set(key, names)
+        return names
+
     def create_resource(self, data, user, project, content_object=None):
         Storage = get_storage_class()
         file = data.file.read()
@@ -260,12 +337,19 @@ class ModelHelper():
             raise InvalidXMLSubmission(_("{}".format(e)))
 
     def sanitize_submission(self, submission, sanitizable_questions):
+        sanitizable_questions = set(sanitizable_questions)
+        values = self._get_sanitizable_values(submission,
+                                              sanitizable_questions)
+        if not sanitize_strings(values):
+            raise InvalidXMLSubmission(SANITIZE_ERROR)
+
+    def _get_sanitizable_values(self, submission, sanitizable_questions):
         for key, value in submission.items():
             if isinstance(value, dict):
-                self.sanitize_submission(value, sanitizable_questions)
-
-            elif key in sanitizable_questions and not sanitize_string(value):
-                raise InvalidXMLSubmission(SANITIZE_ERROR)
+                yield from self._get_sanitizable_values(
+                    value, sanitizable_questions)
+            elif key in sanitizable_questions:
+                yield value
 
     def get_sanitizable_questions(self, id_string, version):
         return Question.objects.filter(
@@ -278,6 +362,22 @@ class ModelHelper():
             raise InvalidXMLSubmission(_('XML submission not found'))
 
         xml_submission_file = request.data['xml_submission_file'].read()
+        files = request.FILES
+        files.pop('xml_submission_file')
+        return self.upload_submission(xml_submission_file, files,
+                                      request.user)
+
+    def get_instance_id(self, xml_submission_file):
+        try:
+            full_submission = XFormToDict(
+                xml_submission_file.decode('utf-8')).get_dict()
+            submission = full_submission[list(full_submission.keys())[0]]
+            return str(uuid.UUID(submission['meta']['instanceID']))
+        except (ExpatError, IndexError, KeyError, ParseError, TypeError,
+                ValueError):
+            raise InvalidXMLSubmission(_('Invalid XML submission'))
+
+    def upload_submission(self, xml_submission_file, files, user):
         full_submission = XFormToDict(
             xml_submission_file.decode('utf-8')).get_dict()
 
@@ -292,7 +392,7 @@ class ModelHelper():
              parties, party_resources,
              locations, location_resources,
              tenure_relationships, tenure_resources
-             ) = self.create_models(submission, request.user)
+             ) = self.create_models(submission, user)
 
             party_resource_files = []
             for party in party_resources:
@@ -308,6 +408,9 @@ class ModelHelper():
 
             resource_data = {
                 'project': questionnaire.project,
+                'instances': {
+                    instance.id: instance for instance in
+                    parties + locations + tenure_relationships},
                 'location_resources': location_resource_files,
                 'locations': location_resources,
                 'party_resources': party_resource_files,
@@ -315,7 +418,7 @@ class ModelHelper():
                 'tenure_resources': tenure_resource_files,
                 'tenures': tenure_resources,
             }
-            self.upload_resource_files(request, resource_data)
+            self.upload_resource_files(files, user, resource_data)
 
         if XFormSubmission.objects.filter(
                 instanceID=submission['meta']['instanceID']).exists():
@@ -324,16 +427,21 @@ class ModelHelper():
 
         xform_submission = XFormSubmission(
             json_submission=full_submission,
-            user=request.user,
+            user=user,
             questionnaire=questionnaire,
             instanceID=submission['meta']['instanceID']
             )
         return xform_submission, parties, locations, tenure_relationships
 
-    def upload_resource_files(self, request, data):
-        user = request.user
-        files = request.FILES
-        files.pop('xml_submission_file')
+    def save_submission(self, xform_submission, parties, locations,
+                        tenure_relationships):
+        xform_submission.save()
+        xform_submission.parties.add(*parties)
+        xform_submission.spatial_units.add(*locations)
+        xform_submission.tenure_relationships.add(*tenure_relationships)
+        return xform_submission
+
+    def upload_resource_files(self, files, user, data):
         project = data['project']
         for file_name in files:
             args = [data, user, project, files, file_name]
@@ -379,10 +487,12 @@ class ModelHelper():
 
     def _format_create_resource(self, data, user,  project, files, file_name,
                                 model_type, model):
+        instances = data.get('instances', {})
         for obj in data[model_type]:
             if file_name in obj['resources']:
-                content_object = model.objects.get(
-                    id=obj['id'])
+                content_object = instances.get(obj['id'])
+                if content_object is None:
+                    content_object = model.objects.get(id=obj['id'])
                 self.create_resource(data=files[file_name],
                                      user=user,
                                      project=project,
@@ -397,8 +507,8 @@ class ModelHelper():
         except Questionnaire.DoesNotExist:
             raise InvalidXMLSubmission(_('Questionnaire not found.'))
 
-    def _get_attributes(self, data, model_type):
-        attributes = {}
+    def _get_attributes(self, data, model_type, select_multiple=None):
+        answers = {}
         for attr_group in data:
             if '{model}_attributes'.format(model=model_type) in attr_group:
                 for item in data[attr_group]:
@@ -408,14 +518,20 @@ class ModelHelper():
                            for model_type in ('tenure', 'location', 'party')):
                         continue
 
-                    if Attribute.objects.filter(
-                        name=item,
-                        attr_type=AttributeType.objects.get(
-                            name='select_multiple')).exists():
-                        answers = data[attr_group][item].split(' ')
-                        attributes[item] = answers
-                    else:
-                        attributes[item] = data[attr_group][item]
+                    answers[item] = data[attr_group][item]
+
+        if select_multiple is None:
+            select_multiple = set(Attribute.objects.filter(
+                name__in=answers.keys(),
+                attr_type__name='select_multiple'
+            ).values_list('name', flat=True))
+
+        attributes = {}
+        for item, answer in answers.items():
+            if item in select_multiple:
+                attributes[item] = answer.split(' ')
+            else:
+                attributes[item] = answer
         return attributes
 
     def _get_resource_names(self, data, model, model_type):
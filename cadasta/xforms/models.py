@@ -1,10 +1,17 @@
+import hashlib
 import json
+import time
 import uuid
+from django.core.cache import cache
 from django.db import models
+from django.dispatch import receiver
 from django.contrib.postgres.fields import JSONField
 from core.models import RandomIDModel
-from questionnaires.models import Questionnaire
+from questionnaires.models import (Questionnaire, QuestionGroup, Question,
+                                   QuestionOption)
 from accounts.models import User
+from organization.models import Organization, OrganizationRole, Project
+from tutelary.models import PermissionSet
 from spatial.models import SpatialUnit
 from party.models import Party, TenureRelationship
 
@@ -50,3 +57,95 @@ class XFormSubmission(RandomIDModel):
                          parties=list(self.parties.all()),
                          tenure_relationships=list(
                             self.tenure_relationships.all()))
+
+
+def get_xform_cache_key(questionnaire_id):
+    return 'xforms:xform:{}'.format(questionnaire_id)
+
+
+def get_select_multiple_cache_key(questionnaire_id):
+    return 'xforms:select_multiple:{}'.format(questionnaire_id)
+
+
+def invalidate_questionnaire_cache(questionnaire_id):
+    cache.delete_many([get_xform_cache_key(questionnaire_id),
+                       get_select_multiple_cache_key(questionnaire_id)])
+
+
+@receiver(models.signals.post_save, sender=Questionnaire)
+@receiver(models.signals.post_delete, sender=Questionnaire)
+def invalidate_xform_cache(sender, instance, **kwargs):
+    invalidate_questionnaire_cache(instance.id)
+
+
+@receiver(models.signals.post_save, sender=QuestionGroup)
+@receiver(models.signals.post_delete, sender=QuestionGroup)
+@receiver(models.signals.post_save, sender=Question)
+@receiver(models.signals.post_delete, sender=Question)
+def invalidate_question_xform_cache(sender, instance, **kwargs):
+    invalidate_questionnaire_cache(instance.questionnaire_id)
+
+
+@receiver(models.signals.post_save, sender=QuestionOption)
+@receiver(models.signals.post_delete, sender=QuestionOption)
+def invalidate_option_xform_cache(sender, instance, **kwargs):
+    invalidate_questionnaire_cache(instance.question.questionnaire_id)
+
+
+FORM_LIST_MODIFIED_KEY = 'xforms:form_list:modified'
+
+
+def get_form_list_cache_key(user_id, base_url):
+    return 'xforms:form_list:{}:{}'.format(
+        user_id, hashlib.md5(base_url.encode()).hexdigest())
+
+
+def get_form_list_modified(user_id):
+    """
+    Returns the time, in whole seconds, of the last change that may have
+    changed the form list of a user.
+    """
+    user_key = '{}:{}'.format(FORM_LIST_MODIFIED_KEY, user_id)
+    modified = cache.get_many([FORM_LIST_MODIFIED_KEY, user_key])
+    return max(modified.get(FORM_LIST_MODIFIED_KEY) or touch_form_list(),
+               modified.get(user_key) or touch_form_list(user_id))
+
+
+def touch_form_list(user_id=None):
+    """
+    Marks the form list of a user, or of all users if ``user_id`` is not
+    given, as modified now. Modification times always move forward by at
+    least one second so that clients never miss a change.
+    """
+    key = FORM_LIST_MODIFIED_KEY
+    if user_id is not None:
+        key = '{}:{}'.format(key, user_id)
+    modified = max(int(time.time()), (cache.get(key) or 0) + 1)
+    cache.set(key, modified, None)
+    return modified
+
+
+@receiver(models.signals.post_save, sender=Questionnaire)
+@receiver(models.signals.post_delete, sender=Questionnaire)
+@receiver(models.signals.post_save, sender=Project)
+@receiver(models.signals.post_delete, sender=Project)
+@receiver(models.signals.post_save, sender=Organization)
+@receiver(models.signals.post_delete, sender=Organization)
+def touch_form_lists(sender, instance, **kwargs):
+    touch_form_list()
+
+
+@receiver(models.signals.post_save, sender=OrganizationRole)
+@receiver(models.signals.post_delete, sender=OrganizationRole)
+def touch_member_form_list(sender, instance, **kwargs):
+    touch_form_list(instance.user_id)
+
+
+@receiver(models.signals.m2m_changed, sender=PermissionSet.users.through)
+def touch_policy_form_list(sender, instance, action, pk_set, **kwargs):
+    # Superusers are sent all forms
+    if action not in ('post_add', 'post_remove'):
+        return
+    user_ids = pk_set if isinstance(instance, PermissionSet) else [instance.pk]
+    for user_id in user_ids:
+        touch_form_list(user_id)
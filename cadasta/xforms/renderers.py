@@ -11,6 +11,7 @@ from questionnaires.managers import fix_languages
 from questionnaires.choices import QUESTION_TYPES
 
 QUESTION_TYPES = dict(QUESTION_TYPES)
+XFORMS_NS = {'xf': 'http://www.w3.org/2002/xforms'}
 
 
 class XFormListRenderer(renderers.BaseRenderer):
@@ -29,10 +30,11 @@ class XFormListRenderer(renderers.BaseRenderer):
         """
         Renders *obj* into serialized XML.
         """
-        # if data is None:
-        #     return ''
-        # elif isinstance(data, six.string_types):
-        #     return data
+        # Empty and already rendered form lists, see XFormListView
+        if data is None:
+            return ''
+        elif isinstance(data, six.string_types):
+            return data
 
         stream = StringIO()
 
@@ -142,39 +144,48 @@ class XFormRenderer(BaseRenderer):
         return json
 
     def insert_version_attribute(self, xform, root_node, version):
-        ns = {'xf': 'http://www.w3.org/2002/xforms'}
         root = etree.fromstring(xform)
+        self._insert_version_attribute(root, root_node, version)
+        return self._tostring(root)
+
+    def insert_uuid_bind(self, xform, id_string):
+        root = etree.fromstring(xform)
+        self._insert_uuid_bind(root, id_string)
+        return self._tostring(root)
+
+    def _insert_version_attribute(self, root, root_node, version):
         inst = root.find(
             './/xf:instance/xf:{root_node}'.format(
                 root_node=root_node
-            ), namespaces=ns
+            ), namespaces=XFORMS_NS
         )
         inst.set('version', str(version))
-        xml = etree.tostring(
-            root, method='xml', encoding='utf-8', pretty_print=True
-        )
-        return xml
 
-    def insert_uuid_bind(self, xform, id_string):
-        ns = {'xf': 'http://www.w3.org/2002/xforms'}
-        root = etree.fromstring(xform)
-        model = root.find('.//xf:model', namespaces=ns)
+    def _insert_uuid_bind(self, root, id_string):
+        model = root.find('.//xf:model', namespaces=XFORMS_NS)
         etree.SubElement(model, 'bind', {
             'calculate': "concat('uuid:', uuid())",
             'nodeset': '/{}/meta/instanceID'.format(id_string),
             'readonly': 'true()',
             'type': 'string'
         })
-        xml = etree.tostring(
+
+    def _tostring(self, root):
+        return etree.tostring(
             root, method='xml', encoding='utf-8', pretty_print=True
         )
-        return xml
 
     def render(self, data, *args, **kwargs):
         charset = 'utf-8'
         root_node = 'xforms'
         xmlns = "http://openrosa.org/xforms/xformsList"
 
+        # Empty and already rendered forms, see XFormDownloadView
+        if data is None:
+            return b''
+        if isinstance(data, bytes):
+            return data
+
         if 'detail' in data.keys():
             stream = StringIO()
 
@@ -197,9 +208,10 @@ class XFormRenderer(BaseRenderer):
             fix_languages(xml)
             xml = xml.toxml()
 
-            xml = self.insert_version_attribute(xml,
-                                                data.get('id_string'),
-                                                data.get('version'))
-            xml = self.insert_uuid_bind(xml, data.get('id_string'))
+            root = etree.fromstring(xml)
+            self._insert_version_attribute(root,
+                                           data.get('id_string'),
+                                           data.get('version'))
+            self._insert_uuid_bind(root, data.get('id_string'))
 
-            return xml
+            return self._tostring(root)
@@ -0,0 +1,138 @@
+import logging
+import os
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import get_storage_class
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+
+from core import breakers
+from tasks.celery import app
+from .exceptions import InvalidXMLSubmission
+from .mixins.model_helper import ModelHelper
+from .models import XFormSubmission
+
+logger = logging.getLogger(__name__)
+
+STAGING_DIR = 'xform-submissions/'
+
+# Failed submissions are retried MAX_RETRIES times, RETRY_DELAY seconds
+# apart, unless the submission itself is invalid
+MAX_RETRIES = 5
+RETRY_DELAY = 60
+
+
+@app.task(name='xforms.process_submission', bind=True,
+          max_retries=MAX_RETRIES, default_retry_delay=RETRY_DELAY)
+def process_submission(self, user_id, xml_submission_file, files):
+    """
+    Creates the records of a submission that was queued by
+    ``queue_submission``, and removes its staged files.
+
+    A submission is processed in one transaction, holding a lock on its
+    instanceID, so copies of a submission that are processed at the same
+    time or retried only create its records once. Invalid submissions are
+    dropped. Other failures are retried; the staged files of a submission
+    that still fails are kept in ``STAGING_DIR`` so that it can be queued
+    again.
+    """
+    keys = [xml_submission_file] + [f['key'] for f in files]
+    storage = get_storage_class()()
+    try:
+        submission_id = create_submission(
+            storage, user_id, xml_submission_file, files)
+    except (InvalidXMLSubmission, PermissionDenied):
+        logger.exception("Dropped invalid submission %s.",
+                         xml_submission_file)
+        delete_staged_files(storage, keys)
+        raise
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            logger.exception("Failed to process submission %s.",
+                             xml_submission_file)
+        raise self.retry(exc=exc)
+
+    delete_staged_files(storage, keys)
+    return submission_id
+
+
+def create_submission(storage, user_id, xml_submission_file, files):
+    user = get_user_model().objects.get(id=user_id)
+    xml = read_staged_file(storage, xml_submission_file)
+    uploads = {
+        f['field']: SimpleUploadedFile(
+            f['name'], read_staged_file(storage, f['key']),
+            f['content_type'])
+        for f in files
+    }
+
+    helper = ModelHelper()
+    instance_id = helper.get_instance_id(xml)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))',
+                           ['xforms.submission:{}'.format(instance_id)])
+        submission = XFormSubmission.objects.filter(
+            instanceID=instance_id).first()
+        if submission is None:
+            instance = helper.upload_submission(xml, uploads, user)
+            if not isinstance(instance, tuple):
+                submission = instance
+            else:
+                submission = helper.save_submission(*instance)
+    return submission.id
+
+
+def delete_staged_files(storage, keys):
+    for key in keys:
+        storage.delete(key)
+
+
+def queue_submission(xml_submission_file, files, user):
+    """
+    Stores an ODK submission and its attached files, and schedules
+    ``process_submission`` to create its records. The stored files are
+    removed again if the task cannot be scheduled.
+    """
+    storage = get_storage_class()()
+    xml_key = stage_file(storage, xml_submission_file)
+    staged = [{
+        'field': field,
+        'key': stage_file(storage, files[field]),
+        'name': files[field].name,
+        'content_type': files[field].content_type,
+    } for field in files]
+
+    try:
+        return process_submission.apply_async(
+            kwargs={
+                'user_id': user.id,
+                'xml_submission_file': xml_key,
+                'files': staged,
+            },
+            creator_id=user.id,
+        )
+    except breakers.celery.expected_errors:
+        delete_staged_files(storage, [xml_key] + [f['key'] for f in staged])
+        raise
+
+
+def stage_file(storage, file):
+    # Keys are unique file names, because storages download files to a
+    # shared directory by name
+    key = STAGING_DIR + uuid.uuid4().hex
+    file.seek(0)
+    storage.save(key, file.read())
+    file.seek(0)
+    return key
+
+
+def read_staged_file(storage, key):
+    path = storage.open(key)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
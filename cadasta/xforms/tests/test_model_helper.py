@@ -2,7 +2,9 @@ import os
 import io
 import pytest
 from django.conf import settings
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import PermissionDenied
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.contrib.contenttypes.models import ContentType
@@ -279,6 +281,60 @@ class XFormModelHelperTest(TestCase):
         assert tenure_resources[0]['id'] == tenure.id
         assert 'resource_three.png' in tenure_resources[0]['resources']
 
+    def test_create_models_query_budget(self):
+        def submission(instance_id, count):
+            return {
+                'id': 'a1',
+                'meta': {'instanceID': instance_id},
+                'version': str(self.questionnaire.version),
+                'party_repeat': [{
+                    'party_name': 'Party {}'.format(i),
+                    'party_type': 'IN',
+                    'party_attributes_individual': {'fname_two': 'socks'},
+                } for i in range(count)],
+                'location_type': 'BU',
+                'location_geometry': geoshape,
+                'location_attributes': {'fname_two': 'Location One'},
+                'tenure_type': 'CO',
+                'tenure_relationship_attributes': {'fname_two': 'Tenure'},
+            }
+
+        mh.create_models(mh(), submission('uuid:1', 1), self.user)
+        with CaptureQueriesContext(connection) as one_party:
+            mh.create_models(mh(), submission('uuid:2', 1), self.user)
+        with CaptureQueriesContext(connection) as five_parties:
+            (_, parties, _, locations, _,
+             tenure_relationships, _) = mh.create_models(
+                mh(), submission('uuid:3', 5), self.user)
+
+        assert len(five_parties) == len(one_party)
+        assert len(parties) == 5
+        assert len(tenure_relationships) == 5
+        assert Party.objects.count() == 7
+        assert locations[0].area == SpatialUnit.objects.get(
+            id=locations[0].id).area
+        assert locations[0].area > 0
+
+    @override_settings(CACHES=dict(
+        settings.CACHES,
+        default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    ))
+    def test_get_select_multiple_questions(self):
+        QuestionFactory.create(name='colors', type='SM',
+                               questionnaire=self.questionnaire)
+        QuestionFactory.create(name='color', type='S1',
+                               questionnaire=self.questionnaire)
+        assert mh().get_select_multiple_questions(
+            self.questionnaire) == {'colors'}
+        with self.assertNumQueries(0):
+            assert mh().get_select_multiple_questions(
+                self.questionnaire) == {'colors'}
+
+        QuestionFactory.create(name='sizes', type='SM',
+                               questionnaire=self.questionnaire)
+        assert mh().get_select_multiple_questions(
+            self.questionnaire) == {'colors', 'sizes'}
+
     def test_check_for_duplicate_submission(self):
         geoshape = ('45.56342779158167 -122.67650283873081 0.0 0.0;'
                     '45.56176327330353 -122.67669159919024 0.0 0.0;'
@@ -1447,6 +1503,17 @@ class XFormModelHelperTest(TestCase):
         assert 'party_name' not in attributes
         assert 'party_type' not in attributes
 
+    def test_get_attributes_select_multiple(self):
+        data = {
+            'party_attributes_individual': {
+                'colors': 'red blue',
+                'notes': 'red blue',
+            },
+        }
+        attributes = mh._get_attributes(self, data, 'party', {'colors'})
+        assert attributes == {'colors': ['red', 'blue'],
+                              'notes': 'red blue'}
+
     def test_get_resource_names(self):
         data = {
             'party_type': 'Party Type',
@@ -1,11 +1,19 @@
 import json
 import io
+from unittest.mock import MagicMock, patch
 
 import pytest
+from kombu.exceptions import OperationalError
 from lxml import etree
 
+from django.conf import settings
 from django.test import TestCase
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.http import http_date
+from django.core.files.storage import get_storage_class
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from skivvy import APITestCase
 from tutelary.models import Policy
@@ -25,8 +33,11 @@ from resources.models import Resource
 from spatial.models import SpatialUnit
 from tutelary.models import Role
 from xforms.tests.files.test_resources import responses
-from xforms.models import XFormSubmission
+from xforms.models import (XFormSubmission, get_xform_cache_key,
+                           get_form_list_modified)
 
+from .. import tasks
+from ..exceptions import InvalidXMLSubmission
 from ..views import api
 from .attr_schemas import (default_party_xform_group,
                            individual_party_xform_group, location_xform_group,
@@ -115,6 +126,76 @@ class XFormListTest(APITestCase, UserTestCase, FileStorageTestCase, TestCase):
         assert 'downloadUrl' not in response
         assert 'hash' not in response
 
+    def test_get_xforms_in_one_query(self):
+        OrganizationRole.objects.create(
+            organization=self.org, user=self.user, admin=False)
+        self._get_questionnaire()
+        with CaptureQueriesContext(connection) as one_project:
+            self.request(user=self.user)
+
+        for _ in range(3):
+            org = OrganizationFactory.create()
+            OrganizationRole.objects.create(organization=org, user=self.user)
+            project = ProjectFactory.create(organization=org)
+            QuestionnaireFactory.create(project=project)
+        with CaptureQueriesContext(connection) as four_projects:
+            response = self.request(user=self.user)
+
+        xml = etree.fromstring(response.content.encode('utf-8'))
+        ns = {'xf': 'http://openrosa.org/xforms/xformsList'}
+        assert len(xml.xpath('.//xf:xform', namespaces=ns)) == 4
+        assert len(four_projects) <= len(one_project)
+
+    @override_settings(CACHES=dict(
+        settings.CACHES,
+        default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    ))
+    def test_get_cached_xforms(self):
+        OrganizationRole.objects.create(
+            organization=self.org, user=self.user, admin=True)
+        questionnaire = self._get_questionnaire()
+        self.request(user=self.user)
+
+        with self.assertNumQueries(0):
+            response = self.request(user=self.user)
+        assert questionnaire.md5_hash in response.content
+
+        questionnaire = self._get_questionnaire(id='form_2')
+        response = self.request(user=self.user)
+        assert questionnaire.md5_hash in response.content
+
+    def test_get_xforms_after_role_change(self):
+        self._get_questionnaire()
+        response = self.request(user=self.user)
+        assert 'formID' not in response.content
+
+        OrganizationRole.objects.create(
+            organization=self.org, user=self.user, admin=False)
+        response = self.request(user=self.user)
+        assert 'formID' in response.content
+
+    def test_get_xforms_not_modified(self):
+        OrganizationRole.objects.create(
+            organization=self.org, user=self.user, admin=True)
+        self._get_questionnaire()
+        response = self.request(user=self.user)
+        last_modified = response.headers['last-modified'][1]
+        assert last_modified == http_date(
+            get_form_list_modified(self.user.id))
+
+        response = self.request(
+            user=self.user,
+            request_meta={'HTTP_IF_MODIFIED_SINCE': last_modified})
+        assert response.status_code == 304
+        assert response.content == ''
+
+        self._get_questionnaire(id='form_2')
+        response = self.request(
+            user=self.user,
+            request_meta={'HTTP_IF_MODIFIED_SINCE': last_modified})
+        assert response.status_code == 200
+        assert 'form_2' in response.content
+
 
 class XFormSubmissionTest(APITestCase, UserTestCase, FileStorageTestCase,
                           TestCase):
@@ -856,6 +937,148 @@ class XFormSubmissionTest(APITestCase, UserTestCase, FileStorageTestCase,
         xfsubmission = XFormSubmission.objects.get(user=self.user)
         assert xfsubmission.questionnaire == questionnaire
 
+    @override_settings(XFORM_ASYNC_SUBMISSIONS=True)
+    @patch('xforms.tasks.process_submission.apply_async')
+    def test_queue_submission(self, apply_async):
+        questionnaire = self._create_questionnaire('t_questionnaire', 0)
+        data = self._submission(form='submission',
+                                image=['test_image_one',
+                                       'test_image_two',
+                                       'test_image_three'],
+                                audio=['test_audio_one'])
+
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 202
+        assert Party.objects.count() == 0
+        assert XFormSubmission.objects.count() == 0
+
+        assert apply_async.call_count == 1
+        kwargs = apply_async.call_args[1]
+        assert kwargs['creator_id'] == self.user.id
+        task_kwargs = kwargs['kwargs']
+        assert task_kwargs['user_id'] == self.user.id
+        assert sorted(f['name'] for f in task_kwargs['files']) == [
+            'test_audio_one.mp3', 'test_image_one.png',
+            'test_image_two.png', 'test_image_three.png']
+
+        # The worker creates the records of the submission
+        tasks.process_submission(**task_kwargs)
+        party = Party.objects.get(name='Bilbo Baggins')
+        tenure = TenureRelationship.objects.get(party=party)
+        self._test_resource('test_image_one', tenure.spatial_unit)
+        self._test_resource('test_image_two', party)
+        self._test_resource('test_audio_one', party)
+        self._test_resource('test_image_three', tenure)
+        xfsubmission = XFormSubmission.objects.get(user=self.user)
+        assert xfsubmission.questionnaire == questionnaire
+        assert list(xfsubmission.parties.all()) == [party]
+
+        storage = get_storage_class()()
+        assert not storage.exists(task_kwargs['xml_submission_file'])
+        assert not any(storage.exists(f['key'])
+                       for f in task_kwargs['files'])
+
+        # Submitting the same form again does not create new records
+        data = self._submission(form='submission')
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 202
+        tasks.process_submission(**apply_async.call_args[1]['kwargs'])
+        assert Party.objects.count() == 1
+        assert XFormSubmission.objects.count() == 1
+
+    @override_settings(XFORM_ASYNC_SUBMISSIONS=True)
+    @patch('xforms.tasks.process_submission.apply_async',
+           MagicMock(side_effect=OperationalError))
+    def test_queue_submission_unavailable(self):
+        self._create_questionnaire('t_questionnaire', 0)
+        data = self._submission(form='submission',
+                                image=['test_image_one',
+                                       'test_image_two',
+                                       'test_image_three'],
+                                audio=['test_audio_one'])
+
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 201
+        party = Party.objects.get(name='Bilbo Baggins')
+        self._test_resource('test_image_two', party)
+        assert XFormSubmission.objects.count() == 1
+
+    @override_settings(XFORM_ASYNC_SUBMISSIONS=True)
+    @patch('xforms.tasks.process_submission.apply_async')
+    def test_queue_invalid_submission(self, apply_async):
+        data = self._invalid_submission(form='this is not a form')
+        response = self.request(method='POST', user=self.user, post_data=data,
+                                content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert not apply_async.called
+
+    def _staged_files_exist(self, task_kwargs):
+        storage = get_storage_class()()
+        keys = ([task_kwargs['xml_submission_file']] +
+                [f['key'] for f in task_kwargs['files']])
+        return [storage.exists(key) for key in keys]
+
+    @override_settings(XFORM_ASYNC_SUBMISSIONS=True)
+    @patch('xforms.tasks.process_submission.apply_async')
+    def test_process_submission_is_atomic(self, apply_async):
+        self._create_questionnaire('t_questionnaire', 0)
+        data = self._submission(form='submission',
+                                image=['test_image_one'])
+        self.request(method='POST', user=self.user, post_data=data,
+                     content_type='multipart/form-data')
+        task_kwargs = apply_async.call_args[1]['kwargs']
+
+        # The records are rolled back if the submission cannot be saved,
+        # and the staged files are kept for the retry
+        with patch('xforms.mixins.model_helper.ModelHelper.save_submission',
+                   side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                tasks.process_submission(**task_kwargs)
+        assert Party.objects.count() == 0
+        assert all(self._staged_files_exist(task_kwargs))
+
+        tasks.process_submission(**task_kwargs)
+        assert Party.objects.count() == 1
+        assert XFormSubmission.objects.count() == 1
+        assert not any(self._staged_files_exist(task_kwargs))
+
+    @override_settings(XFORM_ASYNC_SUBMISSIONS=True)
+    @patch('xforms.tasks.process_submission.apply_async')
+    def test_process_processed_submission(self, apply_async):
+        self._create_questionnaire('t_questionnaire', 0)
+        data = self._submission(form='submission')
+        self.request(method='POST', user=self.user, post_data=data,
+                     content_type='multipart/form-data')
+        data = self._submission(form='submission')
+        self.request(method='POST', user=self.user, post_data=data,
+                     content_type='multipart/form-data')
+        first, second = (call[1]['kwargs']
+                         for call in apply_async.call_args_list)
+
+        submission_id = tasks.process_submission(**first)
+        with patch('xforms.mixins.model_helper.ModelHelper.create_models'
+                   ) as create_models:
+            assert tasks.process_submission(**second) == submission_id
+        assert not create_models.called
+        assert Party.objects.count() == 1
+        assert not any(self._staged_files_exist(second))
+
+    @override_settings(XFORM_ASYNC_SUBMISSIONS=True)
+    @patch('xforms.tasks.process_submission.apply_async')
+    def test_process_invalid_submission(self, apply_async):
+        data = self._submission(form='submission')
+        self.request(method='POST', user=self.user, post_data=data,
+                     content_type='multipart/form-data')
+        task_kwargs = apply_async.call_args[1]['kwargs']
+
+        # The questionnaire of the submission does not exist
+        with pytest.raises(InvalidXMLSubmission):
+            tasks.process_submission(**task_kwargs)
+        assert not any(self._staged_files_exist(task_kwargs))
+
 
 class XFormDownloadView(APITestCase, UserTestCase, TestCase):
     view_class = api.XFormDownloadView
@@ -889,6 +1112,52 @@ class XFormDownloadView(APITestCase, UserTestCase, TestCase):
         assert '<{id} id="{id}" version="{v}"/>'.format(
                 id=self.questionnaire.id_string,
                 v=self.questionnaire.version) in response.content
+        assert response.headers['etag'][1]
+
+    @override_settings(CACHES=dict(
+        settings.CACHES,
+        default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    ))
+    def test_get_cached_questionnaire(self):
+        response = self.request(user=self.user)
+        key = get_xform_cache_key(self.questionnaire.id)
+        assert cache.get(key)['xml'].decode() == response.content
+
+        cache.set(key, dict(cache.get(key), xml=b'<cached/>'))
+        response = self.request(user=self.user)
+        assert response.status_code == 200
+        assert response.content == '<cached/>'
+
+        Questionnaire.objects.filter(id=self.questionnaire.id).update(
+            version=self.questionnaire.version + 1)
+        response = self.request(user=self.user)
+        assert response.content != '<cached/>'
+
+    def test_get_questionnaire_not_modified(self):
+        response = self.request(user=self.user)
+        etag = response.headers['etag'][1]
+
+        response = self.request(user=self.user,
+                                request_meta={'HTTP_IF_NONE_MATCH': etag})
+        assert response.status_code == 304
+        assert response.content == ''
+        assert response.headers['etag'][1] == etag
+
+    @override_settings(CACHES=dict(
+        settings.CACHES,
+        default={'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    ))
+    def test_cache_invalidated_on_questionnaire_change(self):
+        self.request(user=self.user)
+        key = get_xform_cache_key(self.questionnaire.id)
+        assert cache.get(key) is not None
+
+        QuestionFactory.create(questionnaire=self.questionnaire)
+        assert cache.get(key) is None
+
+        self.request(user=self.user)
+        self.questionnaire.save()
+        assert cache.get(key) is None
 
     def test_get_questionnaire_that_does_not_exist(self):
         response = self.request(user=self.user,
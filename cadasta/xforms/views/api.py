@@ -1,25 +1,32 @@
+import hashlib
 import logging
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
+from django.db.models import F
 from django.shortcuts import get_object_or_404
-from django.utils.six import BytesIO
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
 from django.utils.translation import ugettext as _
 from questionnaires.models import Questionnaire
 from rest_framework import status, viewsets, generics
-from rest_framework.authentication import BasicAuthentication
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.renderers import JSONRenderer
 from rest_framework.renderers import StaticHTMLRenderer
 from rest_framework.response import Response
 from tutelary.models import Role
 from tutelary.mixins import APIPermissionRequiredMixin
-from xforms.models import XFormSubmission
+from accounts.authentication import CachedBasicAuthentication
+from core import breakers
+from xforms.models import (XFormSubmission, get_xform_cache_key,
+                           get_form_list_cache_key, get_form_list_modified)
 from xforms.mixins.model_helper import ModelHelper
 from xforms.mixins.openrosa_headers_mixin import OpenRosaHeadersMixin
 from xforms.renderers import XFormListRenderer
 from xforms.serializers import XFormListSerializer, XFormSubmissionSerializer
 from xforms.exceptions import InvalidXMLSubmission
+from xforms.tasks import queue_submission
 from questionnaires.serializers import QuestionnaireSerializer
 from ..renderers import XFormRenderer
 from django.template.loader import render_to_string
@@ -36,7 +43,7 @@ class XFormSubmissionViewSet(OpenRosaHeadersMixin, viewsets.GenericViewSet):
     Returns number of successful forms submitted
     """
 
-    authentication_classes = (BasicAuthentication,)
+    authentication_classes = (CachedBasicAuthentication,)
     permission_classes = (IsAuthenticated,)
     parser_classes = (FormParser, MultiPartParser,)
     serializer_class = XFormSubmissionSerializer
@@ -46,6 +53,11 @@ class XFormSubmissionViewSet(OpenRosaHeadersMixin, viewsets.GenericViewSet):
         if request.method.upper() == 'HEAD':
             return Response(headers=self.get_openrosa_headers(request),
                             status=status.HTTP_204_NO_CONTENT,)
+        if settings.XFORM_ASYNC_SUBMISSIONS:
+            response = self._queue_submission(request)
+            if response is not None:
+                return response
+
         try:
             instance = ModelHelper().upload_submission_data(request)
         except InvalidXMLSubmission as e:
@@ -65,27 +77,39 @@ class XFormSubmissionViewSet(OpenRosaHeadersMixin, viewsets.GenericViewSet):
                 content_type=self.DEFAULT_CONTENT_TYPE
             )
 
-        instance, parties, locations, tenure_relationships = instance
-        serializer = XFormSubmissionSerializer(instance)
-
-        json = JSONRenderer().render(serializer.data)
-        stream = BytesIO(json)
-        data = JSONParser().parse(stream)
-        serializer = XFormSubmissionSerializer(data=data)
-
-        # Every possible error that would make the serializer not valid
-        # has already been checked for, so no failsafe is necessary.
-        if serializer.is_valid():
-            data = serializer.save()
-            data.parties.add(*parties)
-            data.spatial_units.add(*locations)
-            data.tenure_relationships.add(*tenure_relationships)
-            success_msg = _("Form was Successfully Received")
-            return self._formatMessageResponse(
-                request,
-                success_msg,
-                status.HTTP_201_CREATED
-            )
+        ModelHelper().save_submission(*instance)
+        success_msg = _("Form was Successfully Received")
+        return self._formatMessageResponse(
+            request,
+            success_msg,
+            status.HTTP_201_CREATED
+        )
+
+    def _queue_submission(self, request):
+        """
+        Stores the submission to be processed by a worker. Returns ``None``
+        if the task queue is not available, so that the submission is
+        processed during the request instead.
+        """
+        if 'xml_submission_file' not in request.data.keys():
+            e = InvalidXMLSubmission(_('XML submission not found'))
+            logger.exception(str(e))
+            return self._sendErrorResponse(request, e,
+                                           status.HTTP_400_BAD_REQUEST)
+
+        files = request.FILES.copy()
+        xml_submission_file = files.pop('xml_submission_file')[-1]
+        try:
+            queue_submission(xml_submission_file, files, request.user)
+        except breakers.celery.expected_errors:
+            logger.exception("Failed to queue submission.")
+            return None
+
+        return self._formatMessageResponse(
+            request,
+            _("Form was Successfully Received"),
+            status.HTTP_202_ACCEPTED
+        )
 
     def _sendErrorResponse(self, request, e, status):
         return self._formatMessageResponse(request, e, status)
@@ -110,7 +134,7 @@ class XFormListView(OpenRosaHeadersMixin,
     projects a user is a member of.
     """
 
-    authentication_classes = (BasicAuthentication,)
+    authentication_classes = (CachedBasicAuthentication,)
     permission_classes = (IsAuthenticated,)
     renderer_classes = (XFormListRenderer,)
     serializer_class = XFormListSerializer
@@ -121,35 +145,54 @@ class XFormListView(OpenRosaHeadersMixin,
         return context
 
     def get_user_forms(self):
-        forms = []
-        policies = self.request.user.assigned_policies()
-        orgs = self.request.user.organizations.filter(archived=False)
-        if Role.objects.get(name='superuser') in policies:
+        user = self.request.user
+        if is_superuser(user.assigned_policies()):
             return Questionnaire.objects.filter(project__archived=False)
-        for org in orgs:
-            projects = org.projects.filter(archived=False)
-            for project in projects:
-                try:
-                    questionnaire = Questionnaire.objects.get(
-                        id=project.current_questionnaire
-                    )
-                    forms.append(questionnaire)
-                except Questionnaire.DoesNotExist:
-                    pass
-        return forms
+        return Questionnaire.objects.filter(
+            id=F('project__current_questionnaire'),
+            project__archived=False,
+            project__organization__archived=False,
+            project__organization__users=user,
+        ).distinct()
 
     def get_queryset(self):
         return self.get_user_forms()
 
     def list(self, request, *args, **kwargs):
-        self.object_list = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(self.object_list, many=True)
-        return Response(
-            serializer.data, headers=self.get_openrosa_headers(request))
+        # The rendered form list is cached per user until a questionnaire,
+        # project, organization or the user's roles change
+        last_modified = get_form_list_modified(request.user.id)
+        headers = self.get_openrosa_headers(request)
+        headers['Last-Modified'] = http_date(last_modified)
+
+        response = get_conditional_response(
+            request, last_modified=last_modified)
+        if response is not None:
+            return Response(status=response.status_code, headers=headers)
+
+        # Download URLs depend on the host and protocol of the request
+        key = get_form_list_cache_key(request.user.id, '{} {}'.format(
+            request.META.get('SERVER_PROTOCOL'),
+            request.build_absolute_uri('/')))
+        cached = cache.get(key)
+        if cached is not None and cached[0] == last_modified:
+            content = cached[1]
+        else:
+            self.object_list = self.filter_queryset(self.get_queryset())
+            serializer = self.get_serializer(self.object_list, many=True)
+            content = XFormListRenderer().render(serializer.data)
+            cache.set(key, (last_modified, content),
+                      settings.XFORM_CACHE_TIMEOUT)
+        return Response(content, headers=headers)
+
+
+def is_superuser(policies):
+    return any(isinstance(policy, Role) and policy.name == 'superuser'
+               for policy in policies)
 
 
 class XFormDownloadView(APIPermissionRequiredMixin, generics.RetrieveAPIView):
-    authentication_classes = (BasicAuthentication,)
+    authentication_classes = (CachedBasicAuthentication,)
     permission_classes = (IsAuthenticated,)
     renderer_classes = (XFormRenderer,)
     serializer_class = QuestionnaireSerializer
@@ -169,3 +212,35 @@ class XFormDownloadView(APIPermissionRequiredMixin, generics.RetrieveAPIView):
         context = super().get_serializer_context(*args, **kwargs)
         context['project'] = self.get_object().project
         return context
+
+    def get_xform(self):
+        """
+        Returns the rendered XForm of the questionnaire and its ETag. The
+        XForm is rendered once per questionnaire version and cached until
+        the questionnaire or one of its questions changes.
+        """
+        questionnaire = self.get_object()
+        key = get_xform_cache_key(questionnaire.id)
+        xform = cache.get(key)
+        if (xform is None or
+                xform['version'] != questionnaire.version or
+                xform['md5_hash'] != questionnaire.md5_hash):
+            serializer = self.get_serializer(questionnaire)
+            xml = XFormRenderer().render(serializer.data)
+            xform = {
+                'version': questionnaire.version,
+                'md5_hash': questionnaire.md5_hash,
+                'xml': xml,
+                'etag': hashlib.md5(xml).hexdigest(),
+            }
+            cache.set(key, xform, settings.XFORM_CACHE_TIMEOUT)
+        return xform
+
+    def retrieve(self, request, *args, **kwargs):
+        xform = self.get_xform()
+        etag = quote_etag(xform['etag'])
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return Response(status=response.status_code,
+                            headers={'ETag': etag})
+        return Response(xform['xml'], headers={'ETag': etag})